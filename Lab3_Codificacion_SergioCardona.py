@@ -1,91 +1,224 @@
-import heapq # modulo para implementar una cola de prioridad
-import math # modulo para realizar operaciones matemáticas
-import ast #modulo ast para evaluar expresiones Python
-import re # mdulo re para manejar expresiones regulares
-from collections import Counter # Importa Counter para contar frecuencias de elementos
-
-# Nodo del arbol de Huffman
-class NodoHuffman:
-    def __init__(self, caracter, frecuencia):
-        self.caracter = caracter #caracter asociado al nodo
-        self.frecuencia = frecuencia #frecuencia del carcter
-        self.izq = None #puntero al hijo izquierdo
-        self.der = None #puntero al hijo derecho
-
-    def __lt__(self, otro):
-        return self.frecuencia < otro.frecuencia  # compara nodos para poder usar la cola de prioridad
-
-# Funcion para construir el arbol de Huffman
-def construir_arbol_huffman(frecuencias):
-    heap = [NodoHuffman(caracter, freq) for caracter, freq in frecuencias.items()] #crea una lista de nodos a partir de las frecuencias
-    heapq.heapify(heap)  #convierte la lista en una cola de prioridad
-    
-    while len(heap) > 1: #construccion del arbol
-        nodo_izq = heapq.heappop(heap) # extrae el nodo de menor frecuencia
-        nodo_der = heapq.heappop(heap) #extrae el siguiente nodo de menor frecuencia
-        nodo_fusion = NodoHuffman(None, nodo_izq.frecuencia + nodo_der.frecuencia) #crea un nuevo nodo que fusiona los dos nodos extraidos
-        nodo_fusion.izq = nodo_izq #establece el hijo izquierdo
-        nodo_fusion.der = nodo_der #establece el hijo derecho
-        heapq.heappush(heap, nodo_fusion) # inserta el nodo fusionado de nuevo en el heap
-
-    return heap[0] #retorna la raiz del arbol
-
-# Funcion para generar el codigo de Huffman
-def generar_codigos_huffman(nodo, codigo_actual="", codigos={}):
-    if nodo is None:  #si el nodo es None retorna
-        return
-    if nodo.caracter is not None:
-        codigos[nodo.caracter] = codigo_actual # asigna el codigo al caracter
-    generar_codigos_huffman(nodo.izq, codigo_actual + "0", codigos) #llama recursivamente el hijo izquierdo con el codigo actualizado
-    generar_codigos_huffman(nodo.der, codigo_actual + "1", codigos) #llama recursivamente el hijo derecho con el codigo actualizado
-    return codigos # retorna el diccionario de codigos
-
-#funcion para escribir bits
-def write_bit(bit, bits):
-    bits.append(bit) #agega el bit a la lista
-
-# funcion para leer un bit de la lista de bits
-def read_bit(bits, index):
-    if index < len(bits): #verifica que el indice este dentro de los limites
-        return int(bits[index]), index + 1  # retorna el bit y el siguiente indice
-    return None, index # retorna None si el indice esta fuera del limite
+import heapq # mezcla ordenada de paquetes en package-merge
+from bisect import bisect_right # busqueda binaria en las frecuencias acumuladas
+from collections import Counter, OrderedDict # Counter para contar frecuencias; OrderedDict para los contextos
 
-def int_arith_code(mensaje, k, frecuencias):
-    T = sum(frecuencias.values()) #total de frecuencias
-    R = 2 ** k # Tamaño del rango
-    l = 0 # Limite inferior inicial
-    u = R - 1 # Limite superior inicial
-    m = 0 # Contador de bits para la salida
-    bits = []  # Lista donde almacenamos los bits codificados
-    
-    # Construccion de límites
-    limites = {}
-    acumulado = 0
-    for simbolo, frecuencia in frecuencias.items():
-        limites[simbolo] = (acumulado, acumulado + frecuencia) # Asigna los limites para cada simbolo
-        acumulado += frecuencia # Acumula la frecuencia total
-    
-    # Codificación del mensaje
-    for caracter in mensaje:
+from bits_io import BitReader, BitWriter # lectura y escritura de bits sobre bytes
+from codificacion_ans import ( # codificacion con sistemas numericos asimetricos (tANS y rANS)
+    codificar_rans, codificar_tans, decodificar_simbolos_rans, decodificar_simbolos_tans, precision_ans,
+)
+from contenedor import ( # formato binario de los archivos de salida
+    METODO_ARITMETICA, METODO_HUFFMAN, METODO_RANGO, METODO_RANS, METODO_TANS, MODO_ADAPTATIVO, MODO_AUTOMATICO, MODO_CONTEXTO,
+    MODO_INTERCALADO, MODO_NO_AUTOMATICO, NOMBRES_METODOS, escribir_contenedor, leer_contenedor,
+)
+from huffman_vectorizado import codificar_simbolos # codificacion de Huffman vectorizada (opcional)
+from metricas import activas, contar, etapa # instrumentacion opcional por etapa
+
+# Funcion para calcular las longitudes de los codigos de Huffman sin crear nodos: el arbol se guarda
+# en arreglos (peso y padre de cada nodo) y se arma con dos colas, una de hojas ordenadas por frecuencia
+# y otra de nodos internos, que se crean ya en orden creciente de peso, asi cada fusion es O(1)
+def longitudes_huffman(frecuencias):
+    simbolos = sorted(frecuencias, key=lambda simbolo: (frecuencias[simbolo], simbolo)) # orden fijo
+    n = len(simbolos)
+    if n <= 1:
+        return {simbolo: 1 for simbolo in simbolos} # un solo simbolo usa un codigo de 1 bit
+    pesos = [frecuencias[simbolo] for simbolo in simbolos] + [0] * (n - 1) # hojas 0..n-1, internos n..2n-2
+    padres = [0] * (2 * n - 1)
+    hoja, interno = 0, n # frente de cada cola
+    for nuevo in range(n, 2 * n - 1):
+        for _ in range(2): # saca los dos nodos de menor peso
+            if hoja < n and (interno == nuevo or pesos[hoja] <= pesos[interno]): # en empate, la hoja
+                elegido, hoja = hoja, hoja + 1
+            else:
+                elegido, interno = interno, interno + 1
+            padres[elegido] = nuevo
+            pesos[nuevo] += pesos[elegido]
+    profundidades = [0] * (2 * n - 1) # la raiz es el ultimo nodo; cada padre esta despues de sus hijos
+    for nodo in range(2 * n - 3, -1, -1):
+        profundidades[nodo] = profundidades[padres[nodo]] + 1
+    return {simbolo: profundidades[indice] for indice, simbolo in enumerate(simbolos)}
+
+# Funcion para calcular longitudes de codigo optimas con un maximo de `longitud_maxima` bits (package-merge):
+# se repite L-1 veces "empaquetar de a pares la lista anterior y mezclarla con las hojas" y se eligen los
+# 2n-2 elementos de menor peso; la longitud de cada simbolo es la cantidad de veces que su hoja fue elegida
+def longitudes_huffman_limitadas(frecuencias, longitud_maxima):
+    simbolos = sorted(frecuencias, key=lambda simbolo: (frecuencias[simbolo], simbolo)) # orden fijo
+    n = len(simbolos)
+    if n <= 1:
+        return {simbolo: 1 for simbolo in simbolos}
+    if n > 1 << longitud_maxima:
+        raise ValueError(f"{n} símbolos no caben en códigos de a lo sumo {longitud_maxima} bits.")
+    hojas = [(frecuencias[simbolo], indice, None) for indice, simbolo in enumerate(simbolos)] # (peso, hoja, paquete)
+    lista = hojas
+    for _ in range(longitud_maxima - 1):
+        paquetes = [(lista[j][0] + lista[j + 1][0], -1, (lista[j], lista[j + 1])) for j in range(0, len(lista) - 1, 2)]
+        lista = list(heapq.merge(hojas, paquetes, key=lambda elemento: elemento[0])) # en empate, primero las hojas
+
+    longitudes = [0] * n
+    pila = lista[:2 * n - 2]
+    while pila: # cuenta cuantas veces aparece cada hoja dentro de los elementos elegidos
+        _, hoja, paquete = pila.pop()
+        if hoja >= 0:
+            longitudes[hoja] += 1
+        else:
+            pila.extend(paquete)
+    return {simbolo: longitudes[indice] for indice, simbolo in enumerate(simbolos)}
+
+# Funcion para comparar el tamaño de la carga con y sin limite de longitud; retorna
+# (bits sin limite, bits con limite, longitud maxima sin limite)
+def costo_longitud_maxima(frecuencias, longitud_maxima):
+    libres = longitudes_huffman(frecuencias)
+    limitadas = longitudes_huffman_limitadas(frecuencias, longitud_maxima)
+    bits_libres = sum(frecuencias[simbolo] * longitud for simbolo, longitud in libres.items())
+    bits_limitados = sum(frecuencias[simbolo] * longitud for simbolo, longitud in limitadas.items())
+    return bits_libres, bits_limitados, max(libres.values(), default=0)
+
+# Funcion para asignar codigos canonicos a partir de las longitudes de cada caracter
+def codigos_canonicos(longitudes):
+    codigos = {}
+    codigo = 0 # valor del siguiente codigo a asignar
+    longitud_anterior = 0
+    for caracter, longitud in sorted(longitudes.items(), key=lambda par: (max(par[1], 1), par[0])): # ordena por longitud y luego por caracter
+        longitud = max(longitud, 1) # un alfabeto de un solo caracter usa un codigo de 1 bit
+        codigo <<= longitud - longitud_anterior # agrega ceros al pasar a una longitud mayor
+        codigos[caracter] = format(codigo, f"0{longitud}b")
+        codigo += 1
+        longitud_anterior = longitud
+    return codigos
+
+MAX_LONGITUD_CODIGO = 128 # ningun codigo de Huffman de datos reales llega (con 2^64 bytes el maximo es 92)
+
+# Funcion para comprobar que las longitudes leidas de un archivo forman un codigo prefijo (desigualdad
+# de Kraft) con codigos de un largo razonable; un archivo corrupto podria pedir codigos de millones de bits
+def validar_longitudes(longitudes):
+    longitud_max = max((max(longitud, 1) for longitud in longitudes.values()), default=0)
+    if longitud_max > MAX_LONGITUD_CODIGO or sum(1 << (longitud_max - max(longitud, 1)) for longitud in longitudes.values()) > 1 << longitud_max:
+        raise ValueError("Las longitudes de los códigos no forman un código de Huffman válido.")
+    return longitudes
+
+# Funcion para obtener los codigos de Huffman en forma canonica para una tabla de frecuencias;
+# con `longitud_maxima` ningun codigo pasa de esa cantidad de bits
+def tabla_huffman_canonica(frecuencias, longitud_maxima=None):
+    with etapa("arbol_huffman"): # el arbol solo se usa para obtener las longitudes
+        longitudes = longitudes_huffman(frecuencias)
+        if longitud_maxima is not None and max(longitudes.values(), default=0) > longitud_maxima:
+            longitudes = longitudes_huffman_limitadas(frecuencias, longitud_maxima)
+    with etapa("codigos_huffman"):
+        return codigos_canonicos(longitudes) # con la forma canonica basta guardar las longitudes
+
+ANCHO_TABLA_HUFFMAN = 11 # bits que se resuelven en cada consulta a la tabla de decodificacion
+
+# Funcion para construir las tablas de decodificacion de Huffman
+def construir_tabla_huffman(codigos):
+    if any(len(codigo) == 0 for codigo in codigos.values()):
+        raise ValueError("La tabla contiene un código vacío y no se puede decodificar.")
+    longitud_max = max(len(codigo) for codigo in codigos.values())
+    ancho = min(longitud_max, ANCHO_TABLA_HUFFMAN)
+    simple = [None] * (1 << ancho) # ventana de `ancho` bits -> (caracter, longitud)
+    largos = {} # (longitud, valor) -> caracter para los codigos mas largos que la ventana
+
+    # Se llenan primero los codigos largos para que los cortos tengan prioridad (igual que la busqueda bit a bit)
+    for caracter, codigo in sorted(codigos.items(), key=lambda par: -len(par[1])):
+        longitud = len(codigo)
+        valor = int(codigo, 2)
+        if longitud <= ancho:
+            inicio = valor << (ancho - longitud)
+            for indice in range(inicio, inicio + (1 << (ancho - longitud))):
+                simple[indice] = (caracter, longitud)
+        else:
+            largos[(longitud, valor)] = caracter
+            simple[valor >> (longitud - ancho)] = (None, 0) # marca: hay que seguir leyendo bits
+
+    # Tabla de varios caracteres por consulta: decodifica todos los codigos que caben en la ventana
+    mascara = (1 << ancho) - 1
+    multiple = [None] * (1 << ancho)
+    for indice in range(1 << ancho):
+        caracteres = []
+        usados = 0
+        while usados < ancho:
+            entrada = simple[(indice << usados) & mascara]
+            if entrada is None or entrada[1] == 0 or entrada[1] > ancho - usados:
+                break # el siguiente codigo no cabe completo en la ventana
+            caracteres.append(entrada[0])
+            usados += entrada[1]
+        multiple[indice] = (caracteres, usados)
+
+    return {
+        "ancho": ancho,
+        "longitud_max": longitud_max,
+        "longitud_min": min(len(codigo) for codigo in codigos.values()),
+        "simple": simple,
+        "multiple": multiple,
+        "largos": largos,
+    }
+
+# Funcion para codificar un mensaje con una tabla de codigos de Huffman
+def codificar_huffman(mensaje, codigos):
+    codigos_enteros = {caracter: (int(codigo, 2), len(codigo)) for caracter, codigo in codigos.items()} # cada codigo como (valor, longitud)
+    with etapa("codificacion_huffman"):
+        bits = codificar_simbolos(mensaje, codigos_enteros, BitWriter()) # con NumPy si esta disponible
+    contar("bits_huffman", len(bits))
+    return bits
+
+FLUJOS_HUFFMAN = 4 # flujos del modo intercalado
+
+# Funcion para codificar un mensaje repartiendo los caracteres en `flujos` flujos intercalados
+# (el caracter i va al flujo i % flujos) que comparten la tabla de codigos; retorna un BitWriter por flujo
+def codificar_huffman_intercalado(mensaje, codigos, flujos=FLUJOS_HUFFMAN):
+    return [codificar_huffman(mensaje[flujo::flujos], codigos) for flujo in range(flujos)]
+
+LIMITE_TABLA_DIRECTA = 1 << 16 # mayor T para el que se arma la tabla valor -> simbolo
+
+# Funcion para construir las frecuencias acumuladas del modelo aritmetico
+def construir_limites(frecuencias):
+    simbolos = list(frecuencias) # el orden de la tabla define los intervalos
+    acumulados = [0] # acumulados[i] es el limite inferior del simbolo i, acumulados[-1] es T
+    for frecuencia in frecuencias.values():
+        acumulados.append(acumulados[-1] + frecuencia)
+    T = acumulados[-1]
+
+    # Con T pequeño cada valor en [0, T) se resuelve con una sola consulta a la lista
+    tabla_directa = None
+    if T <= LIMITE_TABLA_DIRECTA:
+        tabla_directa = []
+        for indice, frecuencia in enumerate(frecuencias.values()):
+            tabla_directa.extend([indice] * frecuencia)
+
+    return {
+        "simbolos": simbolos,
+        "acumulados": acumulados,
+        "limites": {simbolo: (acumulados[i], acumulados[i + 1]) for i, simbolo in enumerate(simbolos)},
+        "tabla_directa": tabla_directa,
+        "T": T,
+    }
+
+# Estado del codificador aritmetico con enteros: intervalo [l, u], contador m de E3 y buffer de salida
+class CodificadorAritmetico:
+    __slots__ = ("R", "l", "u", "m", "bits")
+
+    def __init__(self, k, bits=None):
+        self.R = 2 ** k # Tamaño del rango
+        self.l = 0 # Limite inferior inicial
+        self.u = self.R - 1 # Limite superior inicial
+        self.m = 0 # Contador de bits para la salida
+        self.bits = BitWriter() if bits is None else bits # Buffer donde almacenamos los bits codificados
+
+    # Reduce el intervalo al subintervalo [f_i, f_i+1) de T y renormaliza
+    def codificar(self, f_i, f_i_plus_1, T):
+        R, l, u, m, bits = self.R, self.l, self.u, self.m, self.bits
         s = u - l + 1 # Tamaño del intervalo actual
-        f_i, f_i_plus_1 = limites[caracter]  # Limites del simbolo actual
-        u = l + math.floor(s * f_i_plus_1 / T) - 1 # Actualiza el limite superior
-        l = l + math.floor(s * f_i / T) # Actualiza el limite inferior
-        
+        u = l + (s * f_i_plus_1) // T - 1 # Actualiza el limite superior (division entera exacta, igual que el decodificador)
+        l = l + (s * f_i) // T # Actualiza el limite inferior
+
         while True:
             if l >= R // 2:  # Intervalo en la mitad superior
-                write_bit(1, bits)
+                bits.write_bits(1 << m, m + 1) # Escribe un 1 seguido de m ceros
                 u = 2 * u - R + 1
                 l = 2 * l - R
-                for _ in range(m):
-                    write_bit(0, bits) # Escribe ceros en los bits
                 m = 0 # Resetea el contador de bits
             elif u < R // 2:  # Intervalo en la mitad inferior
-                write_bit(0, bits)
+                bits.write_bits((1 << m) - 1, m + 1) # Escribe un 0 seguido de m unos
                 u = 2 * u + 1
                 l = 2 * l
-                for _ in range(m): # Escribe unos en los bits
-                    write_bit(1, bits)
                 m = 0
             elif l >= R // 4 and u < 3 * R // 4:  # Intervalo en la mitad intermedia
                 u = 2 * u - R // 2 + 1
@@ -93,94 +226,743 @@ def int_arith_code(mensaje, k, frecuencias):
                 m += 1 #incrementa el contador de bits
             else:
                 break  # Salir del bucle interno
-    
+        self.l, self.u, self.m = l, u, m
+
     # Salida final de bits
-    if l >= R // 4:
-        write_bit(1, bits) # Escribe 1 en la salida final
-        for _ in range(m):
-            write_bit(0, bits)
-        write_bit(0, bits)
-    else:
-        write_bit(0, bits) # Escribe 0 en la salida final
-        for _ in range(m):
-            write_bit(1, bits)
-        write_bit(1, bits)
+    def finalizar(self):
+        m = self.m
+        if self.l >= self.R // 4:
+            self.bits.write_bits(1 << (m + 1), m + 2) # Escribe 1, m ceros y un 0 final
+        else:
+            self.bits.write_bits((1 << (m + 1)) - 1, m + 2) # Escribe 0, m unos y un 1 final
+        self.m = 0
+        return self.bits
 
-    return bits # retorna los bits codificados
-def int_arith_decode(mensaje_codificado, k, n, frecuencias):
-    R = 2 ** k
-    l, u = 0, R - 1
-    T = sum(frecuencias.values())
-    mensaje_decodificado = []
-    
-    # Construir los limites
-    limites = {}
-    acumulado = 0
-    for simbolo, frecuencia in frecuencias.items():
-        limites[simbolo] = (acumulado, acumulado + frecuencia)
-        acumulado += frecuencia
-    
-    # Convertir el mensaje codificado de string a un numero entero
-    codigo = int(mensaje_codificado, 2)
-    
-    for _ in range(n):
+# El mismo codificador, pero contando las vueltas de la renormalizacion y los casos E3 (intervalo en la
+# mitad intermedia); solo se usa con las metricas activas para no pagar los contadores en el caso normal
+class CodificadorAritmeticoMedido(CodificadorAritmetico):
+    __slots__ = ("renormalizaciones", "eventos_e3", "simbolos")
+
+    def __init__(self, k, bits=None):
+        super().__init__(k, bits)
+        self.renormalizaciones = 0
+        self.eventos_e3 = 0
+        self.simbolos = 0
+
+    def codificar(self, f_i, f_i_plus_1, T):
+        R, l, u, m, bits = self.R, self.l, self.u, self.m, self.bits
         s = u - l + 1
-        valor = ((codigo - l + 1) * T - 1) // s
-        
-        # Encontrar el simbolo que corresponde al valor actual
-        for simbolo, (f_i, f_i_plus_1) in limites.items():
-            if f_i <= valor < f_i_plus_1:
-                mensaje_decodificado.append(simbolo)
-                u = l + (s * f_i_plus_1) // T - 1
-                l = l + (s * f_i) // T
+        u = l + (s * f_i_plus_1) // T - 1
+        l = l + (s * f_i) // T
+
+        renormalizaciones = e3 = 0
+        while True:
+            if l >= R // 2:
+                bits.write_bits(1 << m, m + 1)
+                u = 2 * u - R + 1
+                l = 2 * l - R
+                m = 0
+            elif u < R // 2:
+                bits.write_bits((1 << m) - 1, m + 1)
+                u = 2 * u + 1
+                l = 2 * l
+                m = 0
+            elif l >= R // 4 and u < 3 * R // 4:
+                u = 2 * u - R // 2 + 1
+                l = 2 * l - R // 2
+                m += 1
+                e3 += 1
+            else:
                 break
-        
+            renormalizaciones += 1
+        self.l, self.u, self.m = l, u, m
+        self.renormalizaciones += renormalizaciones
+        self.eventos_e3 += e3
+        self.simbolos += 1
+
+    # Al terminar se suman los contadores a las metricas activas
+    def finalizar(self):
+        bits = super().finalizar()
+        contar("simbolos_aritmetica", self.simbolos)
+        contar("renormalizaciones", self.renormalizaciones)
+        contar("eventos_e3", self.eventos_e3)
+        contar("bits_aritmetica", len(bits))
+        return bits
+
+# Codificador aritmetico nuevo: el medido si hay metricas activas
+def crear_codificador_aritmetico(k, bits=None):
+    return CodificadorAritmeticoMedido(k, bits) if activas() else CodificadorAritmetico(k, bits)
+
+# Estado del decodificador aritmetico: intervalo [l, u] y ventana de k bits leida del BitReader
+class DecodificadorAritmetico:
+    __slots__ = ("R", "l", "u", "codigo", "lector")
+
+    def __init__(self, k, lector):
+        self.R = 2 ** k
+        self.l, self.u = 0, self.R - 1
+        self.lector = lector
+        self.codigo = lector.read_bits(k) # primeros k bits (ceros despues del final)
+
+    # Valor en [0, T) que indica el simbolo actual
+    def valor(self, T):
+        return ((self.codigo - self.l + 1) * T - 1) // (self.u - self.l + 1)
+
+    # Reduce el intervalo al del simbolo decodificado y renormaliza leyendo bits nuevos
+    def actualizar(self, f_i, f_i_plus_1, T):
+        R, l, u, codigo, lector = self.R, self.l, self.u, self.codigo, self.lector
+        s = u - l + 1
+        u = l + (s * f_i_plus_1) // T - 1
+        l = l + (s * f_i) // T
+
         # Renormalizacion (ajuste de los intervalos)
         while True:
             # Si el rango completo se encuentra en la primera mitad
             if u < R // 2:
                 l = 2 * l
                 u = 2 * u + 1
-                codigo = 2 * codigo
+                codigo = 2 * codigo + lector.read_bit()
             # Si el rango completo se encuentra en la segunda mitad
             elif l >= R // 2:
                 l = 2 * (l - R // 2)
                 u = 2 * (u - R // 2) + 1
-                codigo = 2 * (codigo - R // 2)
+                codigo = 2 * (codigo - R // 2) + lector.read_bit()
             # Si el rango está cerca del centro (renormalizacion en el tercer cuarto)
             elif l >= R // 4 and u < 3 * R // 4:
                 l = 2 * (l - R // 4)
                 u = 2 * (u - R // 4) + 1
-                codigo = 2 * (codigo - R // 4)
+                codigo = 2 * (codigo - R // 4) + lector.read_bit()
             else:
                 break
-            
-            # Esto asegura que el valor de codigo no exceda el tamaño de R
-            codigo %= R
-    
-    return ''.join(mensaje_decodificado)
+        self.l, self.u, self.codigo = l, u, codigo
+
+def int_arith_code(mensaje, k, frecuencias):
+    T = sum(frecuencias.values()) #total de frecuencias
+    limites = construir_limites(frecuencias)["limites"] # simbolo -> (f_i, f_i+1)
+
+    # Codificación del mensaje
+    codificador = crear_codificador_aritmetico(k)
+    with etapa("codificacion_aritmetica"):
+        for caracter in mensaje:
+            f_i, f_i_plus_1 = limites[caracter]  # Limites del simbolo actual
+            codificador.codificar(f_i, f_i_plus_1, T)
+
+        return codificador.finalizar() # retorna los bits codificados
+
+# Funcion para decodificar n simbolos con un modelo de construir_limites (se puede llamar por partes)
+def decodificar_simbolos_aritmetica(decodificador, modelo, n):
+    mensaje_decodificado = []
+    simbolos, acumulados, tabla_directa, T = modelo["simbolos"], modelo["acumulados"], modelo["tabla_directa"], modelo["T"]
+
+    for _ in range(n):
+        valor = decodificador.valor(T)
+
+        # Encontrar el simbolo que corresponde al valor actual
+        if tabla_directa is not None:
+            indice = tabla_directa[valor] # una consulta
+        else:
+            indice = bisect_right(acumulados, valor) - 1 # busqueda binaria O(log n)
+        mensaje_decodificado.append(simbolos[indice])
+        decodificador.actualizar(acumulados[indice], acumulados[indice + 1], T)
+
+    return mensaje_decodificado
+
+def int_arith_decode(mensaje_codificado, k, n, frecuencias):
+    # Ventana de k bits sobre el mensaje codificado; los bits se leen a medida que se renormaliza
+    if isinstance(mensaje_codificado, str):
+        mensaje_codificado = BitReader.from_bitstring(mensaje_codificado)
+    with etapa("decodificacion_aritmetica"):
+        decodificador = DecodificadorAritmetico(k, mensaje_codificado)
+        return ''.join(decodificar_simbolos_aritmetica(decodificador, construir_limites(frecuencias), n))
+
+# Codificador de rango: el mismo modelo [f_i, f_i+1) de T que el aritmetico, pero el intervalo se guarda
+# como (bajo, rango) de k bits y se renormaliza de a un byte. En lugar de contar los casos E3, cuando
+# bajo se pasa de 2^k el acarreo se suma al ultimo byte guardado (y a los 0xFF pendientes)
+class CodificadorRango:
+    __slots__ = ("k", "bajo", "rango", "cache", "pendientes", "bits")
+
+    def __init__(self, k, bits=None):
+        if k < 16:
+            raise ValueError(f"k = {k} es muy pequeño para el codificador de rango (mínimo 16).")
+        self.k = k
+        self.bajo = 0
+        self.rango = 1 << k
+        self.cache = None # ultimo byte que todavia puede recibir un acarreo
+        self.pendientes = 0 # bytes 0xFF que siguen al cache
+        self.bits = BitWriter() if bits is None else bits
+
+    # Saca el byte alto de `bajo`; si vale 0xFF se deja pendiente hasta saber si le llega un acarreo
+    def desplazar(self):
+        k, bajo = self.k, self.bajo
+        if bajo < (0xFF << (k - 8)) or bajo >> k:
+            acarreo = bajo >> k
+            if self.cache is not None:
+                self.bits.write_bits(self.cache + acarreo, 8)
+            for _ in range(self.pendientes):
+                self.bits.write_bits((0xFF + acarreo) & 0xFF, 8)
+            self.pendientes = 0
+            self.cache = (bajo >> (k - 8)) & 0xFF
+        elif self.cache is None:
+            self.cache = 0xFF # primer byte: todavia no hay nada a lo que sumar un acarreo
+        else:
+            self.pendientes += 1
+        self.bajo = (bajo << 8) & ((1 << k) - 1)
+
+    # Reduce el intervalo al subintervalo [f_i, f_i+1) de T y renormaliza de a bytes
+    def codificar(self, f_i, f_i_plus_1, T):
+        r = self.rango // T
+        self.bajo += r * f_i
+        self.rango = r * (f_i_plus_1 - f_i)
+        minimo = 1 << (self.k - 8)
+        while self.rango < minimo:
+            self.rango <<= 8
+            self.desplazar()
+
+    # Vacia `bajo` y el cache; retorna el BitWriter con la salida (siempre bytes completos)
+    def finalizar(self):
+        for _ in range((self.k + 7) // 8 + 1):
+            self.desplazar()
+        return self.bits
+
+# Decodificador de rango con la misma interfaz que DecodificadorAritmetico (valor / actualizar)
+class DecodificadorRango:
+    __slots__ = ("k", "rango", "codigo", "r", "lector")
+
+    def __init__(self, k, lector):
+        self.k = k
+        self.rango = 1 << k
+        self.lector = lector
+        self.codigo = lector.read_bits(k) # distancia entre el valor leido y `bajo`
+        self.r = 1
+
+    # Valor en [0, T) que indica el simbolo actual
+    def valor(self, T):
+        self.r = self.rango // T
+        return min(self.codigo // self.r, T - 1)
+
+    # Reduce el intervalo al del simbolo decodificado y renormaliza leyendo bytes nuevos
+    def actualizar(self, f_i, f_i_plus_1, T):
+        r = self.r
+        self.codigo -= r * f_i
+        self.rango = r * (f_i_plus_1 - f_i)
+        minimo = 1 << (self.k - 8)
+        while self.rango < minimo:
+            self.rango <<= 8
+            self.codigo = (self.codigo << 8) | self.lector.read_bits(8)
+
+# Funcion para elegir k en el codificador de rango: T debe caber en el rango minimo (2^(k-8))
+# con 8 bits de sobra para que el redondeo de rango // T cueste poco
+def k_rango(T):
+    return max(32, T.bit_length() + 16)
+
+# Funcion para codificar un mensaje con el codificador de rango; retorna un BitWriter
+def int_range_code(mensaje, k, frecuencias):
+    T = sum(frecuencias.values())
+    if T > 1 << (k - 8):
+        raise ValueError(f"k = {k} es muy pequeño para T = {T} (se necesita T <= 2^(k-8)).")
+    limites = construir_limites(frecuencias)["limites"]
+    codificador = CodificadorRango(k)
+    for caracter in mensaje:
+        f_i, f_i_plus_1 = limites[caracter]
+        codificador.codificar(f_i, f_i_plus_1, T)
+    return codificador.finalizar()
+
+# Funcion para decodificar n caracteres codificados con int_range_code
+def int_range_decode(mensaje_codificado, k, n, frecuencias):
+    if isinstance(mensaje_codificado, str):
+        mensaje_codificado = BitReader.from_bitstring(mensaje_codificado)
+    decodificador = DecodificadorRango(k, mensaje_codificado)
+    return ''.join(decodificar_simbolos_aritmetica(decodificador, construir_limites(frecuencias), n))
+
+# Arbol de Fenwick (binary indexed tree) para frecuencias acumuladas que cambian
+class ArbolFenwick:
+    __slots__ = ("arbol", "tamano", "paso_maximo")
+
+    def __init__(self, frecuencias):
+        self.tamano = len(frecuencias)
+        self.arbol = [0] + list(frecuencias) # posiciones 1..tamano
+        for i in range(1, self.tamano + 1): # construccion en O(n)
+            padre = i + (i & -i)
+            if padre <= self.tamano:
+                self.arbol[padre] += self.arbol[i]
+        self.paso_maximo = 1 << (self.tamano.bit_length() - 1) if self.tamano else 0
+
+    # Suma `delta` a la frecuencia del simbolo `indice`
+    def sumar(self, indice, delta):
+        indice += 1
+        while indice <= self.tamano:
+            self.arbol[indice] += delta
+            indice += indice & -indice
+
+    # Suma de las frecuencias de los simbolos [0, indice)
+    def acumulado(self, indice):
+        total = 0
+        while indice > 0:
+            total += self.arbol[indice]
+            indice -= indice & -indice
+        return total
+
+    # Retorna el simbolo cuyo intervalo contiene `valor` y su limite inferior
+    def buscar(self, valor):
+        posicion = 0
+        limite_inferior = 0
+        paso = self.paso_maximo
+        while paso:
+            siguiente = posicion + paso
+            if siguiente <= self.tamano and limite_inferior + self.arbol[siguiente] <= valor:
+                posicion = siguiente
+                limite_inferior += self.arbol[siguiente]
+            paso >>= 1
+        return posicion, limite_inferior
+
+SIMBOLO_FIN = 256 # simbolo extra que marca el final de los datos en el modo adaptativo
+K_ADAPTATIVO = 32 # precision del codificador adaptativo
+INCREMENTO_ADAPTATIVO = 32 # cuanto crece la frecuencia de un simbolo cada vez que aparece
+
+# Modelo adaptativo de orden 0 sobre bytes: todos los simbolos empiezan con frecuencia 1
+class ModeloAdaptativo:
+    __slots__ = ("frecuencias", "arbol", "total", "limite_total")
+
+    def __init__(self, k, num_simbolos=SIMBOLO_FIN + 1):
+        self.frecuencias = [1] * num_simbolos
+        self.arbol = ArbolFenwick(self.frecuencias)
+        self.total = num_simbolos
+        self.limite_total = min(1 << 16, 2 ** k // 4) # T no puede superar R/4
+        if self.total > self.limite_total:
+            raise ValueError(f"k = {k} es muy pequeño para {num_simbolos} símbolos.")
+
+    # Limites (f_i, f_i+1) del simbolo
+    def limites(self, simbolo):
+        f_i = self.arbol.acumulado(simbolo)
+        return f_i, f_i + self.frecuencias[simbolo]
+
+    # Aumenta la frecuencia del simbolo y reescala si el total supera el limite de precision
+    def actualizar(self, simbolo):
+        self.frecuencias[simbolo] += INCREMENTO_ADAPTATIVO
+        self.arbol.sumar(simbolo, INCREMENTO_ADAPTATIVO)
+        self.total += INCREMENTO_ADAPTATIVO
+        if self.total > self.limite_total:
+            self.frecuencias = [(frecuencia + 1) // 2 for frecuencia in self.frecuencias] # nunca llega a 0
+            self.arbol = ArbolFenwick(self.frecuencias)
+            self.total = sum(self.frecuencias)
+
+# Codificador aritmetico adaptativo: una sola pasada, sin tabla de frecuencias en la cabecera
+class CodificadorAdaptativo:
+    __slots__ = ("codificador", "modelo")
+
+    def __init__(self, k=K_ADAPTATIVO, bits=None):
+        self.codificador = CodificadorAritmetico(k, bits)
+        self.modelo = ModeloAdaptativo(k)
+
+    # Codifica un bloque de bytes; se puede llamar tantas veces como se quiera
+    def codificar(self, datos):
+        codificador, modelo = self.codificador, self.modelo
+        for simbolo in datos:
+            f_i, f_i_plus_1 = modelo.limites(simbolo)
+            codificador.codificar(f_i, f_i_plus_1, modelo.total)
+            modelo.actualizar(simbolo)
+
+    # Codifica el simbolo de fin y los bits finales
+    def finalizar(self):
+        f_i, f_i_plus_1 = self.modelo.limites(SIMBOLO_FIN)
+        self.codificador.codificar(f_i, f_i_plus_1, self.modelo.total)
+        return self.codificador.finalizar()
+
+def int_arith_code_adaptativo(datos, k=K_ADAPTATIVO):
+    codificador = CodificadorAdaptativo(k)
+    codificador.codificar(datos)
+    return codificador.finalizar()
+
+# Generador que decodifica el modo adaptativo y entrega los bytes en bloques de hasta `tam_bloque`
+def int_arith_decode_adaptativo_bloques(lector, k=K_ADAPTATIVO, tam_bloque=1 << 16):
+    decodificador = DecodificadorAritmetico(k, lector)
+    modelo = ModeloAdaptativo(k)
+    bloque = bytearray()
+
+    while True:
+        simbolo, f_i = modelo.arbol.buscar(decodificador.valor(modelo.total)) # busqueda O(log n) en el arbol de Fenwick
+        decodificador.actualizar(f_i, f_i + modelo.frecuencias[simbolo], modelo.total)
+        if simbolo == SIMBOLO_FIN:
+            break
+        bloque.append(simbolo)
+        modelo.actualizar(simbolo)
+        if len(bloque) & 0xFFF == 0: # cada 4096 bytes: un archivo truncado no se decodifica para siempre
+            lector.comprobar_relleno()
+        if len(bloque) >= tam_bloque:
+            yield bytes(bloque)
+            bloque.clear()
+
+    lector.comprobar_relleno()
+    if bloque:
+        yield bytes(bloque)
+
+def int_arith_decode_adaptativo(mensaje_codificado, k=K_ADAPTATIVO):
+    if isinstance(mensaje_codificado, str):
+        mensaje_codificado = BitReader.from_bitstring(mensaje_codificado)
+    return b"".join(int_arith_decode_adaptativo_bloques(mensaje_codificado, k))
+
+ORDEN_CONTEXTO = 2 # bytes anteriores que forman el contexto mas largo
+MAX_CONTEXTOS = 1 << 16 # contextos que se guardan a la vez; al pasarse se descarta el menos usado
+LIMITE_CONTEXTO = 1 << 16 # total de un contexto antes de reescalar sus cuentas
+
+# Tabla de frecuencias de un contexto: solo los simbolos que ya aparecieron despues de el, y una
+# cuenta de escape (tantas como simbolos distintos) para pasar al contexto mas corto
+class ModeloContexto:
+    __slots__ = ("simbolos", "cuentas", "total")
+
+    def __init__(self):
+        self.simbolos = []
+        self.cuentas = []
+        self.total = 0 # suma de las cuentas, sin el escape
+
+    # Total con la cuenta de escape
+    def total_con_escape(self):
+        return self.total + len(self.simbolos)
+
+    # Limites (f_i, f_i+1) del simbolo, o None si no aparecio en este contexto
+    def limites(self, simbolo):
+        acumulado = 0
+        for simbolo_contexto, cuenta in zip(self.simbolos, self.cuentas):
+            if simbolo_contexto == simbolo:
+                return acumulado, acumulado + cuenta
+            acumulado += cuenta
+        return None
+
+    # Retorna (simbolo, f_i, f_i+1) para un valor en [0, total_con_escape); simbolo None es el escape
+    def buscar(self, valor):
+        acumulado = 0
+        for simbolo, cuenta in zip(self.simbolos, self.cuentas):
+            if valor < acumulado + cuenta:
+                return simbolo, acumulado, acumulado + cuenta
+            acumulado += cuenta
+        return None, self.total, self.total_con_escape()
+
+    def actualizar(self, simbolo):
+        try:
+            self.cuentas[self.simbolos.index(simbolo)] += 1
+        except ValueError: # simbolo nuevo en este contexto
+            self.simbolos.append(simbolo)
+            self.cuentas.append(1)
+        self.total += 1
+        if self.total > LIMITE_CONTEXTO:
+            self.cuentas = [(cuenta + 1) // 2 for cuenta in self.cuentas] # nunca llega a 0
+            self.total = sum(self.cuentas)
+
+# Modelo de orden 1 y 2 (hasta `orden` bytes anteriores) sobre el modelo adaptativo de orden 0.
+# Los contextos se guardan en un OrderedDict con clave entera (orden y bytes anteriores) y a lo
+# sumo `max_contextos` entradas: al crear uno nuevo se descarta el que se uso hace mas tiempo
+class ModeloOrdenK:
+    __slots__ = ("orden", "max_contextos", "contextos", "orden0", "historia", "vistos")
+
+    def __init__(self, k=K_ADAPTATIVO, orden=ORDEN_CONTEXTO, max_contextos=MAX_CONTEXTOS):
+        if orden not in (1, 2):
+            raise ValueError(f"Orden de contexto no soportado: {orden} (1 o 2).")
+        self.orden = orden
+        self.max_contextos = max_contextos
+        self.contextos = OrderedDict()
+        self.orden0 = ModeloAdaptativo(k) # todos los simbolos (y el fin) tienen frecuencia desde el inicio
+        self.historia = 0 # ultimos bytes, el mas reciente en el byte bajo
+        self.vistos = 0
+
+    # Claves de los contextos disponibles, del mas largo al mas corto
+    def claves(self):
+        return [(orden << 16) | (self.historia & ((1 << (8 * orden)) - 1)) for orden in range(min(self.orden, self.vistos), 0, -1)]
+
+    # Retorna el contexto de la clave (y lo marca como recien usado) o None si no existe
+    def contexto(self, clave):
+        modelo = self.contextos.get(clave)
+        if modelo is not None:
+            self.contextos.move_to_end(clave)
+        return modelo
+
+    # Suma el simbolo a los contextos recorridos (`recorridos` tiene modelos o claves de contextos que
+    # no existian) y al orden 0 si se llego hasta el, y avanza la historia
+    def actualizar(self, simbolo, recorridos, en_orden0):
+        for recorrido in recorridos:
+            if not isinstance(recorrido, ModeloContexto):
+                if len(self.contextos) >= self.max_contextos:
+                    self.contextos.popitem(last=False) # descarta el menos usado
+                modelo = ModeloContexto()
+                self.contextos[recorrido] = modelo
+                recorrido = modelo
+            recorrido.actualizar(simbolo)
+        if en_orden0:
+            self.orden0.actualizar(simbolo)
+        self.historia = ((self.historia << 8) | simbolo) & 0xFFFF
+        self.vistos += 1
+
+# Codificador aritmetico con contexto: se prueba el contexto mas largo y, si el simbolo no aparecio
+# en el, se codifica un escape y se pasa al siguiente; el orden 0 tiene todos los simbolos
+class CodificadorContexto:
+    __slots__ = ("codificador", "modelo")
+
+    def __init__(self, k=K_ADAPTATIVO, orden=ORDEN_CONTEXTO, max_contextos=MAX_CONTEXTOS, bits=None):
+        self.codificador = CodificadorAritmetico(k, bits)
+        self.modelo = ModeloOrdenK(k, orden, max_contextos)
+
+    def codificar_simbolo(self, simbolo):
+        codificador, modelo = self.codificador, self.modelo
+        recorridos = []
+        for clave in modelo.claves():
+            contexto = modelo.contexto(clave)
+            if contexto is None: # contexto nuevo: no hace falta escape, el decodificador tampoco lo tiene
+                recorridos.append(clave)
+                continue
+            T = contexto.total_con_escape()
+            limites = contexto.limites(simbolo)
+            if limites is not None:
+                codificador.codificar(limites[0], limites[1], T)
+                modelo.actualizar(simbolo, recorridos + [contexto], False)
+                return
+            codificador.codificar(contexto.total, T, T) # escape
+            recorridos.append(contexto)
+        f_i, f_i_plus_1 = modelo.orden0.limites(simbolo)
+        codificador.codificar(f_i, f_i_plus_1, modelo.orden0.total)
+        if simbolo != SIMBOLO_FIN:
+            modelo.actualizar(simbolo, recorridos, True)
+
+    # Codifica un bloque de bytes; se puede llamar tantas veces como se quiera
+    def codificar(self, datos):
+        for simbolo in datos:
+            self.codificar_simbolo(simbolo)
+
+    # Codifica el simbolo de fin (escapa hasta el orden 0) y los bits finales
+    def finalizar(self):
+        self.codificar_simbolo(SIMBOLO_FIN)
+        return self.codificador.finalizar()
+
+def int_arith_code_contexto(datos, k=K_ADAPTATIVO, orden=ORDEN_CONTEXTO, max_contextos=MAX_CONTEXTOS):
+    codificador = CodificadorContexto(k, orden, max_contextos)
+    codificador.codificar(datos)
+    return codificador.finalizar()
+
+# Generador que decodifica el modo con contexto y entrega los bytes en bloques de hasta `tam_bloque`
+def int_arith_decode_contexto_bloques(lector, k=K_ADAPTATIVO, orden=ORDEN_CONTEXTO, max_contextos=MAX_CONTEXTOS, tam_bloque=1 << 16):
+    decodificador = DecodificadorAritmetico(k, lector)
+    modelo = ModeloOrdenK(k, orden, max_contextos)
+    bloque = bytearray()
+
+    while True:
+        recorridos = []
+        simbolo = None
+        for clave in modelo.claves():
+            contexto = modelo.contexto(clave)
+            if contexto is None:
+                recorridos.append(clave)
+                continue
+            T = contexto.total_con_escape()
+            simbolo, f_i, f_i_plus_1 = contexto.buscar(decodificador.valor(T))
+            decodificador.actualizar(f_i, f_i_plus_1, T)
+            if simbolo is not None:
+                modelo.actualizar(simbolo, recorridos + [contexto], False)
+                break
+            recorridos.append(contexto) # escape
+        else:
+            orden0 = modelo.orden0
+            simbolo, f_i = orden0.arbol.buscar(decodificador.valor(orden0.total))
+            decodificador.actualizar(f_i, f_i + orden0.frecuencias[simbolo], orden0.total)
+            if simbolo == SIMBOLO_FIN:
+                break
+            modelo.actualizar(simbolo, recorridos, True)
+
+        bloque.append(simbolo)
+        if len(bloque) & 0xFFF == 0: # cada 4096 bytes: un archivo truncado no se decodifica para siempre
+            lector.comprobar_relleno()
+        if len(bloque) >= tam_bloque:
+            yield bytes(bloque)
+            bloque.clear()
+
+    lector.comprobar_relleno()
+    if bloque:
+        yield bytes(bloque)
+
+def int_arith_decode_contexto(mensaje_codificado, k=K_ADAPTATIVO, orden=ORDEN_CONTEXTO, max_contextos=MAX_CONTEXTOS):
+    if isinstance(mensaje_codificado, str):
+        mensaje_codificado = BitReader.from_bitstring(mensaje_codificado)
+    return b"".join(int_arith_decode_contexto_bloques(mensaje_codificado, k, orden, max_contextos))
+
+BITS_SIMBOLO_VITTER = 9 # bits con los que se envia un simbolo nuevo (bytes y SIMBOLO_FIN)
+
+# Nodo del arbol de Huffman adaptativo; `numero` es su lugar en el orden implicito de Vitter
+class NodoVitter:
+    __slots__ = ("peso", "padre", "izquierdo", "derecho", "simbolo", "numero")
+
+    def __init__(self, numero, simbolo=None, padre=None):
+        self.peso = 0
+        self.padre = padre
+        self.izquierdo = None # las hojas no tienen hijos
+        self.derecho = None
+        self.simbolo = simbolo
+        self.numero = numero
+
+# Arbol de Huffman adaptativo (algoritmo de Vitter): los nodos estan numerados de forma que el peso
+# nunca baja al subir el numero y, entre los de igual peso, las hojas van antes que los internos.
+# Un simbolo que aun no aparecio se envia con el codigo de la hoja NYT seguido de sus 9 bits
+class ArbolVitter:
+    __slots__ = ("orden", "hojas", "nyt", "raiz")
+
+    def __init__(self, num_simbolos=SIMBOLO_FIN + 1):
+        self.orden = [None] * (2 * num_simbolos + 1) # numero -> nodo (hojas, internos y la NYT); la raiz tiene el mayor
+        self.raiz = self.nyt = NodoVitter(len(self.orden) - 1)
+        self.orden[-1] = self.raiz
+        self.hojas = {} # simbolo -> hoja
+
+    # Codigo actual del nodo como (valor, longitud), subiendo hasta la raiz
+    def codigo(self, nodo):
+        valor = longitud = 0
+        while nodo.padre is not None:
+            if nodo.padre.derecho is nodo:
+                valor |= 1 << longitud
+            longitud += 1
+            nodo = nodo.padre
+        return valor, longitud
+
+    # Intercambia dos nodos (con sus subarboles) en el arbol y en el orden
+    def intercambiar(self, a, b):
+        padre_a, padre_b = a.padre, b.padre
+        if padre_a is padre_b:
+            padre_a.izquierdo, padre_a.derecho = padre_a.derecho, padre_a.izquierdo
+        else:
+            if padre_a.izquierdo is a:
+                padre_a.izquierdo = b
+            else:
+                padre_a.derecho = b
+            if padre_b.izquierdo is b:
+                padre_b.izquierdo = a
+            else:
+                padre_b.derecho = a
+            a.padre, b.padre = padre_b, padre_a
+        a.numero, b.numero = b.numero, a.numero
+        self.orden[a.numero], self.orden[b.numero] = a, b
+
+    # Lider del bloque del nodo: el de mayor numero con el mismo peso y del mismo tipo (hoja o interno)
+    def lider(self, nodo):
+        orden, hoja = self.orden, nodo.izquierdo is None
+        numero = nodo.numero
+        while numero + 1 < len(orden) and orden[numero + 1].peso == nodo.peso and (orden[numero + 1].izquierdo is None) == hoja:
+            numero += 1
+        return orden[numero]
+
+    # Pasa el nodo por encima del bloque siguiente (los internos de su mismo peso si es hoja, las hojas
+    # de peso + 1 si es interno), le suma uno y retorna el proximo nodo a actualizar
+    def deslizar_e_incrementar(self, nodo):
+        padre_anterior = nodo.padre
+        hoja = nodo.izquierdo is None
+        lider = self.lider(nodo)
+        if lider is not nodo and lider is not nodo.padre:
+            self.intercambiar(nodo, lider)
+        orden = self.orden
+        peso_bloque = nodo.peso if hoja else nodo.peso + 1
+        while nodo.numero + 1 < len(orden):
+            siguiente = orden[nodo.numero + 1]
+            if siguiente.peso != peso_bloque or (siguiente.izquierdo is None) == hoja or siguiente is nodo.padre:
+                break
+            self.intercambiar(nodo, siguiente)
+        nodo.peso += 1
+        return nodo.padre if hoja else padre_anterior
+
+    # Actualiza el arbol despues de codificar o decodificar `simbolo`
+    def actualizar(self, simbolo):
+        hoja_pendiente = None
+        nodo = self.hojas.get(simbolo)
+        if nodo is None: # la hoja NYT se divide en una NYT nueva (izquierda) y la hoja del simbolo
+            nodo = self.nyt
+            nodo.izquierdo = self.nyt = NodoVitter(nodo.numero - 2, None, nodo)
+            nodo.derecho = hoja_pendiente = self.hojas[simbolo] = NodoVitter(nodo.numero - 1, simbolo, nodo)
+            self.orden[nodo.numero - 2], self.orden[nodo.numero - 1] = nodo.izquierdo, nodo.derecho
+        else:
+            lider = self.lider(nodo)
+            if lider is not nodo:
+                self.intercambiar(nodo, lider)
+            if nodo.padre is not None and nodo.padre.izquierdo is self.nyt: # hermano de la NYT: su padre va primero
+                hoja_pendiente = nodo
+                nodo = nodo.padre
+        while nodo is not None:
+            nodo = self.deslizar_e_incrementar(nodo)
+        if hoja_pendiente is not None:
+            self.deslizar_e_incrementar(hoja_pendiente)
+
+# Codificador de Huffman adaptativo: una sola pasada, empieza a escribir desde el primer byte y no
+# guarda tabla de frecuencias
+class CodificadorVitter:
+    __slots__ = ("arbol", "bits")
+
+    def __init__(self, bits=None):
+        self.arbol = ArbolVitter()
+        self.bits = BitWriter() if bits is None else bits
+
+    def codificar_simbolo(self, simbolo):
+        arbol = self.arbol
+        hoja = arbol.hojas.get(simbolo)
+        if hoja is None: # simbolo nuevo: codigo de la NYT y el simbolo
+            self.bits.write_bits(*arbol.codigo(arbol.nyt))
+            self.bits.write_bits(simbolo, BITS_SIMBOLO_VITTER)
+        else:
+            self.bits.write_bits(*arbol.codigo(hoja))
+        arbol.actualizar(simbolo)
+
+    # Codifica un bloque de bytes; se puede llamar tantas veces como se quiera
+    def codificar(self, datos):
+        for simbolo in datos:
+            self.codificar_simbolo(simbolo)
+
+    # Codifica el simbolo de fin (siempre nuevo) y retorna los bits
+    def finalizar(self):
+        self.codificar_simbolo(SIMBOLO_FIN)
+        return self.bits
+
+def codificar_huffman_adaptativo(datos):
+    codificador = CodificadorVitter()
+    codificador.codificar(datos)
+    return codificador.finalizar()
+
+# Generador que decodifica Huffman adaptativo y entrega los bytes en bloques de hasta `tam_bloque`
+def decodificar_huffman_adaptativo_bloques(lector, tam_bloque=1 << 16):
+    arbol = ArbolVitter()
+    bloque = bytearray()
+    while True:
+        nodo = arbol.raiz
+        while nodo.izquierdo is not None: # baja bit a bit hasta una hoja
+            nodo = nodo.derecho if lector.read_bit() else nodo.izquierdo
+        simbolo = lector.read_bits(BITS_SIMBOLO_VITTER) if nodo is arbol.nyt else nodo.simbolo
+        if simbolo == SIMBOLO_FIN:
+            break
+        if simbolo > SIMBOLO_FIN or lector.bits_restantes < 0:
+            raise ValueError("El archivo está truncado o no es Huffman adaptativo.")
+        arbol.actualizar(simbolo)
+        bloque.append(simbolo)
+        if len(bloque) & 0xFFF == 0: # cada 4096 bytes: un archivo truncado no se decodifica para siempre
+            lector.comprobar_relleno()
+        if len(bloque) >= tam_bloque:
+            yield bytes(bloque)
+            bloque.clear()
+    lector.comprobar_relleno()
+    if bloque:
+        yield bytes(bloque)
+
+def decodificar_huffman_adaptativo(mensaje_codificado):
+    if isinstance(mensaje_codificado, str):
+        mensaje_codificado = BitReader.from_bitstring(mensaje_codificado)
+    return b"".join(decodificar_huffman_adaptativo_bloques(mensaje_codificado))
 
 # Función para manejar la compresión automática
 def manejar_compresion_automatica_huffman(mensaje=None):
     if mensaje is None:
         mensaje = input("Introduce el mensaje a comprimir: ")
     
-    frecuencias = Counter(mensaje)
+    with etapa("frecuencias"):
+        frecuencias = Counter(mensaje)
     total_caracteres = len(mensaje)
     probabilidades = {caracter: freq / total_caracteres for caracter, freq in frecuencias.items()}
     
-    # Construir el arbol de Huffman
-    raiz_huffman = construir_arbol_huffman(frecuencias)
-    
-    # Generar los codigos de Huffman
-    codigos_huffman = generar_codigos_huffman(raiz_huffman)
+    # Construir el arbol de Huffman y generar los codigos en forma canonica
+    codigos_huffman = tabla_huffman_canonica(frecuencias)
     
     # Codificar el mensaje
-    mensaje_codificado = ''.join([codigos_huffman[caracter] for caracter in mensaje])
+    mensaje_codificado = codificar_huffman(mensaje, codigos_huffman)
     
     # Mostrar los resultados
     print("\n--- Compresión Automática ---")
-    print("Mensaje codificado:", mensaje_codificado)
+    print("Mensaje codificado:", mensaje_codificado.to_bitstring())
     print("Tabla de frecuencias:", frecuencias)
     print("Probabilidad de cada caracter:", probabilidades)
     print("Código de cada caracter:", codigos_huffman)
@@ -188,17 +970,49 @@ def manejar_compresion_automatica_huffman(mensaje=None):
 
     # Guardar los resultados en un archivo
     num_archivo = input("Introduce un número para el archivo de salida: ")
-    with open(f"codificacion{num_archivo}.log", "w", encoding='utf-8') as archivo:
-        archivo.write("Método: Huffman\n")
-        archivo.write("Modo: Automático\n")
-        archivo.write(f"Mensaje original: {mensaje}\n")
-        archivo.write(f"Mensaje codificado: {mensaje_codificado}\n")
-        archivo.write(f"Tabla de frecuencias: {frecuencias}\n")
-        archivo.write(f"Probabilidad de cada caracter: {probabilidades}\n")
-        archivo.write(f"Código de cada caracter: {codigos_huffman}\n")
-        archivo.write(f"Tasa de compresión: {len(mensaje_codificado) / (len(mensaje) * 8)}\n")
-        
+    longitudes = {caracter: len(codigo) for caracter, codigo in codigos_huffman.items()} # los codigos canonicos se reconstruyen con las longitudes
+    bytes_escritos = escribir_contenedor(f"codificacion{num_archivo}.log", METODO_HUFFMAN, MODO_AUTOMATICO, len(mensaje), 0, longitudes, mensaje_codificado)
+    print(f"Archivo guardado: {bytes_escritos} bytes (mensaje original: {len(mensaje.encode('utf-8'))} bytes)")
+
+
+# Funcion para manejar la compresion con varios flujos intercalados (decodificacion mas rapida)
+def manejar_compresion_intercalada_huffman(mensaje=None):
+    if mensaje is None:
+        mensaje = input("Introduce el mensaje a comprimir: ")
+
+    frecuencias = Counter(mensaje)
+    codigos_huffman = tabla_huffman_canonica(frecuencias) # una sola tabla para todos los flujos
+    flujos = codificar_huffman_intercalado(mensaje, codigos_huffman)
 
+    print(f"\n--- Compresión Intercalada ({len(flujos)} flujos) ---")
+    for numero, flujo in enumerate(flujos):
+        print(f"Flujo {numero}:", flujo.to_bitstring())
+    print("Código de cada caracter:", codigos_huffman)
+    print("Tasa de compresión:", sum(len(flujo) for flujo in flujos) / (len(mensaje) * 8) if mensaje else 0)
+
+    num_archivo = input("Introduce un número para el archivo de salida: ")
+    longitudes = {caracter: len(codigo) for caracter, codigo in codigos_huffman.items()}
+    bytes_escritos = escribir_contenedor(f"codificacion{num_archivo}.log", METODO_HUFFMAN, MODO_INTERCALADO, len(mensaje), 0, longitudes, flujos)
+    print(f"Archivo guardado: {bytes_escritos} bytes (mensaje original: {len(mensaje.encode('utf-8'))} bytes)")
+
+
+# Compresion de Huffman adaptativa (Vitter): el arbol se actualiza con cada byte, no se guarda la tabla
+def manejar_compresion_adaptativa_huffman(mensaje=None):
+    if mensaje is None:
+        mensaje = input("Introduce el mensaje a comprimir: ")
+
+    datos = mensaje.encode("utf-8") # el arbol adaptativo trabaja sobre bytes
+    mensaje_codificado = codificar_huffman_adaptativo(datos)
+    bits_estatico = len(codificar_huffman(datos, tabla_huffman_canonica(Counter(datos)))) if datos else 0
+
+    print("\n--- Compresión Adaptativa (Vitter) ---")
+    print("Mensaje codificado:", mensaje_codificado.to_bitstring())
+    print("Tasa de compresión:", len(mensaje_codificado) / (len(datos) * 8) if datos else 0)
+    print("Tasa de Huffman estático (sin la tabla):", bits_estatico / (len(datos) * 8) if datos else 0)
+
+    num_archivo = input("Introduce un número para el archivo de salida: ")
+    bytes_escritos = escribir_contenedor(f"codificacion{num_archivo}.log", METODO_HUFFMAN, MODO_ADAPTATIVO, 0, 0, {}, mensaje_codificado)
+    print(f"Archivo guardado: {bytes_escritos} bytes (mensaje original: {len(datos)} bytes)")
 
 # Funcion para manejar la compresion no automatica
 def manejar_compresion_no_automatica_huffman():
@@ -260,25 +1074,21 @@ def manejar_compresion_no_automatica_huffman():
 
     try:
         # Si todo es correcto, construir el arbol de Huffman
-        raiz_huffman = construir_arbol_huffman(frecuencias_usuario)
-        codigos_huffman = generar_codigos_huffman(raiz_huffman)
+        codigos_huffman = tabla_huffman_canonica(frecuencias_usuario)
         
         # Codificar el mensaje
-        mensaje_codificado = ''.join([codigos_huffman[caracter] for caracter in mensaje])
+        mensaje_codificado = codificar_huffman(mensaje, codigos_huffman)
         
         # Mostrar los resultados
         print("\n--- Compresión No Automática ---")
-        print("Mensaje codificado:", mensaje_codificado)
+        print("Mensaje codificado:", mensaje_codificado.to_bitstring())
         print("Código de cada caracter:", codigos_huffman)
 
         # Guardar los resultados en un archivo
         num_archivo = input("Introduce un número para el archivo de salida: ")
-        with open(f"codificacion{num_archivo}.log", "w", encoding='utf-8') as archivo:
-            archivo.write("Método: Huffman\n")
-            archivo.write("Modo: No Automático\n")
-            archivo.write(f"Mensaje original: {mensaje}\n")
-            archivo.write(f"Mensaje codificado: {mensaje_codificado}\n")
-            archivo.write(f"Código de cada caracter: {codigos_huffman}\n")
+        longitudes = {caracter: len(codigo) for caracter, codigo in codigos_huffman.items()}
+        bytes_escritos = escribir_contenedor(f"codificacion{num_archivo}.log", METODO_HUFFMAN, MODO_NO_AUTOMATICO, len(mensaje), 0, longitudes, mensaje_codificado)
+        print(f"Archivo guardado: {bytes_escritos} bytes (mensaje original: {len(mensaje.encode('utf-8'))} bytes)")
 
     except ValueError as e: #pasar a codificacion automatica si no se ingreso correctamente la tabla de frecuencias
         print(f"Error: {e}")
@@ -286,40 +1096,157 @@ def manejar_compresion_no_automatica_huffman():
         manejar_compresion_automatica_huffman(mensaje)
 
 
-def decodificar_huffman(mensaje_codificado, codigos):
-    mensaje_decodificado = ""
-    codigo_actual = ""
-    
-    for bit in mensaje_codificado: # Itera sobre cada bit del mensaje codificado
-        codigo_actual += bit # Agrega el bit actual al codigo actual
-        for caracter, codigo in codigos.items(): # Busca el codigo actual en el diccionario de codigos
-            if codigo == codigo_actual: # Si hay una coincidencia
-                mensaje_decodificado += caracter # Agrega el caracter al mensaje decodificado
-                codigo_actual = "" # Reinicia el codigo actual
-                break
-    
-    return mensaje_decodificado # Retorna el mensaje decodificado
+# Funcion para decodificar hasta n simbolos del lector con las tablas de construir_tabla_huffman
+def decodificar_simbolos_huffman(lector, tabla, n):
+    ancho = tabla["ancho"]
+    simple, multiple, largos = tabla["simple"], tabla["multiple"], tabla["largos"]
+    longitud_max = tabla["longitud_max"]
+
+    # Buffer de salida reservado de antemano
+    mensaje_decodificado = [None] * n
+    escritos = 0
+
+    while escritos < n and lector.bits_restantes > 0:
+        bloque = lector.peek_bits(longitud_max) # siguientes bits (ceros despues del final)
+        ventana = bloque >> (longitud_max - ancho)
+        restantes = lector.bits_restantes
+
+        caracteres, usados = multiple[ventana]
+        if usados and usados <= restantes and len(caracteres) <= n - escritos:
+            mensaje_decodificado[escritos:escritos + len(caracteres)] = caracteres # varios caracteres por consulta
+            escritos += len(caracteres)
+        else:
+            entrada = simple[ventana]
+            if entrada is None:
+                raise ValueError(f"Código de Huffman no válido en el bit {lector.posicion}.")
+            caracter, usados = entrada
+            if usados == 0: # codigo mas largo que la ventana: se busca longitud por longitud
+                for longitud in range(ancho + 1, longitud_max + 1):
+                    caracter = largos.get((longitud, bloque >> (longitud_max - longitud)))
+                    if caracter is not None:
+                        usados = longitud
+                        break
+                else:
+                    raise ValueError(f"Código de Huffman no válido en el bit {lector.posicion}.")
+            if usados > restantes:
+                break # bits sobrantes al final que no forman un codigo completo
+            mensaje_decodificado[escritos] = caracter
+            escritos += 1
+
+        lector.skip_bits(usados)
+
+    if escritos < n:
+        del mensaje_decodificado[escritos:]
+    return mensaje_decodificado
+
+def decodificar_huffman(mensaje_codificado, codigos, n=None):
+    tabla = construir_tabla_huffman(codigos)
+    if isinstance(mensaje_codificado, str): # acepta tambien una cadena de '0'/'1'
+        mensaje_codificado = BitReader.from_bitstring(mensaje_codificado)
+    if n is None:
+        n = mensaje_codificado.bits_restantes // tabla["longitud_min"] # cota superior de caracteres
+    with etapa("decodificacion_huffman"):
+        return ''.join(decodificar_simbolos_huffman(mensaje_codificado, tabla, n)) # Retorna el mensaje decodificado
+
+# Funcion para decodificar `n` simbolos de una carga con varios flujos intercalados (bits_flujos: bits de
+# cada flujo, cada uno empieza en un byte nuevo). En cada vuelta se avanza un cursor por flujo; los flujos
+# no dependen entre si y el estado de cada cursor (acumulador y bits) se maneja sin llamadas a metodos
+def decodificar_simbolos_huffman_intercalado(carga, bits_flujos, tabla, n):
+    ancho = tabla["ancho"]
+    simple, multiple, largos = tabla["simple"], tabla["multiple"], tabla["largos"]
+    longitud_max = tabla["longitud_max"]
+    mascara = (1 << ancho) - 1
+    datos = memoryview(carga).cast("B")
+    num_flujos = len(bits_flujos)
+
+    posiciones = [] # siguiente byte a cargar de cada flujo
+    inicio = 0
+    for bits_flujo in bits_flujos:
+        posiciones.append(inicio)
+        inicio += (bits_flujo + 7) // 8
+    if inicio > len(datos):
+        raise ValueError("El archivo está truncado.")
+    finales = posiciones[1:] + [inicio] # cada flujo termina donde empieza el siguiente
+    acumuladores = [0] * num_flujos
+    bits_acumulados = [0] * num_flujos
+    restantes = list(bits_flujos) # bits validos que le quedan a cada flujo
+    pendientes = [(n - flujo + num_flujos - 1) // num_flujos for flujo in range(num_flujos)] # simbolos por flujo
+    salidas = [[] for _ in range(num_flujos)]
+
+    activos = [flujo for flujo in range(num_flujos) if pendientes[flujo] > 0]
+    while activos:
+        for flujo in tuple(activos):
+            acumulador, disponibles = acumuladores[flujo], bits_acumulados[flujo]
+            while disponibles < longitud_max: # recarga 7 bytes de una vez (ceros despues del final del flujo)
+                posicion = posiciones[flujo]
+                trozo = bytes(datos[posicion:min(posicion + 7, finales[flujo])]).ljust(7, b"\0")
+                posiciones[flujo] = posicion + 7
+                acumulador = (acumulador << 56) | int.from_bytes(trozo, "big")
+                disponibles += 56
+
+            ventana = (acumulador >> (disponibles - ancho)) & mascara
+            caracteres, usados = multiple[ventana]
+            if usados and usados <= restantes[flujo] and len(caracteres) <= pendientes[flujo]:
+                salidas[flujo] += caracteres # varios caracteres por consulta
+                pendientes[flujo] -= len(caracteres)
+            else:
+                entrada = simple[ventana]
+                if entrada is None:
+                    raise ValueError(f"Código de Huffman no válido en el flujo {flujo}.")
+                caracter, usados = entrada
+                if usados == 0: # codigo mas largo que la ventana: se busca longitud por longitud
+                    bloque = (acumulador >> (disponibles - longitud_max)) & ((1 << longitud_max) - 1)
+                    for longitud in range(ancho + 1, longitud_max + 1):
+                        caracter = largos.get((longitud, bloque >> (longitud_max - longitud)))
+                        if caracter is not None:
+                            usados = longitud
+                            break
+                    else:
+                        raise ValueError(f"Código de Huffman no válido en el flujo {flujo}.")
+                if usados > restantes[flujo]:
+                    raise ValueError(f"El flujo {flujo} termina antes de lo esperado.")
+                salidas[flujo].append(caracter)
+                pendientes[flujo] -= 1
+
+            disponibles -= usados
+            acumuladores[flujo] = acumulador & ((1 << disponibles) - 1)
+            bits_acumulados[flujo] = disponibles
+            restantes[flujo] -= usados
+            if pendientes[flujo] == 0:
+                activos.remove(flujo)
+
+    mensaje_decodificado = [None] * n
+    for flujo, salida in enumerate(salidas):
+        mensaje_decodificado[flujo::num_flujos] = salida # vuelve a intercalar los flujos
+    return mensaje_decodificado
+
+# Funcion para decodificar un mensaje codificado con codificar_huffman_intercalado
+def decodificar_huffman_intercalado(carga, bits_flujos, codigos, n):
+    if n == 0:
+        return ""
+    tabla = construir_tabla_huffman(codigos)
+    return ''.join(decodificar_simbolos_huffman_intercalado(carga, bits_flujos, tabla, n))
 
 def decodificar_huffman_desde_archivo():
     nombre_archivo = input("Introduce el nombre del archivo .log: ")
     try: # Intenta abrir el archivo en modo lectura
-        with open(nombre_archivo, 'r', encoding='utf-8') as archivo:
-            contenido = archivo.read() # Lee todo el contenido del archivo
-        
-        datos = {} # Diccionario para almacenar los datos extraidos
-        for linea in contenido.split('\n'): 
-            if ': ' in linea: # Si la linea contiene un par clave-valor
-                clave, valor = linea.split(': ', 1) # Divide la línea en clave y valor
-                datos[clave] = valor # Agrega el par al diccionario
-        
-        mensaje_codificado = datos.get('Mensaje codificado')  # Extrae el mensaje codificado y los cdigos de Huffman del diccionario
-        codigos = ast.literal_eval(datos.get('Código de cada caracter', '{}'))
-        
-        if not mensaje_codificado or not codigos: # Verifica si se encontro la información necesaria para la decodficacion
+        datos = leer_contenedor(nombre_archivo) # Lee la cabecera, el modelo y los bits del archivo
+
+        if datos["metodo"] == METODO_HUFFMAN and datos["modo"] == MODO_ADAPTATIVO: # el arbol se reconstruye al decodificar
+            mensaje_codificado = BitReader(datos["carga"], datos["num_bits"])
+            print("Mensaje decodificado:", decodificar_huffman_adaptativo(mensaje_codificado).decode("utf-8"))
+            return
+
+        if datos["metodo"] != METODO_HUFFMAN or not datos["modelo"]: # Verifica si se encontro la información necesaria para la decodficacion
             print("Error: No se encontró la información necesaria en el archivo.")
             return
-        
-        mensaje_decodificado = decodificar_huffman(mensaje_codificado, codigos) #muestra la decodificacnio del mensaje 
+
+        codigos = codigos_canonicos(validar_longitudes(datos["modelo"])) # reconstruye los codigos a partir de las longitudes
+        if datos["modo"] == MODO_INTERCALADO: # varios flujos, con sus tamaños en la cabecera
+            mensaje_decodificado = decodificar_huffman_intercalado(datos["carga"], datos["parametros"], codigos, datos["n"])
+        else:
+            mensaje_codificado = BitReader(datos["carga"], datos["num_bits"]) # lee los bits directamente de la carga
+            mensaje_decodificado = decodificar_huffman(mensaje_codificado, codigos, datos["n"]) #muestra la decodificacnio del mensaje 
         print("Mensaje decodificado:", mensaje_decodificado)
     except FileNotFoundError:
         print(f"Error: No se encontró el archivo '{nombre_archivo}'.")
@@ -333,9 +1260,10 @@ def manejar_compresion_automatica_aritmetica(mensaje=None):
     if mensaje is None:
         mensaje = input("Introduce el mensaje a comprimir: ")
 
-    frecuencias = Counter(mensaje)
-    k = 8  # Tamaño de los enteros en bits (definido por nosotros)
+    with etapa("frecuencias"):
+        frecuencias = Counter(mensaje)
     T = sum(frecuencias.values())  # Total de frecuencias
+    k = max(8, T.bit_length() + 2)  # Tamaño de los enteros en bits: el rango debe ser al menos 4T
     n = len(mensaje)  # Tamaño del mensaje
 
     # Codificar el mensaje usando codificación aritmetica con enteros
@@ -348,7 +1276,7 @@ def manejar_compresion_automatica_aritmetica(mensaje=None):
 
     # Mostrar los resultados
     print("\n--- Compresión Aritmética Automática ---")
-    print("Mensaje codificado:", ''.join(map(str, bits_codificados)))
+    print("Mensaje codificado:", bits_codificados.to_bitstring())
     print("Tabla de frecuencias:", frecuencias)
     print(f"k (bits por carácter): {k}")
     print(f"T (total de frecuencias): {T}")
@@ -357,16 +1285,8 @@ def manejar_compresion_automatica_aritmetica(mensaje=None):
 
     # Guardar los resultados en un archivo
     num_archivo = input("Introduce un número para el archivo de salida: ")
-    with open(f"codificacion{num_archivo}.log", "w", encoding='utf-8') as archivo:
-        archivo.write("Método: Aritmética\n")
-        archivo.write("Modo: Automático\n")
-        archivo.write(f"Mensaje original: {mensaje}\n")
-        archivo.write(f"Mensaje codificado (en bits): {''.join(map(str, bits_codificados))}\n")
-        archivo.write(f"Tabla de frecuencias: {frecuencias}\n")
-        archivo.write(f"k (bits por carácter): {k}\n")
-        archivo.write(f"T (total de frecuencias): {T}\n")
-        archivo.write(f"n (longitud del mensaje): {n}\n")
-        archivo.write(f"Tasa de compresión: {tasa_compresion}\n")
+    bytes_escritos = escribir_contenedor(f"codificacion{num_archivo}.log", METODO_ARITMETICA, MODO_AUTOMATICO, n, k, frecuencias, bits_codificados)
+    print(f"Archivo guardado: {bytes_escritos} bytes (mensaje original: {len(mensaje.encode('utf-8'))} bytes)")
 
 def manejar_compresion_no_automatica_aritmetica():
     mensaje = input("Introduce el mensaje a comprimir: ")
@@ -429,9 +1349,9 @@ def manejar_compresion_no_automatica_aritmetica():
 
     T = sum(frecuencias_usuario.values())
 
-    # Validacion de k: debe cumplir que k >= 4T
-    if k < 4 * T:
-        print(f"Error: El valor de k debe ser al menos 4T (T = {T}). k debe ser >= {4 * T}.")
+    # Validacion de k: el rango de los enteros de k bits debe ser al menos 4T (2^k >= 4T)
+    if (1 << k) < 4 * T:
+        print(f"Error: 2^k debe ser al menos 4T (T = {T}). k debe ser >= {(4 * T - 1).bit_length()}.")
         print("Pasando a compresión automática con el mismo mensaje...")
         manejar_compresion_automatica_aritmetica(mensaje)  # Llamar al modo automatico con el mismo mensaje
         return
@@ -446,7 +1366,7 @@ def manejar_compresion_no_automatica_aritmetica():
 
     # Mostrar los resultados
     print("\n--- Compresión No Automática (Aritmética con Enteros) ---")
-    print("Mensaje codificado (en bits):", ''.join(map(str, bits_codificados)))
+    print("Mensaje codificado (en bits):", bits_codificados.to_bitstring())
     print("Tabla de frecuencias:", frecuencias_usuario)
     print(f"k (bits por carácter): {k}")
     print(f"T (total de frecuencias): {T}")
@@ -455,39 +1375,104 @@ def manejar_compresion_no_automatica_aritmetica():
 
     # Guardar los resultados en un archivo
     num_archivo = input("Introduce un número para el archivo de salida: ")
-    with open(f"codificacion{num_archivo}.log", "w", encoding='utf-8') as archivo:
-        archivo.write("Método: Aritmética\n")
-        archivo.write("Modo: No Automático\n")
-        archivo.write(f"Mensaje original: {mensaje}\n")
-        archivo.write(f"Mensaje codificado (en bits): {''.join(map(str, bits_codificados))}\n")
-        archivo.write(f"Tabla de frecuencias: {frecuencias_usuario}\n")
-        archivo.write(f"k (bits por carácter): {k}\n")
-        archivo.write(f"T (total de frecuencias): {T}\n")
-        archivo.write(f"n (longitud del mensaje): {n}\n")
-        archivo.write(f"Tasa de compresión: {tasa_compresion}\n")
-
-def parse_counter(counter_string):
-    pairs = re.findall(r"'(.)':\s*(\d+)", counter_string)  # Usa expresiones regulares para encontrar todos los pares de caracteres y frecuencias
-    return {key: int(value) for key, value in pairs} # Crea un diccionario a partir de los pares encontrados, convirtiendo las frecuencias a enteros
+    bytes_escritos = escribir_contenedor(f"codificacion{num_archivo}.log", METODO_ARITMETICA, MODO_NO_AUTOMATICO, n, k, frecuencias_usuario, bits_codificados)
+    print(f"Archivo guardado: {bytes_escritos} bytes (mensaje original: {len(mensaje.encode('utf-8'))} bytes)")
+
+# Compresion aritmetica adaptativa: el modelo se actualiza con cada simbolo, no hace falta la tabla
+def manejar_compresion_adaptativa_aritmetica(mensaje=None):
+    if mensaje is None:
+        mensaje = input("Introduce el mensaje a comprimir: ")
+
+    datos = mensaje.encode("utf-8") # el modelo adaptativo trabaja sobre bytes
+    k = K_ADAPTATIVO
+    bits_codificados = int_arith_code_adaptativo(datos, k)
+    tasa_compresion = len(bits_codificados) / (len(datos) * 8) if datos else 0
+
+    # Mostrar los resultados
+    print("\n--- Compresión Aritmética Adaptativa ---")
+    print("Mensaje codificado (en bits):", bits_codificados.to_bitstring())
+    print(f"k (bits por carácter): {k}")
+    print(f"Tasa de compresión: {tasa_compresion}")
+
+    # Guardar los resultados en un archivo (sin tabla de frecuencias ni longitud del mensaje)
+    num_archivo = input("Introduce un número para el archivo de salida: ")
+    bytes_escritos = escribir_contenedor(f"codificacion{num_archivo}.log", METODO_ARITMETICA, MODO_ADAPTATIVO, 0, k, {}, bits_codificados)
+    print(f"Archivo guardado: {bytes_escritos} bytes (mensaje original: {len(datos)} bytes)")
+
+# Compresion aritmetica con contexto de orden 1 o 2: cada byte se modela segun los anteriores
+def manejar_compresion_contexto_aritmetica(mensaje=None, orden=None):
+    if mensaje is None:
+        mensaje = input("Introduce el mensaje a comprimir: ")
+    if orden is None:
+        orden = input("Introduce el orden del contexto (1 o 2): ").strip()
+    try:
+        orden = int(orden)
+        datos = mensaje.encode("utf-8")
+        k = K_ADAPTATIVO
+        bits_codificados = int_arith_code_contexto(datos, k, orden)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return
+    tasa_compresion = len(bits_codificados) / (len(datos) * 8) if datos else 0
+
+    print(f"\n--- Compresión Aritmética con Contexto (orden {orden}) ---")
+    print("Mensaje codificado (en bits):", bits_codificados.to_bitstring())
+    print(f"k (bits por carácter): {k}")
+    print(f"Tasa de compresión: {tasa_compresion}")
+
+    # El orden y el maximo de contextos van en la cabecera para que el decodificador arme el mismo modelo
+    num_archivo = input("Introduce un número para el archivo de salida: ")
+    bytes_escritos = escribir_contenedor(f"codificacion{num_archivo}.log", METODO_ARITMETICA, MODO_CONTEXTO, 0, k, {}, bits_codificados, parametros=(orden, MAX_CONTEXTOS))
+    print(f"Archivo guardado: {bytes_escritos} bytes (mensaje original: {len(datos)} bytes)")
+
+# Funcion para manejar la compresion con el codificador de rango (renormaliza de a bytes)
+def manejar_compresion_rango(mensaje=None):
+    if mensaje is None:
+        mensaje = input("Introduce el mensaje a comprimir: ")
+
+    frecuencias = Counter(mensaje)
+    T = sum(frecuencias.values())
+    k = k_rango(T) # ancho del rango: T debe caber en 2^(k-8)
+    n = len(mensaje)
+    bits_codificados = int_range_code(mensaje, k, frecuencias)
+    tasa_compresion = len(bits_codificados) / (n * 8) if n else 0
+
+    print("\n--- Compresión por Rango ---")
+    print("Mensaje codificado:", bits_codificados.to_bitstring())
+    print("Tabla de frecuencias:", frecuencias)
+    print(f"k (bits del rango): {k}")
+    print(f"n (longitud del mensaje): {n}")
+    print(f"Tasa de compresión: {tasa_compresion}")
+
+    num_archivo = input("Introduce un número para el archivo de salida: ")
+    bytes_escritos = escribir_contenedor(f"codificacion{num_archivo}.log", METODO_RANGO, MODO_AUTOMATICO, n, k, frecuencias, bits_codificados)
+    print(f"Archivo guardado: {bytes_escritos} bytes (mensaje original: {len(mensaje.encode('utf-8'))} bytes)")
 
 def decodificar_aritmetica_desde_archivo():
     nombre_archivo = input("Introduce el nombre del archivo .log: ")
     try:  # Intenta abrir el archivo en modo lectura
-        with open(nombre_archivo, 'r', encoding='utf-8') as archivo:
-            contenido = archivo.read() # Lee todo el contenido del archivo
-        
-        datos = {}  # Diccionario para almacenar los datos extraidos
-        for linea in contenido.split('\n'):
-            if ': ' in linea:
-                clave, valor = linea.split(': ', 1)
-                datos[clave] = valor
-        
-        mensaje_codificado = datos.get('Mensaje codificado (en bits)') # Extrae el mensaje codificado y los parámetros k y n del diccionario
-        k = int(datos.get('k (bits por carácter)'))
-        n = int(datos.get('n (longitud del mensaje)'))
-        frecuencias = parse_counter(datos.get('Tabla de frecuencias', ''))
-        
-        if not all([mensaje_codificado, k, n, frecuencias]):
+        datos = leer_contenedor(nombre_archivo) # Lee la cabecera, el modelo y los bits del archivo
+
+        mensaje_codificado = BitReader(datos["carga"], datos["num_bits"]) # Extrae el mensaje codificado y los parámetros k y n
+        k = datos["k"]
+        n = datos["n"]
+        frecuencias = datos["modelo"]
+
+        if datos["metodo"] == METODO_ARITMETICA and datos["modo"] == MODO_ADAPTATIVO: # el modelo se reconstruye al decodificar
+            mensaje_decodificado = int_arith_decode_adaptativo(mensaje_codificado, k).decode("utf-8")
+            print("Mensaje decodificado:", mensaje_decodificado)
+            return
+
+        if datos["metodo"] == METODO_ARITMETICA and datos["modo"] == MODO_CONTEXTO: # orden y maximo de contextos en la cabecera
+            orden, max_contextos = datos["parametros"]
+            print("Mensaje decodificado:", int_arith_decode_contexto(mensaje_codificado, k, orden, max_contextos).decode("utf-8"))
+            return
+
+        if datos["metodo"] == METODO_RANGO and n and frecuencias: # renormalizacion de a bytes
+            print("Mensaje decodificado:", int_range_decode(mensaje_codificado, k, n, frecuencias))
+            return
+
+        if datos["metodo"] != METODO_ARITMETICA or not all([datos["num_bits"], k, n, frecuencias]):
             print("Error: No se encontró toda la información necesaria en el archivo.")
             return
         
@@ -501,14 +1486,60 @@ def decodificar_aritmetica_desde_archivo():
         traceback.print_exc()  # Esto imprime el traceback completo para depuracion
 
 
+# Funcion para manejar la compresion con ANS (`metodo` es METODO_TANS o METODO_RANS)
+def manejar_compresion_ans(metodo, mensaje=None):
+    if mensaje is None:
+        mensaje = input("Introduce el mensaje a comprimir: ")
+
+    frecuencias = Counter(mensaje) # la misma tabla de frecuencias que Huffman y aritmetica
+    precision = precision_ans(frecuencias) # las frecuencias se escalan a 2^precision
+    n = len(mensaje)
+
+    if metodo == METODO_TANS:
+        bits_codificados = codificar_tans(mensaje, frecuencias, precision)
+    else:
+        carga = codificar_rans(mensaje, frecuencias, precision)
+        bits_codificados = BitWriter()
+        bits_codificados.write_bits(int.from_bytes(carga, "big"), len(carga) * 8) # rANS produce bytes completos
+
+    print(f"\n--- Compresión {NOMBRES_METODOS[metodo]} ---")
+    print("Mensaje codificado:", bits_codificados.to_bitstring())
+    print("Tabla de frecuencias:", frecuencias)
+    print(f"Precisión de las frecuencias: {precision} bits")
+    print(f"n (longitud del mensaje): {n}")
+    print("Tasa de compresión:", len(bits_codificados) / (n * 8) if n else 0)
+
+    num_archivo = input("Introduce un número para el archivo de salida: ")
+    bytes_escritos = escribir_contenedor(f"codificacion{num_archivo}.log", metodo, MODO_AUTOMATICO, n, precision, frecuencias, bits_codificados)
+    print(f"Archivo guardado: {bytes_escritos} bytes (mensaje original: {len(mensaje.encode('utf-8'))} bytes)")
+
+def decodificar_ans_desde_archivo():
+    nombre_archivo = input("Introduce el nombre del archivo .log: ")
+    try:
+        datos = leer_contenedor(nombre_archivo) # Lee la cabecera, el modelo y los bits del archivo
+        if datos["metodo"] not in (METODO_TANS, METODO_RANS) or (datos["n"] and not datos["modelo"]):
+            print("Error: No se encontró la información necesaria en el archivo.")
+            return
+
+        decodificar_simbolos = decodificar_simbolos_tans if datos["metodo"] == METODO_TANS else decodificar_simbolos_rans
+        mensaje_decodificado = ''.join(decodificar_simbolos(datos["carga"], datos["n"], datos["modelo"], datos["k"]))
+        print("Mensaje decodificado:", mensaje_decodificado)
+    except FileNotFoundError:
+        print(f"Error: No se encontró el archivo '{nombre_archivo}'.")
+    except Exception as e:
+        print(f"Error al procesar el archivo: {e}")
+
+
 # Funcion para mostrar el submenu para Huffman
 def mostrar_submenu_huffman():
     while True:
         print("\n--- Submenú Huffman ---")
         print("1. Codificación automática")
         print("2. Codificación no automática")
-        print("3. Decodificación")
-        print("4. Volver al menú principal")
+        print(f"3. Codificación intercalada ({FLUJOS_HUFFMAN} flujos)")
+        print("4. Codificación adaptativa (Vitter, una pasada)")
+        print("5. Decodificación")
+        print("6. Volver al menú principal")
         
         opcion = input("Selecciona una opción: ").strip()
         
@@ -517,8 +1548,12 @@ def mostrar_submenu_huffman():
         elif opcion == "2":
             manejar_compresion_no_automatica_huffman()
         elif opcion == "3":
-            decodificar_huffman_desde_archivo()
+            manejar_compresion_intercalada_huffman()
         elif opcion == "4":
+            manejar_compresion_adaptativa_huffman()
+        elif opcion == "5":
+            decodificar_huffman_desde_archivo()
+        elif opcion == "6":
              break 
         else:
             print("Opción no válida. Intenta de nuevo.")
@@ -530,8 +1565,11 @@ def mostrar_submenu_aritmetica():
         print("\n--- Submenú Aritmética ---")
         print("1. Codificación automática")
         print("2. Codificación no automática")
-        print("3. Decodificación")
-        print("4. Volver al menú principal")
+        print("3. Codificación adaptativa (una pasada)")
+        print("4. Codificación por rango (de a bytes)")
+        print("5. Codificación con contexto (orden 1 o 2)")
+        print("6. Decodificación")
+        print("7. Volver al menú principal")
         
         
         opcion = input("Selecciona una opción: ").strip()
@@ -541,7 +1579,35 @@ def mostrar_submenu_aritmetica():
         elif opcion == "2":
             manejar_compresion_no_automatica_aritmetica()
         elif opcion == "3":
+            manejar_compresion_adaptativa_aritmetica()
+        elif opcion == "4":
+            manejar_compresion_rango()
+        elif opcion == "5":
+            manejar_compresion_contexto_aritmetica()
+        elif opcion == "6":
             decodificar_aritmetica_desde_archivo()
+        elif opcion == "7":
+            break
+        else:
+            print("Opción no válida. Intenta de nuevo.")
+
+# Funcion para mostrar el submenu de ANS
+def mostrar_submenu_ans():
+    while True:
+        print("\n--- Submenú ANS ---")
+        print("1. Codificación tANS (por tablas)")
+        print("2. Codificación rANS (por bytes)")
+        print("3. Decodificación")
+        print("4. Volver al menú principal")
+
+        opcion = input("Selecciona una opción: ").strip()
+
+        if opcion == "1":
+            manejar_compresion_ans(METODO_TANS)
+        elif opcion == "2":
+            manejar_compresion_ans(METODO_RANS)
+        elif opcion == "3":
+            decodificar_ans_desde_archivo()
         elif opcion == "4":
             break
         else:
@@ -553,7 +1619,8 @@ def mostrar_menu_principal():
         print("\n--- Menú Principal ---")
         print("1. Huffman")
         print("2. Aritmética")  
-        print("3. Salir")
+        print("3. ANS (tANS / rANS)")
+        print("4. Salir")
         
         opcion = input("Selecciona una opción: ").strip()
         
@@ -562,6 +1629,8 @@ def mostrar_menu_principal():
         elif opcion == "2":
             mostrar_submenu_aritmetica()  
         elif opcion == "3":
+            mostrar_submenu_ans()
+        elif opcion == "4":
             print("Saliendo del programa...")
             break
         else:
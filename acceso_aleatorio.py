@@ -0,0 +1,79 @@
+# Lectura de un rango de bytes de un archivo por bloques sin descomprimirlo entero: con el indice
+# se buscan los bloques que se cruzan con el rango y solo esos se decodifican
+import argparse
+import sys
+from bisect import bisect_right
+
+from compresion_flujo import descomprimir_bytes
+from contenedor import leer_indice_bloques
+
+# Archivo por bloques abierto para lecturas parciales; el indice y los modelos compartidos
+# se leen una sola vez al abrirlo y se reutilizan en cada lectura
+class ArchivoBloques:
+    def __init__(self, ruta):
+        self.archivo = open(ruta, "rb")
+        try:
+            self.entradas, self.modelos = leer_indice_bloques(self.archivo)
+        except Exception:
+            self.archivo.close()
+            raise
+        self.inicios = [entrada[0] for entrada in self.entradas] # offsets originales, en orden
+        self.tamano = self.inicios[-1] + self.entradas[-1][1] if self.entradas else 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.close()
+
+    def close(self):
+        self.archivo.close()
+
+    # Decodifica el bloque `indice` del indice
+    def leer_bloque(self, indice):
+        _, tam_original, offset_comprimido, tam_comprimido, numero_modelo = self.entradas[indice]
+        self.archivo.seek(offset_comprimido)
+        datos = descomprimir_bytes(self.archivo.read(tam_comprimido), self.modelos[numero_modelo - 1] if numero_modelo else None)
+        if len(datos) != tam_original:
+            raise ValueError("El tamaño de un bloque no coincide con el índice.")
+        return datos
+
+    # Retorna los bytes originales [inicio, inicio + longitud); el rango se recorta al final del archivo
+    def leer_rango(self, inicio, longitud):
+        if inicio < 0 or longitud < 0:
+            raise ValueError("El inicio y la longitud no pueden ser negativos.")
+        fin = min(inicio + longitud, self.tamano)
+        if inicio >= fin:
+            return b""
+        partes = []
+        indice = bisect_right(self.inicios, inicio) - 1 # bloque que contiene `inicio`
+        while indice < len(self.entradas) and self.inicios[indice] < fin:
+            offset_original = self.inicios[indice]
+            datos = self.leer_bloque(indice)
+            partes.append(datos[max(inicio - offset_original, 0):fin - offset_original])
+            indice += 1
+        return b"".join(partes)
+
+# Lee un rango de un archivo por bloques (abre el archivo y lee el indice en cada llamada;
+# para varias lecturas conviene usar ArchivoBloques directamente)
+def leer_rango(ruta, inicio, longitud):
+    with ArchivoBloques(ruta) as archivo:
+        return archivo.leer_rango(inicio, longitud)
+
+def main():
+    parser = argparse.ArgumentParser(description="Lee un rango de bytes de un archivo comprimido por bloques.")
+    parser.add_argument("entrada")
+    parser.add_argument("inicio", type=int)
+    parser.add_argument("longitud", type=int)
+    parser.add_argument("--salida", help="archivo donde escribir el rango (por defecto la salida estándar)")
+    argumentos = parser.parse_args()
+
+    datos = leer_rango(argumentos.entrada, argumentos.inicio, argumentos.longitud)
+    if argumentos.salida:
+        with open(argumentos.salida, "wb") as salida:
+            salida.write(datos)
+    else:
+        sys.stdout.buffer.write(datos)
+
+if __name__ == "__main__":
+    main()
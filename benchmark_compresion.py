@@ -0,0 +1,503 @@
+import argparse # modulo para leer los argumentos de la linea de comandos
+import bz2 # compresores de la biblioteca estandar, como referencia
+import filecmp # modulo para comparar el archivo original con el descomprimido
+import json # resultados de la bateria de pruebas
+import lzma
+import math # entropia del mensaje de prueba
+import os
+import platform
+import random # modulo para generar los mensajes de prueba
+import struct # registros del corpus binario
+import tempfile # modulo para los archivos temporales de las pruebas con archivos
+import time # modulo para medir el tiempo de cada prueba
+import tracemalloc # pico de memoria de cada caso
+import zlib
+from collections import Counter
+
+import huffman_vectorizado
+import Lab3_Codificacion_SergioCardona as lab3
+from bits_io import BitReader, BitWriter
+from cache_modelos import CacheModelos, entrenar_modelo
+from codificacion_ans import (
+    codificar_rans, codificar_tans, decodificar_simbolos_rans, decodificar_simbolos_tans, precision_ans,
+)
+from compresion_flujo import METODOS_FLUJO, comprimir_bytes, descomprimir_bytes, modelo_de_cabecera
+from compresion_paralela import comprimir_archivo_paralelo, descomprimir_archivo_paralelo
+from contenedor import METODO_ARITMETICA, MODO_AUTOMATICO, SIMBOLOS_BYTES, serializar_cabecera
+from Lab3_Codificacion_SergioCardona import (
+    codificar_huffman, codificar_huffman_intercalado, costo_longitud_maxima, decodificar_huffman,
+    decodificar_huffman_intercalado, int_arith_code, int_arith_decode, int_range_code, int_range_decode, k_rango,
+    tabla_huffman_canonica,
+)
+from transformada_bwt import invertir_bloque, transformar_bloque
+
+# Genera un mensaje de texto con una distribucion sesgada (parecida a un texto en español)
+def generar_mensaje(tamano, semilla=0):
+    generador = random.Random(semilla)
+    alfabeto = " eaosrnidlctumpbgvyqhfzjñxkw.,EAOSRNIDLCTUMPBGVYQHFZJXKW0123456789"
+    pesos = [1 / (posicion + 1) for posicion in range(len(alfabeto))] # ley de Zipf
+    return ''.join(generador.choices(alfabeto, pesos, k=tamano))
+
+# Genera un registro (log) de `tamano` bytes aproximados: lineas con mucho texto repetido
+def generar_log(tamano, semilla=0):
+    generador = random.Random(semilla)
+    lineas = []
+    escritos = 0
+    while escritos < tamano:
+        linea = (f"2024-05-{generador.randint(1, 28):02d} {generador.randint(0, 23):02d}:{generador.randint(0, 59):02d}:{generador.randint(0, 59):02d} "
+                 f"{generador.choice(['INFO', 'WARN', 'ERROR', 'DEBUG'])} servicio.{generador.choice(['auth', 'db', 'cache', 'api'])} "
+                 f"usuario={generador.randint(1, 500)} tiempo={generador.random() * 100:.2f}ms "
+                 f"{generador.choice(['ok', 'timeout', 'reintento', 'conexion cerrada'])}\n")
+        lineas.append(linea)
+        escritos += len(linea)
+    return ''.join(lineas)[:tamano].encode("utf-8")
+
+# Corpus de la bateria de pruebas: cada generador retorna `tamano` bytes y es reproducible con la semilla
+PALABRAS_INGLES = (
+    "the of and to in a is that for it as was with be by on not he i this are or his from at which but have an they "
+    "you were her she there one all we their been has would when who will more no if out so said what up its about "
+    "into than them can only other time new some could these two may first then do any like my now over such our man"
+).split()
+
+def generar_aleatorio(tamano, semilla=0): # bytes uniformes: no se pueden comprimir
+    return random.Random(semilla).randbytes(tamano)
+
+def generar_sesgado(tamano, semilla=0): # bytes con distribucion de Zipf, sin contexto
+    generador = random.Random(semilla)
+    return bytes(generador.choices(range(256), [1 / (byte + 1) for byte in range(256)], k=tamano))
+
+def generar_ingles(tamano, semilla=0): # palabras frecuentes del ingles con frecuencia de Zipf
+    generador = random.Random(semilla)
+    pesos = [1 / (posicion + 1) for posicion in range(len(PALABRAS_INGLES))]
+    partes = []
+    escritos = 0
+    while escritos < tamano:
+        oracion = generador.choices(PALABRAS_INGLES, pesos, k=generador.randint(5, 18))
+        texto = " ".join(oracion).capitalize() + generador.choice([". ", ". ", ", ", "? ", ".\n"])
+        partes.append(texto)
+        escritos += len(texto)
+    return "".join(partes).encode("ascii")[:tamano]
+
+def generar_binario(tamano, semilla=0): # registros de 16 bytes: contador, medicion que varia poco, estado y flotante
+    generador = random.Random(semilla)
+    partes = []
+    valor = 1000
+    for numero in range(tamano // 16 + 1):
+        valor += generador.randint(-3, 3)
+        partes.append(struct.pack("<IiHHf", numero, valor, generador.choice((0, 0, 0, 1, 2)), 0, generador.gauss(20.0, 0.5)))
+    return b"".join(partes)[:tamano]
+
+CORPUS = {
+    "aleatorio": generar_aleatorio,
+    "sesgado": generar_sesgado,
+    "ingles": generar_ingles,
+    "registro": generar_log,
+    "binario": generar_binario,
+}
+
+# Decodificador original (busqueda bit a bit en el diccionario), usado como referencia
+def decodificar_huffman_referencia(mensaje_codificado, codigos):
+    mensaje_decodificado = ""
+    codigo_actual = ""
+    for bit in mensaje_codificado:
+        codigo_actual += bit
+        for caracter, codigo in codigos.items():
+            if codigo == codigo_actual:
+                mensaje_decodificado += caracter
+                codigo_actual = ""
+                break
+    return mensaje_decodificado
+
+# Decodificador aritmetico con la busqueda lineal original en `limites`, usado como referencia
+def int_arith_decode_referencia(lector, k, n, frecuencias):
+    R = 2 ** k
+    l, u = 0, R - 1
+    T = sum(frecuencias.values())
+    limites = {}
+    acumulado = 0
+    for simbolo, frecuencia in frecuencias.items():
+        limites[simbolo] = (acumulado, acumulado + frecuencia)
+        acumulado += frecuencia
+    mensaje_decodificado = []
+    codigo = lector.read_bits(k)
+    for _ in range(n):
+        s = u - l + 1
+        valor = ((codigo - l + 1) * T - 1) // s
+        for simbolo, (f_i, f_i_plus_1) in limites.items():
+            if f_i <= valor < f_i_plus_1:
+                mensaje_decodificado.append(simbolo)
+                u = l + (s * f_i_plus_1) // T - 1
+                l = l + (s * f_i) // T
+                break
+        while True:
+            if u < R // 2:
+                l, u, codigo = 2 * l, 2 * u + 1, 2 * codigo + lector.read_bit()
+            elif l >= R // 2:
+                l, u, codigo = 2 * (l - R // 2), 2 * (u - R // 2) + 1, 2 * (codigo - R // 2) + lector.read_bit()
+            elif l >= R // 4 and u < 3 * R // 4:
+                l, u, codigo = 2 * (l - R // 4), 2 * (u - R // 4) + 1, 2 * (codigo - R // 4) + lector.read_bit()
+            else:
+                break
+    return ''.join(mensaje_decodificado)
+
+# Mide el tiempo de una funcion y retorna (resultado, segundos)
+def medir(funcion, *argumentos):
+    inicio = time.perf_counter()
+    resultado = funcion(*argumentos)
+    return resultado, time.perf_counter() - inicio
+
+# Compara el decodificador de Huffman original con el decodificador por tablas
+def benchmark_decodificacion_huffman(tamano):
+    mensaje = generar_mensaje(tamano)
+    codigos = tabla_huffman_canonica(Counter(mensaje)) # los mismos codigos para ambos decodificadores
+    bits = codificar_huffman(mensaje, codigos)
+    megabytes = len(mensaje.encode("utf-8")) / 1e6
+
+    print(f"\n--- Decodificación Huffman ({tamano} caracteres, {len(codigos)} símbolos) ---")
+    casos = (
+        ("referencia (bit a bit)", decodificar_huffman_referencia, lambda: bits.to_bitstring()),
+        ("tablas canónicas", decodificar_huffman, lambda: BitReader(bits.getvalue(), len(bits))),
+    )
+    for nombre, funcion, entrada in casos:
+        resultado, segundos = medir(funcion, entrada(), codigos)
+        if resultado != mensaje:
+            raise RuntimeError(f"El decodificador '{nombre}' no recuperó el mensaje original.")
+        print(f"{nombre:>24}: {segundos:8.3f} s  {megabytes / segundos:8.2f} MB/s")
+
+# Compara Huffman, aritmetica, rango, tANS y rANS con la misma tabla de frecuencias: tamaño frente a la
+# entropia y velocidad de codificacion y decodificacion
+def benchmark_metodos(tamano):
+    mensaje = generar_mensaje(tamano)
+    frecuencias = Counter(mensaje)
+    n = len(mensaje)
+    entropia = -sum(frecuencia * math.log2(frecuencia / n) for frecuencia in frecuencias.values()) # bits
+    megabytes = len(mensaje.encode("utf-8")) / 1e6
+    codigos = tabla_huffman_canonica(frecuencias)
+    k = max(8, n.bit_length() + 2)
+    precision = precision_ans(frecuencias)
+
+    casos = ( # (nombre, codificar, decodificar(resultado de codificar), bits de la carga)
+        ("huffman", lambda: codificar_huffman(mensaje, codigos),
+         lambda bits: decodificar_huffman(BitReader(bits.getvalue(), len(bits)), codigos, n), len),
+        ("aritmética", lambda: int_arith_code(mensaje, k, frecuencias),
+         lambda bits: int_arith_decode(BitReader(bits.getvalue(), len(bits)), k, n, frecuencias), len),
+        ("rango", lambda: int_range_code(mensaje, k_rango(n), frecuencias),
+         lambda bits: int_range_decode(BitReader(bits.getvalue(), len(bits)), k_rango(n), n, frecuencias), len),
+        ("tANS", lambda: codificar_tans(mensaje, frecuencias, precision),
+         lambda bits: ''.join(decodificar_simbolos_tans(bits.getvalue(), n, frecuencias, precision)), len),
+        ("rANS", lambda: codificar_rans(mensaje, frecuencias, precision),
+         lambda carga: ''.join(decodificar_simbolos_rans(carga, n, frecuencias, precision)), lambda carga: len(carga) * 8),
+    )
+    print(f"\n--- Huffman vs aritmética/rango vs ANS ({tamano} caracteres, entropía {entropia / n:.4f} bits/carácter) ---")
+    print(f"{'método':>11} {'bits/carácter':>14} {'sobre entropía':>15} {'codificar':>10} {'decodificar':>12}  (MB/s)")
+    for nombre, codificar, decodificar, contar_bits in casos:
+        codificado, segundos_codificacion = medir(codificar)
+        resultado, segundos_decodificacion = medir(decodificar, codificado)
+        if resultado != mensaje:
+            raise RuntimeError(f"El método '{nombre}' no recuperó el mensaje original.")
+        bits = contar_bits(codificado)
+        print(f"{nombre:>11} {bits / n:>14.4f} {bits / entropia - 1:>15.4%} "
+              f"{megabytes / segundos_codificacion:>10.3f} {megabytes / segundos_decodificacion:>12.3f}")
+
+# Compara el decodificador de Huffman de un solo flujo con el de flujos intercalados
+def benchmark_huffman_intercalado(tamano):
+    mensaje = generar_mensaje(tamano)
+    codigos = tabla_huffman_canonica(Counter(mensaje))
+    bits = codificar_huffman(mensaje, codigos)
+    flujos = codificar_huffman_intercalado(mensaje, codigos)
+    carga = b"".join(flujo.getvalue() for flujo in flujos)
+    megabytes = len(mensaje.encode("utf-8")) / 1e6
+
+    print(f"\n--- Huffman intercalado ({tamano} caracteres, {len(flujos)} flujos) ---")
+    casos = (
+        ("un flujo", lambda: decodificar_huffman(BitReader(bits.getvalue(), len(bits)), codigos, len(mensaje))),
+        (f"{len(flujos)} flujos", lambda: decodificar_huffman_intercalado(carga, [len(flujo) for flujo in flujos], codigos, len(mensaje))),
+    )
+    for nombre, funcion in casos:
+        resultado, segundos = medir(funcion)
+        if resultado != mensaje:
+            raise RuntimeError(f"El decodificador '{nombre}' no recuperó el mensaje original.")
+        print(f"{nombre:>24}: {segundos:8.3f} s  {megabytes / segundos:8.2f} MB/s")
+    print(f"{'tamaño de la carga':>24}: {(len(bits) + 7) // 8} bytes vs {len(carga)} bytes")
+
+# Costo en compresion y velocidad de decodificacion al limitar la longitud de los codigos de Huffman,
+# con una distribucion muy sesgada (frecuencias de Fibonacci) que produce arboles profundos
+def benchmark_longitud_maxima(tamano):
+    generador = random.Random(0)
+    pesos = [1, 1]
+    while len(pesos) < 30:
+        pesos.append(pesos[-1] + pesos[-2])
+    alfabeto = [chr(0x41 + i) for i in range(len(pesos))]
+    mensaje = ''.join(generador.choices(alfabeto, pesos, k=tamano))
+    frecuencias = Counter(mensaje)
+    megabytes = len(mensaje.encode("utf-8")) / 1e6
+
+    print(f"\n--- Huffman con longitud máxima ({tamano} caracteres, {len(frecuencias)} símbolos) ---")
+    print(f"{'máximo':>7} {'bits':>12} {'aumento':>9} {'decodificar (MB/s)':>19}")
+    for longitud_maxima in (None, 15, 13, 11, 9):
+        codigos = tabla_huffman_canonica(frecuencias, longitud_maxima)
+        bits = codificar_huffman(mensaje, codigos)
+        resultado, segundos = medir(decodificar_huffman, BitReader(bits.getvalue(), len(bits)), codigos)
+        if resultado != mensaje:
+            raise RuntimeError("El decodificador de Huffman no recuperó el mensaje original.")
+        if longitud_maxima is None:
+            nombre, aumento = f"{max(map(len, codigos.values()))}", 0.0
+        else:
+            bits_libres, bits_limitados, _ = costo_longitud_maxima(frecuencias, longitud_maxima)
+            nombre, aumento = f"{longitud_maxima}", (bits_limitados - bits_libres) / bits_libres
+        print(f"{nombre:>7} {len(bits):>12} {aumento:>9.4%} {megabytes / segundos:>19.3f}")
+
+# Velocidad del decodificador aritmetico segun el tamaño del alfabeto
+def benchmark_decodificacion_aritmetica(tamano):
+    print(f"\n--- Decodificación aritmética ({tamano} caracteres) ---")
+    print(f"{'símbolos':>9} {'lineal':>12} {'bisect':>12} {'tabla directa':>14}  (MB/s)")
+    limite_original = lab3.LIMITE_TABLA_DIRECTA
+    for tamano_alfabeto in (2, 16, 64, 256, 1024, 4096):
+        generador = random.Random(tamano_alfabeto)
+        alfabeto = [chr(0x100 + i) for i in range(tamano_alfabeto)]
+        mensaje = ''.join(generador.choices(alfabeto, k=tamano))
+        frecuencias = Counter(mensaje)
+        k = max(8, len(mensaje).bit_length() + 2)
+        bits = int_arith_code(mensaje, k, frecuencias)
+        megabytes = len(mensaje.encode("utf-8")) / 1e6
+
+        velocidades = []
+        casos = (
+            (int_arith_decode_referencia, limite_original),
+            (int_arith_decode, 0), # sin tabla directa: busqueda binaria
+            (int_arith_decode, limite_original),
+        )
+        try:
+            for funcion, limite in casos:
+                lab3.LIMITE_TABLA_DIRECTA = limite
+                resultado, segundos = medir(funcion, BitReader(bits.getvalue(), len(bits)), k, len(mensaje), frecuencias)
+                if resultado != mensaje:
+                    raise RuntimeError("El decodificador aritmético no recuperó el mensaje original.")
+                velocidades.append(megabytes / segundos)
+        finally:
+            lab3.LIMITE_TABLA_DIRECTA = limite_original
+        print(f"{tamano_alfabeto:>9} {velocidades[0]:>12.3f} {velocidades[1]:>12.3f} {velocidades[2]:>14.3f}")
+
+# Compara la codificacion de Huffman en Python puro con la version vectorizada con NumPy
+def benchmark_huffman_vectorizado(tamano):
+    base = generar_mensaje(1 << 20).encode("utf-8")
+    datos = (base * (tamano // len(base) + 1))[:tamano] # se repite el mensaje hasta el tamaño pedido
+    megabytes = len(datos) / 1e6
+    backends = [("python", False)] + ([("numpy", True)] if huffman_vectorizado.HAY_NUMPY else [])
+    if not huffman_vectorizado.HAY_NUMPY:
+        print("NumPy no está instalado: solo se mide la versión en Python puro.")
+
+    print(f"\n--- Codificación Huffman vectorizada ({megabytes:.1f} MB) ---")
+    print(f"{'backend':>9} {'frecuencias':>12} {'codificar':>12}  (MB/s)")
+    usar_original = huffman_vectorizado.USAR_NUMPY
+    resultados = []
+    try:
+        for nombre, usar_numpy in backends:
+            huffman_vectorizado.USAR_NUMPY = usar_numpy
+            frecuencias, segundos_conteo = medir(huffman_vectorizado.contar_bytes, [datos])
+            codigos_enteros = {simbolo: (int(codigo, 2), len(codigo)) for simbolo, codigo in tabla_huffman_canonica(frecuencias).items()}
+            bits, segundos_codificacion = medir(huffman_vectorizado.codificar_simbolos, datos, codigos_enteros, BitWriter())
+            resultados.append((frecuencias, len(bits), bits.getvalue()))
+            print(f"{nombre:>9} {megabytes / segundos_conteo:>12.3f} {megabytes / segundos_codificacion:>12.3f}")
+    finally:
+        huffman_vectorizado.USAR_NUMPY = usar_original
+    if any(resultado != resultados[0] for resultado in resultados):
+        raise RuntimeError("Las versiones de la codificación de Huffman no producen la misma salida.")
+
+# Tasa y velocidad de LZ77 (con Huffman y con aritmetica adaptativa) en cada nivel de esfuerzo,
+# sobre un registro con muchas repeticiones, frente a Huffman solo
+def benchmark_lz77(tamano):
+    datos = generar_log(tamano)
+    megabytes = len(datos) / 1e6
+    print(f"\n--- LZ77 por nivel ({megabytes:.1f} MB de registro) ---")
+    print(f"{'método':>10} {'nivel':>6} {'tasa':>8} {'comprimir':>10} {'descomprimir':>13}  (MB/s)")
+    casos = [("huffman", None)] + [(metodo, nivel) for metodo in ("lz77", "lz77a") for nivel in (1, 3, 6, 9)]
+    for metodo, nivel in casos:
+        comprimido, segundos_compresion = medir(comprimir_bytes, datos, metodo, None, None, nivel)
+        resultado, segundos_descompresion = medir(descomprimir_bytes, comprimido)
+        if resultado != datos:
+            raise RuntimeError(f"El método '{metodo}' no recuperó los datos originales.")
+        print(f"{metodo:>10} {nivel or '-':>6} {len(comprimido) / len(datos):>8.4f} "
+              f"{megabytes / segundos_compresion:>10.3f} {megabytes / segundos_descompresion:>13.3f}")
+
+# Velocidad de la transformada de un bloque (BWT, mover al frente y rachas de ceros) y de su inversa,
+# y tasa de Huffman con y sin la transformada, en texto sin repeticiones largas y en un registro
+def benchmark_bwt(tamano):
+    print(f"\n--- BWT + mover al frente + rachas de ceros (bloques de {tamano} bytes) ---")
+    print(f"{'datos':>9} {'transformar':>12} {'invertir':>9} {'huffman':>8} {'bwt':>8}  (MB/s, tasa)")
+    for nombre, datos in (("texto", generar_mensaje(tamano).encode("utf-8")[:tamano]), ("registro", generar_log(tamano))):
+        megabytes = len(datos) / 1e6
+        (simbolos, primario), segundos_transformada = medir(transformar_bloque, datos)
+        resultado, segundos_inversa = medir(invertir_bloque, simbolos, primario)
+        if resultado != datos:
+            raise RuntimeError("La transformada inversa no recuperó el bloque original.")
+        tasa_huffman = len(comprimir_bytes(datos, "huffman")) / len(datos)
+        tasa_bwt = len(comprimir_bytes(datos, "bwt")) / len(datos)
+        print(f"{nombre:>9} {megabytes / segundos_transformada:>12.3f} {megabytes / segundos_inversa:>9.3f} {tasa_huffman:>8.4f} {tasa_bwt:>8.4f}")
+
+# Muchos mensajes cortos de un registro: sin cache, con la cache de modelos y con un modelo compartido
+# entrenado con los primeros mensajes (que no va en la cabecera de cada mensaje)
+def benchmark_cache(tamano, tam_mensaje=4096):
+    datos = generar_log(tamano)
+    mensajes = [datos[inicio:inicio + tam_mensaje] for inicio in range(0, len(datos), tam_mensaje)]
+    megabytes = len(datos) / 1e6
+    print(f"\n--- Cache de modelos ({len(mensajes)} mensajes de {tam_mensaje} bytes) ---")
+    print(f"{'método':>11} {'modelo':>11} {'tasa':>8} {'comprimir':>10} {'descomprimir':>13} {'aciertos':>9}  (MB/s)")
+    for metodo in ("huffman", "aritmetica"):
+        compartido = entrenar_modelo(mensajes[:max(1, len(mensajes) // 10)])
+        modelo_decodificacion = modelo_de_cabecera(metodo, compartido) # una sola vez para todos los mensajes
+        casos = (
+            ("propio", None, None),
+            ("cache", None, CacheModelos()),
+            ("compartido", compartido, CacheModelos()),
+        )
+        for nombre, frecuencias, cache in casos:
+            modelo = modelo_decodificacion if frecuencias else None
+            comprimidos, segundos_compresion = medir(lambda: [comprimir_bytes(mensaje, metodo, frecuencias, cache=cache) for mensaje in mensajes])
+            resultado, segundos_descompresion = medir(lambda: [descomprimir_bytes(comprimido, modelo, cache) for comprimido in comprimidos])
+            if resultado != mensajes:
+                raise RuntimeError(f"El método '{metodo}' con modelo '{nombre}' no recuperó los mensajes.")
+            aciertos = f"{cache.estadisticas()['tasa_aciertos']:.1%}" if cache else "-"
+            print(f"{metodo:>11} {nombre:>11} {sum(map(len, comprimidos)) / len(datos):>8.4f} "
+                  f"{megabytes / segundos_compresion:>10.3f} {megabytes / segundos_descompresion:>13.3f} {aciertos:>9}")
+
+# Escalamiento de la compresion por bloques de 1 a `max_trabajadores` procesos
+def benchmark_paralelo(tamano, max_trabajadores, metodo="huffman", tam_bloque=1 << 18):
+    with tempfile.TemporaryDirectory() as directorio:
+        original = os.path.join(directorio, "original.txt")
+        comprimido = os.path.join(directorio, "comprimido.lb3")
+        descomprimido = os.path.join(directorio, "descomprimido.txt")
+        with open(original, "w", encoding="utf-8") as archivo:
+            archivo.write(generar_mensaje(tamano))
+        megabytes = os.path.getsize(original) / 1e6
+
+        print(f"\n--- Compresión por bloques ({metodo}, {megabytes:.1f} MB, bloques de {tam_bloque} bytes) ---")
+        print(f"{'procesos':>9} {'comprimir':>12} {'descomprimir':>13}  (MB/s)")
+        trabajadores = 1
+        while True:
+            _, segundos_compresion = medir(comprimir_archivo_paralelo, original, comprimido, metodo, tam_bloque, trabajadores)
+            _, segundos_descompresion = medir(descomprimir_archivo_paralelo, comprimido, descomprimido, trabajadores)
+            if not filecmp.cmp(original, descomprimido, shallow=False):
+                raise RuntimeError("La descompresión por bloques no recuperó el archivo original.")
+            print(f"{trabajadores:>9} {megabytes / segundos_compresion:>12.3f} {megabytes / segundos_descompresion:>13.3f}")
+            if trabajadores >= max_trabajadores:
+                break
+            trabajadores = min(2 * trabajadores, max_trabajadores)
+
+# Contenedor aritmetico estatico de `datos` con enteros de k bits (el mismo formato que el metodo
+# "aritmetica" de compresion_flujo, que siempre usa el k minimo); se descomprime con descomprimir_bytes
+def comprimir_aritmetica(datos, k):
+    frecuencias = Counter(datos)
+    bits = int_arith_code(datos, k, frecuencias) if datos else BitWriter()
+    return bytes(serializar_cabecera(METODO_ARITMETICA, MODO_AUTOMATICO, len(datos), k, frecuencias, len(bits), SIMBOLOS_BYTES)) + bits.getvalue()
+
+# Casos de la bateria para `datos`: (nombre, k o None, comprimir, descomprimir). La aritmetica se
+# prueba con el k minimo (el rango debe ser al menos 4T) y con enteros mas anchos
+def casos_bateria(datos):
+    k_minimo = max(8, len(datos).bit_length() + 2)
+    casos = [
+        ("huffman", None, lambda: comprimir_bytes(datos, "huffman"), descomprimir_bytes),
+        ("huffman4", None, lambda: comprimir_bytes(datos, "huffman4"), descomprimir_bytes),
+    ]
+    for k in sorted({k_minimo, k_minimo + 8, max(k_minimo, 32), 64}):
+        casos.append(("aritmetica", k, lambda k=k: comprimir_aritmetica(datos, k), descomprimir_bytes))
+    casos += [
+        ("zlib", None, lambda: zlib.compress(datos, 9), zlib.decompress),
+        ("bz2", None, lambda: bz2.compress(datos, 9), bz2.decompress),
+        ("lzma", None, lambda: lzma.compress(datos), lzma.decompress),
+    ]
+    return casos
+
+# Pico de memoria (bytes) reservada por Python mientras corre `funcion`
+def pico_memoria(funcion, *argumentos):
+    tracemalloc.start()
+    try:
+        funcion(*argumentos)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+# Bateria de pruebas: cada corpus en cada tamaño con Huffman, aritmetica con varios k y los compresores
+# de la biblioteca estandar. Se verifica que cada caso recupere los datos; los tiempos se miden sin
+# tracemalloc y la memoria en una corrida aparte (tracemalloc hace mas lento el codigo). Retorna un
+# diccionario listo para guardar como JSON
+def benchmark_bateria(tamanos, corpus=tuple(CORPUS), semilla=0, memoria=True):
+    resultados = []
+    print(f"\n--- Batería de pruebas (tamaños: {', '.join(map(str, tamanos))} bytes) ---")
+    print(f"{'corpus':>10} {'tamaño':>9} {'método':>11} {'k':>4} {'tasa':>8} {'comprimir':>10} {'descomprimir':>13} {'memoria':>10}  (MB/s, KB)")
+    for nombre_corpus in corpus:
+        for tamano in tamanos:
+            datos = CORPUS[nombre_corpus](tamano, semilla)
+            megabytes = len(datos) / 1e6
+            for metodo, k, comprimir, descomprimir in casos_bateria(datos):
+                comprimido, segundos_compresion = medir(comprimir)
+                resultado, segundos_descompresion = medir(descomprimir, comprimido)
+                if resultado != datos:
+                    raise RuntimeError(f"El método '{metodo}' (k={k}) no recuperó el corpus '{nombre_corpus}' de {tamano} bytes.")
+                pico = max(pico_memoria(comprimir), pico_memoria(descomprimir, comprimido)) if memoria else None
+                caso = {
+                    "corpus": nombre_corpus,
+                    "tamano": len(datos),
+                    "metodo": metodo,
+                    "k": k,
+                    "bytes_comprimidos": len(comprimido),
+                    "tasa": round(len(comprimido) / len(datos), 6) if datos else 0,
+                    "mb_s_compresion": round(megabytes / segundos_compresion, 4) if segundos_compresion else None,
+                    "mb_s_descompresion": round(megabytes / segundos_descompresion, 4) if segundos_descompresion else None,
+                    "pico_memoria": pico,
+                    "verificado": True,
+                }
+                resultados.append(caso)
+                print(f"{nombre_corpus:>10} {len(datos):>9} {metodo:>11} {k or '-':>4} {caso['tasa']:>8.4f} "
+                      f"{caso['mb_s_compresion'] or 0:>10.3f} {caso['mb_s_descompresion'] or 0:>13.3f} {pico / 1024 if memoria else 0:>10.1f}")
+    return {
+        "semilla": semilla,
+        "tamanos": list(tamanos),
+        "python": platform.python_version(),
+        "numpy": huffman_vectorizado.HAY_NUMPY,
+        "resultados": resultados,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Pruebas de rendimiento de los codificadores del laboratorio 3.")
+    parser.add_argument("prueba", choices=["huffman", "metodos", "intercalado", "longitud", "aritmetica", "paralelo", "vectorizado", "lz77", "bwt", "bateria", "cache"], help="prueba a ejecutar")
+    parser.add_argument("--tamano", type=int, help="cantidad de caracteres del mensaje de prueba (200000; 100 MB en 'vectorizado', 1 MB en 'bwt')")
+    parser.add_argument("--trabajadores", type=int, default=os.cpu_count() or 1, help="máximo de procesos para la prueba en paralelo")
+    parser.add_argument("--metodo", choices=METODOS_FLUJO, default="huffman", help="método para la prueba en paralelo")
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[1 << 12, 1 << 15], help="tamaños en bytes de cada corpus de la batería")
+    parser.add_argument("--corpus", choices=list(CORPUS), nargs="+", default=list(CORPUS), help="corpus de la batería")
+    parser.add_argument("--semilla", type=int, default=0, help="semilla de los corpus de la batería")
+    parser.add_argument("--sin-memoria", action="store_true", help="no mide el pico de memoria en la batería (la hace el doble de rápida)")
+    parser.add_argument("--json", metavar="ARCHIVO", help="guarda los resultados de la batería en ARCHIVO")
+    argumentos = parser.parse_args()
+    tamano = argumentos.tamano or 200_000
+
+    if argumentos.prueba == "huffman":
+        benchmark_decodificacion_huffman(tamano)
+    elif argumentos.prueba == "metodos":
+        benchmark_metodos(tamano)
+    elif argumentos.prueba == "intercalado":
+        benchmark_huffman_intercalado(tamano)
+    elif argumentos.prueba == "longitud":
+        benchmark_longitud_maxima(tamano)
+    elif argumentos.prueba == "aritmetica":
+        benchmark_decodificacion_aritmetica(tamano)
+    elif argumentos.prueba == "paralelo":
+        benchmark_paralelo(tamano, argumentos.trabajadores, argumentos.metodo)
+    elif argumentos.prueba == "vectorizado":
+        benchmark_huffman_vectorizado(argumentos.tamano or 100_000_000)
+    elif argumentos.prueba == "lz77":
+        benchmark_lz77(tamano)
+    elif argumentos.prueba == "bwt":
+        benchmark_bwt(argumentos.tamano or 1 << 20)
+    elif argumentos.prueba == "cache":
+        benchmark_cache(tamano)
+    elif argumentos.prueba == "bateria":
+        resultado = benchmark_bateria(argumentos.tamanos, argumentos.corpus, argumentos.semilla, not argumentos.sin_memoria)
+        if argumentos.json:
+            with open(argumentos.json, "w", encoding="utf-8") as archivo:
+                json.dump(resultado, archivo, indent=2, sort_keys=True) # claves ordenadas: las corridas se comparan con diff
+                archivo.write("\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+# Lectura y escritura de bits sobre buffers de bytes, compartida por Huffman y aritmetica
+
+MAX_BYTES_RELLENO = 16 # ceros despues del final que puede leer un decodificador valido (su ventana)
+
+# Escritor de bits: acumula los bits en un entero y vuelca los bytes completos a un bytearray
+class BitWriter:
+    __slots__ = ("buffer", "acumulador", "bits_acumulados", "num_bits")
+
+    def __init__(self):
+        self.buffer = bytearray() # bytes completos
+        self.acumulador = 0 # bits que aun no completan un byte
+        self.bits_acumulados = 0
+        self.num_bits = 0 # total de bits escritos
+
+    def __len__(self):
+        return self.num_bits
+
+    def write_bit(self, bit):
+        self.acumulador = (self.acumulador << 1) | bit
+        self.bits_acumulados += 1
+        self.num_bits += 1
+        if self.bits_acumulados == 8: # byte completo
+            self.buffer.append(self.acumulador)
+            self.acumulador = 0
+            self.bits_acumulados = 0
+
+    # Escribe los `longitud` bits menos significativos de `valor`, del mas al menos significativo
+    def write_bits(self, valor, longitud):
+        self.acumulador = (self.acumulador << longitud) | valor
+        self.bits_acumulados += longitud
+        self.num_bits += longitud
+        if self.bits_acumulados >= 8:
+            sobrantes = self.bits_acumulados & 7
+            self.buffer += (self.acumulador >> sobrantes).to_bytes(self.bits_acumulados >> 3, "big")
+            self.acumulador &= (1 << sobrantes) - 1
+            self.bits_acumulados = sobrantes
+
+    # Escribe el mismo bit `veces` veces
+    def write_repeated(self, bit, veces):
+        if veces:
+            self.write_bits((1 << veces) - 1 if bit else 0, veces)
+
+    # Retorna una vista (sin copia) de los bytes completos escritos hasta ahora
+    def getbuffer(self):
+        return memoryview(self.buffer)
+
+    # Retorna los bytes completos y los saca del buffer (para escribir la salida por partes)
+    def drain(self):
+        completos = bytes(self.buffer)
+        del self.buffer[:]
+        return completos
+
+    # Retorna todos los bits escritos como bytes, rellenando el ultimo byte con ceros
+    def getvalue(self):
+        if self.bits_acumulados == 0:
+            return bytes(self.buffer)
+        return bytes(self.buffer) + bytes([self.acumulador << (8 - self.bits_acumulados)])
+
+    # Retorna los bits como cadena de '0' y '1' (para mostrarlos en pantalla)
+    def to_bitstring(self):
+        if self.num_bits == 0:
+            return ""
+        datos = self.getvalue()
+        return format(int.from_bytes(datos, "big"), f"0{len(datos) * 8}b")[:self.num_bits]
+
+
+# Lector de bits sobre cualquier objeto de bytes (bytes, bytearray, memoryview) sin copiarlo
+class BitReader:
+    __slots__ = ("datos", "num_bits", "posicion", "indice_byte", "acumulador", "bits_acumulados", "bloques")
+
+    def __init__(self, datos, num_bits=None):
+        self.datos = memoryview(datos).cast("B") # vista sin copia de los bytes
+        self.num_bits = len(self.datos) * 8 if num_bits is None else num_bits
+        self.datos = self.datos[:(self.num_bits + 7) // 8] # despues del ultimo bit solo se leen ceros
+        self.posicion = 0 # bits consumidos
+        self.indice_byte = 0 # siguiente byte a cargar en el acumulador
+        self.acumulador = 0
+        self.bits_acumulados = 0
+        self.bloques = None # iterador de bloques pendientes cuando se lee por partes
+
+    # Crea un lector que va pidiendo bloques de bytes a un iterador (por ejemplo, un archivo leido por partes)
+    @classmethod
+    def from_chunks(cls, bloques, num_bits=None):
+        lector = cls(b"", 0)
+        lector.num_bits = float("inf") if num_bits is None else num_bits # sin num_bits se lee hasta que se acaben los bloques
+        lector.bloques = iter(bloques)
+        return lector
+
+    # Retorna el siguiente byte cuando el bloque actual se termino (ceros al final de los datos)
+    def _siguiente_bloque(self):
+        if self.bloques is not None:
+            for bloque in self.bloques:
+                if bloque:
+                    self.datos = memoryview(bloque).cast("B")
+                    self.indice_byte = 1
+                    return self.datos[0]
+            self.bloques = None # no quedan bloques
+        self.indice_byte += 1
+        return 0
+
+    # Crea un lector a partir de una cadena de '0' y '1'
+    @classmethod
+    def from_bitstring(cls, cadena):
+        num_bits = len(cadena)
+        relleno = -num_bits % 8
+        datos = int(cadena + "0" * relleno, 2).to_bytes((num_bits + relleno) // 8, "big") if num_bits else b""
+        return cls(datos, num_bits)
+
+    @property
+    def bits_restantes(self):
+        return self.num_bits - self.posicion
+
+    # Bytes de ceros que se leyeron despues del final de los datos
+    @property
+    def bytes_de_relleno(self):
+        return max(0, self.indice_byte - len(self.datos)) if self.bloques is None else 0
+
+    # Un decodificador que lee mas ceros que su ventana despues del final esta leyendo un archivo
+    # truncado (los modos que terminan con un simbolo de fin no pararian nunca)
+    def comprobar_relleno(self):
+        if self.bytes_de_relleno > MAX_BYTES_RELLENO:
+            raise ValueError("El archivo está truncado.")
+
+    # Retorna los siguientes `longitud` bits sin consumirlos; despues del final se leen ceros
+    def peek_bits(self, longitud):
+        while self.bits_acumulados < longitud:
+            if self.indice_byte < len(self.datos):
+                byte = self.datos[self.indice_byte]
+                self.indice_byte += 1
+            else:
+                byte = self._siguiente_bloque()
+            self.acumulador = (self.acumulador << 8) | byte
+            self.bits_acumulados += 8
+        return self.acumulador >> (self.bits_acumulados - longitud)
+
+    # Consume `longitud` bits (que ya deben estar en el acumulador por un peek_bits previo)
+    def skip_bits(self, longitud):
+        self.bits_acumulados -= longitud
+        self.acumulador &= (1 << self.bits_acumulados) - 1
+        self.posicion += longitud
+
+    def read_bits(self, longitud):
+        valor = self.peek_bits(longitud)
+        self.skip_bits(longitud)
+        return valor
+
+    def read_bit(self):
+        if self.bits_acumulados == 0:
+            if self.indice_byte < len(self.datos):
+                self.acumulador = self.datos[self.indice_byte]
+                self.indice_byte += 1
+            else:
+                self.acumulador = self._siguiente_bloque()
+            self.bits_acumulados = 8
+        self.bits_acumulados -= 1
+        self.posicion += 1
+        bit = self.acumulador >> self.bits_acumulados
+        self.acumulador &= (1 << self.bits_acumulados) - 1
+        return bit
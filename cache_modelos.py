@@ -0,0 +1,206 @@
+# Cache de modelos para comprimir muchos mensajes cortos con estadisticas parecidas: en lugar de armar
+# en cada mensaje los codigos de Huffman, las tablas de decodificacion o los limites de la aritmetica, se
+# guardan los ya armados con clave en una huella normalizada de la tabla de frecuencias, y se desalojan
+# los menos usados (LRU) al pasar la capacidad. Si la huella no esta, se prueba con los modelos usados
+# hace poco: uno que cubre todos los simbolos y codifica el mensaje a menos de `tolerancia` de su
+# entropia se usa tal cual (el decodificador tambien lo encuentra en su cache, por las longitudes o
+# frecuencias de la cabecera). Tambien se puede entrenar un modelo compartido con mensajes de muestra:
+# los mensajes no llevan tabla en la cabecera y los codigos se arman una sola vez
+import math
+from collections import Counter, OrderedDict
+
+from contenedor import escribir_varint, leer_varint
+from Lab3_Codificacion_SergioCardona import codigos_canonicos, construir_limites, construir_tabla_huffman, tabla_huffman_canonica
+from metricas import contar
+
+CAPACIDAD_CACHE = 256 # entradas (codigos, tablas o limites) guardadas a la vez
+RESOLUCION_HUELLA = 2 # pasos por bit de -log2(probabilidad) en la huella: 2 = medio bit
+BITS_MODELO = 10 # en el modelo normalizado, un simbolo con probabilidad 1/2^b tiene frecuencia 2^(BITS_MODELO - b)
+TOLERANCIA_CACHE = 0.03 # costo extra aceptado (sobre la entropia) al usar un modelo de otro mensaje
+CANDIDATOS_CACHE = 8 # modelos recientes que se prueban cuando la huella no esta
+BITS_ENTRADA_CABECERA = 16 # costo aproximado de cada entrada de mas en el modelo de la cabecera
+MAGIA_MODELO = b"LB3M" # archivos de modelos compartidos
+
+# Funcion para calcular la huella de una tabla de frecuencias: cada simbolo con su -log2(probabilidad)
+# redondeado a 1/RESOLUCION_HUELLA de bit. Dos mensajes con distribuciones casi iguales dan la misma
+# huella, y la huella define el modelo completo, asi que una entrada sirve para todos ellos
+def huella_frecuencias(frecuencias, resolucion=RESOLUCION_HUELLA):
+    total = sum(frecuencias.values())
+    return tuple(sorted((simbolo, round(resolucion * math.log2(total / frecuencia))) for simbolo, frecuencia in frecuencias.items() if frecuencia))
+
+# Tabla de frecuencias que representa una huella (todas las frecuencias al menos 1)
+def frecuencias_de_huella(huella, resolucion=RESOLUCION_HUELLA):
+    return {simbolo: max(1, round(2 ** (BITS_MODELO - nivel / resolucion))) for simbolo, nivel in huella}
+
+# Bits que ocupa el mensaje con un codigo ideal para sus propias frecuencias
+def entropia_bits(frecuencias):
+    total = sum(frecuencias.values())
+    return sum(frecuencia * math.log2(total / frecuencia) for frecuencia in frecuencias.values() if frecuencia)
+
+# Bits del mensaje con las longitudes de un modelo de Huffman; None si le falta algun simbolo
+def costo_huffman(frecuencias, longitudes):
+    try:
+        return sum(frecuencia * longitudes[simbolo] for simbolo, frecuencia in frecuencias.items())
+    except KeyError:
+        return None
+
+# Bits (aproximados) del mensaje con un modelo aritmetico de total T; None si le falta algun simbolo
+def costo_aritmetico(frecuencias, modelo, T):
+    try:
+        return sum(frecuencia * math.log2(T / modelo[simbolo]) for simbolo, frecuencia in frecuencias.items())
+    except KeyError:
+        return None
+
+class CacheModelos:
+    def __init__(self, capacidad=CAPACIDAD_CACHE, resolucion=RESOLUCION_HUELLA, tolerancia=TOLERANCIA_CACHE, candidatos=CANDIDATOS_CACHE):
+        if capacidad < 1:
+            raise ValueError("La capacidad de la cache debe ser al menos 1.")
+        self.capacidad = capacidad
+        self.resolucion = resolucion
+        self.tolerancia = tolerancia # None: solo se usan huellas exactas
+        self.candidatos = candidatos
+        self.entradas = OrderedDict() # clave -> valor, de la menos a la mas usada
+        self.aciertos = 0 # incluye los compatibles
+        self.compatibles = 0 # aciertos con el modelo de otra huella
+        self.fallos = 0
+        self.desalojos = 0
+
+    def guardar(self, clave, valor):
+        self.entradas[clave] = valor
+        if len(self.entradas) > self.capacidad:
+            self.entradas.popitem(last=False) # desaloja la menos usada
+            self.desalojos += 1
+
+    def acierto(self, clave):
+        self.entradas.move_to_end(clave)
+        self.aciertos += 1
+        contar("cache_aciertos")
+
+    # Retorna el valor guardado en `clave` o lo arma con construir() y lo guarda
+    def obtener(self, clave, construir):
+        valor = self.entradas.get(clave)
+        if valor is not None:
+            self.acierto(clave)
+            return valor
+        self.fallos += 1
+        contar("cache_fallos")
+        valor = construir()
+        self.guardar(clave, valor)
+        return valor
+
+    # Como obtener(), pero si la clave no esta se prueba con los `candidatos` modelos mas recientes del
+    # mismo tipo (clave[:2]); costo(valor) da los bits del mensaje con ese modelo o None si no sirve. El
+    # primero que no pasa de `limite` bits se guarda tambien con esta clave
+    def obtener_compatible(self, clave, construir, costo, limite):
+        if clave not in self.entradas and self.tolerancia is not None:
+            probados = 0
+            for otra_clave in reversed(self.entradas):
+                if otra_clave[:2] != clave[:2]:
+                    continue
+                bits = costo(self.entradas[otra_clave])
+                if bits is not None and bits <= limite:
+                    valor = self.entradas[otra_clave]
+                    self.acierto(otra_clave)
+                    self.compatibles += 1
+                    self.guardar(clave, valor)
+                    return valor
+                probados += 1
+                if probados >= self.candidatos:
+                    break
+        return self.obtener(clave, construir)
+
+    # Frecuencias con las que se codifica: las de la huella o, sin `normalizar` (modelos compartidos,
+    # que el decodificador recibe tal cual), las mismas frecuencias. Retorna (clave, frecuencias)
+    def modelo(self, frecuencias, normalizar=True):
+        if normalizar:
+            huella = huella_frecuencias(frecuencias, self.resolucion)
+            return huella, frecuencias_de_huella(huella, self.resolucion)
+        return tuple(frecuencias.items()), frecuencias
+
+    # Limite de bits para aceptar el modelo de otro mensaje: la entropia mas la tolerancia y el costo de
+    # las entradas de mas en la cabecera
+    def limite_compatible(self, frecuencias):
+        return (1 + self.tolerancia) * entropia_bits(frecuencias) if self.tolerancia is not None else 0
+
+    # Codigos de Huffman para codificar: (codigos, codigos como (valor, longitud))
+    def codigos_huffman(self, frecuencias, longitud_maxima=None, normalizar=True):
+        clave, modelo = self.modelo(frecuencias, normalizar)
+        def construir():
+            codigos = tabla_huffman_canonica(modelo, longitud_maxima)
+            longitudes = {simbolo: len(codigo) for simbolo, codigo in codigos.items()}
+            return codigos, {simbolo: (int(codigo, 2), len(codigo)) for simbolo, codigo in codigos.items()}, longitudes
+        clave = ("huffman", longitud_maxima, clave)
+        if not normalizar: # modelo compartido: el decodificador necesita exactamente este
+            return self.obtener(clave, construir)[:2]
+        def costo(valor):
+            bits = costo_huffman(frecuencias, valor[2])
+            return None if bits is None else bits + BITS_ENTRADA_CABECERA * (len(valor[2]) - len(frecuencias))
+        return self.obtener_compatible(clave, construir, costo, self.limite_compatible(frecuencias))[:2]
+
+    # Modelo de la aritmetica y del codificador de rango: (frecuencias, limites de cada simbolo)
+    def limites_aritmeticos(self, frecuencias, normalizar=True):
+        clave, modelo = self.modelo(frecuencias, normalizar)
+        construir = lambda: (modelo, construir_limites(modelo)["limites"], sum(modelo.values()))
+        clave = ("aritmetica", None, clave)
+        if not normalizar:
+            return self.obtener(clave, construir)[:2]
+        def costo(valor):
+            bits = costo_aritmetico(frecuencias, valor[0], valor[2])
+            return None if bits is None else bits + BITS_ENTRADA_CABECERA * (len(valor[0]) - len(frecuencias))
+        return self.obtener_compatible(clave, construir, costo, self.limite_compatible(frecuencias))[:2]
+
+    # Tablas de decodificacion de Huffman para las longitudes de una cabecera
+    def tabla_huffman(self, longitudes):
+        return self.obtener(("tabla_huffman", None, tuple(longitudes.items())), lambda: construir_tabla_huffman(codigos_canonicos(longitudes)))
+
+    # Modelo de decodificacion (construir_limites) para las frecuencias de una cabecera
+    def modelo_limites(self, frecuencias):
+        return self.obtener(("limites", None, tuple(frecuencias.items())), lambda: construir_limites(frecuencias))
+
+    def estadisticas(self):
+        consultas = self.aciertos + self.fallos
+        return {
+            "entradas": len(self.entradas),
+            "capacidad": self.capacidad,
+            "aciertos": self.aciertos,
+            "compatibles": self.compatibles,
+            "fallos": self.fallos,
+            "desalojos": self.desalojos,
+            "tasa_aciertos": self.aciertos / consultas if consultas else 0.0,
+        }
+
+    def limpiar(self):
+        self.entradas.clear()
+        self.aciertos = self.compatibles = self.fallos = self.desalojos = 0
+
+
+# Modelos compartidos entrenados
+
+# Funcion para entrenar un modelo compartido con mensajes de muestra (bytes): las frecuencias de todos
+# ellos mas uno para cada byte, asi cualquier mensaje se puede codificar con el modelo
+def entrenar_modelo(muestras):
+    frecuencias = Counter()
+    for muestra in muestras:
+        frecuencias.update(muestra)
+    return {byte: frecuencias[byte] + 1 for byte in range(256)}
+
+def guardar_modelo(ruta, frecuencias):
+    datos = bytearray(MAGIA_MODELO)
+    escribir_varint(datos, len(frecuencias))
+    for simbolo, frecuencia in frecuencias.items():
+        escribir_varint(datos, simbolo)
+        escribir_varint(datos, frecuencia)
+    with open(ruta, "wb") as archivo:
+        archivo.write(datos)
+
+def cargar_modelo(ruta):
+    with open(ruta, "rb") as archivo:
+        datos = archivo.read()
+    if datos[:len(MAGIA_MODELO)] != MAGIA_MODELO:
+        raise ValueError(f"'{ruta}' no es un modelo compartido.")
+    cantidad, posicion = leer_varint(datos, len(MAGIA_MODELO))
+    frecuencias = {}
+    for _ in range(cantidad):
+        simbolo, posicion = leer_varint(datos, posicion)
+        frecuencias[simbolo], posicion = leer_varint(datos, posicion)
+    return frecuencias
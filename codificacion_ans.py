@@ -0,0 +1,170 @@
+# Codificacion con sistemas numericos asimetricos (ANS): tANS, con tablas de estados y salida de bits,
+# y rANS, con un estado entero de 32 bits que se renormaliza de a bytes. Ambos usan las mismas tablas de
+# frecuencias (Counter) que Huffman y aritmetica, escaladas para que sumen 2^precision
+from bits_io import BitWriter
+
+PRECISION_ANS = 12 # las frecuencias se escalan a 2^12 (estados de la tabla de tANS)
+PRECISION_MAXIMA_ANS = 16 # rANS necesita que 2^precision quepa holgado en el estado de 32 bits
+RANS_L = 1 << 23 # limite inferior del estado de rANS; el estado vive en [RANS_L, RANS_L << 8)
+
+# Funcion para elegir la precision segun la cantidad de simbolos (al menos dos estados por simbolo)
+def precision_ans(frecuencias):
+    precision = max(PRECISION_ANS, len(frecuencias).bit_length() + 1)
+    if precision > PRECISION_MAXIMA_ANS:
+        raise ValueError(f"Demasiados símbolos para ANS: {len(frecuencias)}.")
+    return precision
+
+# Funcion para escalar las frecuencias a un total de 2^precision, con al menos 1 por simbolo;
+# el resultado solo depende de la tabla, asi el decodificador lo reconstruye igual
+def normalizar_frecuencias(frecuencias, precision):
+    M = 1 << precision
+    T = sum(frecuencias.values())
+    if T == 0:
+        return {}
+    if len(frecuencias) > M:
+        raise ValueError(f"{len(frecuencias)} símbolos no caben en una tabla de {M} estados.")
+    normalizadas = {simbolo: max(1, frecuencia * M // T) for simbolo, frecuencia in frecuencias.items()}
+    por_frecuencia = sorted(frecuencias, key=lambda simbolo: (-frecuencias[simbolo], simbolo)) # orden fijo
+    diferencia = M - sum(normalizadas.values())
+    if diferencia > 0:
+        normalizadas[por_frecuencia[0]] += diferencia # lo que sobra va al simbolo mas frecuente
+    while diferencia < 0: # se quita de a uno a los mas frecuentes sin bajar de 1
+        for simbolo in por_frecuencia:
+            if diferencia == 0:
+                break
+            if normalizadas[simbolo] > 1:
+                normalizadas[simbolo] -= 1
+                diferencia += 1
+    return normalizadas
+
+# Funcion para calcular el limite inferior y la frecuencia de cada simbolo, y la tabla
+# posicion -> simbolo de los 2^precision valores (el simbolo de cada estado en rANS)
+def acumulados_ans(normalizadas):
+    acumulados = {}
+    simbolo_de_posicion = []
+    acumulado = 0
+    for simbolo, frecuencia in normalizadas.items():
+        acumulados[simbolo] = (acumulado, frecuencia)
+        simbolo_de_posicion.extend([simbolo] * frecuencia)
+        acumulado += frecuencia
+    return acumulados, simbolo_de_posicion
+
+
+# tANS
+
+# Funcion para construir las tablas de tANS: los simbolos se reparten por los 2^precision estados
+# saltando de a un paso impar (cada simbolo queda disperso por toda la tabla)
+def construir_tablas_tans(normalizadas, precision):
+    M = 1 << precision
+    paso = (M >> 1) + (M >> 3) + 3 # impar: recorre todos los estados
+    simbolo_de_estado = [None] * M
+    posicion = 0
+    for simbolo, frecuencia in normalizadas.items():
+        for _ in range(frecuencia):
+            simbolo_de_estado[posicion] = simbolo
+            posicion = (posicion + paso) & (M - 1)
+
+    acumulados, _ = acumulados_ans(normalizadas)
+    siguiente = dict(normalizadas) # siguiente subestado de cada simbolo, de f a 2f - 1
+    decodificacion = [None] * M # estado -> (simbolo, bits a leer, base del siguiente estado)
+    codificacion = [0] * M # (limite del simbolo + subestado - f) -> estado en [M, 2M)
+    for estado, simbolo in enumerate(simbolo_de_estado):
+        subestado = siguiente[simbolo]
+        siguiente[simbolo] += 1
+        bits = precision - (subestado.bit_length() - 1)
+        decodificacion[estado] = (simbolo, bits, (subestado << bits) - M)
+        limite, frecuencia = acumulados[simbolo]
+        codificacion[limite + subestado - frecuencia] = estado + M
+    return {"decodificacion": decodificacion, "codificacion": codificacion, "acumulados": acumulados}
+
+# Funcion para codificar un mensaje con tANS; retorna un BitWriter con el estado final (precision bits)
+# seguido de los bits de cada paso. Se codifica de atras hacia adelante para que el decodificador avance hacia adelante
+def codificar_tans(mensaje, frecuencias, precision):
+    if not mensaje:
+        return BitWriter()
+    M = 1 << precision
+    tablas = construir_tablas_tans(normalizar_frecuencias(frecuencias, precision), precision)
+    codificacion, acumulados = tablas["codificacion"], tablas["acumulados"]
+    estado = M
+    salidas = [] # (valor, bits) de cada paso, en orden inverso al de lectura
+    for simbolo in reversed(mensaje):
+        limite, frecuencia = acumulados[simbolo]
+        bits = estado.bit_length() - frecuencia.bit_length() # bits a sacar para que estado >> bits quede en [f, 2f)
+        if estado >> bits < frecuencia:
+            bits -= 1
+        salidas.append((estado & ((1 << bits) - 1), bits))
+        estado = codificacion[limite + (estado >> bits) - frecuencia]
+
+    escritor = BitWriter()
+    escritor.write_bits(estado - M, precision)
+    for valor, bits in reversed(salidas):
+        escritor.write_bits(valor, bits)
+    return escritor
+
+# Funcion para decodificar `n` simbolos de tANS desde los bytes de la carga
+def decodificar_simbolos_tans(carga, n, frecuencias, precision):
+    if n == 0:
+        return []
+    decodificacion = construir_tablas_tans(normalizar_frecuencias(frecuencias, precision), precision)["decodificacion"]
+    datos = memoryview(carga).cast("B")
+    acumulador = int.from_bytes(bytes(datos[:7]).ljust(7, b"\0"), "big") # ceros despues del final
+    posicion, disponibles = 7, 56 - precision
+    estado = acumulador >> disponibles # el primer valor es el estado inicial
+    acumulador &= (1 << disponibles) - 1
+    mensaje_decodificado = [None] * n
+    for indice in range(n):
+        simbolo, bits, base = decodificacion[estado]
+        mensaje_decodificado[indice] = simbolo
+        if disponibles < bits: # recarga 7 bytes de una vez
+            acumulador = (acumulador << 56) | int.from_bytes(bytes(datos[posicion:posicion + 7]).ljust(7, b"\0"), "big")
+            posicion += 7
+            disponibles += 56
+        disponibles -= bits
+        estado = base + (acumulador >> disponibles)
+        acumulador &= (1 << disponibles) - 1
+    return mensaje_decodificado
+
+
+# rANS
+
+# Funcion para codificar un mensaje con rANS; retorna los bytes (estado final de 4 bytes y renormalizaciones)
+def codificar_rans(mensaje, frecuencias, precision):
+    if not mensaje:
+        return b""
+    acumulados, _ = acumulados_ans(normalizar_frecuencias(frecuencias, precision))
+    salida = bytearray() # bytes en orden inverso al de lectura
+    estado = RANS_L
+    limite_base = (RANS_L >> precision) << 8
+    for simbolo in reversed(mensaje):
+        limite, frecuencia = acumulados[simbolo]
+        maximo = limite_base * frecuencia
+        while estado >= maximo: # renormaliza sacando bytes bajos
+            salida.append(estado & 0xFF)
+            estado >>= 8
+        estado = ((estado // frecuencia) << precision) + estado % frecuencia + limite
+    salida += estado.to_bytes(4, "little")
+    salida.reverse()
+    return bytes(salida)
+
+# Funcion para decodificar `n` simbolos de rANS desde los bytes de la carga
+def decodificar_simbolos_rans(carga, n, frecuencias, precision):
+    if n == 0:
+        return []
+    acumulados, simbolo_de_posicion = acumulados_ans(normalizar_frecuencias(frecuencias, precision))
+    datos = memoryview(carga).cast("B")
+    if len(datos) < 4:
+        raise ValueError("El archivo está truncado.")
+    mascara = (1 << precision) - 1
+    estado = int.from_bytes(datos[:4], "big")
+    posicion = 4
+    mensaje_decodificado = [None] * n
+    for indice in range(n):
+        posicion_simbolo = estado & mascara
+        simbolo = simbolo_de_posicion[posicion_simbolo]
+        mensaje_decodificado[indice] = simbolo
+        limite, frecuencia = acumulados[simbolo]
+        estado = frecuencia * (estado >> precision) + posicion_simbolo - limite
+        while estado < RANS_L: # renormaliza leyendo bytes
+            estado = (estado << 8) | (datos[posicion] if posicion < len(datos) else 0)
+            posicion += 1
+    return mensaje_decodificado
@@ -0,0 +1,388 @@
+# Etapa de diccionario LZ77 (variante LZSS: literales o pares longitud/distancia) con ventana deslizante
+# de 32 KB y cadenas de hash para buscar repeticiones. Los tokens se codifican despues con Huffman
+# (una tabla para literales/longitudes y otra para distancias, como deflate) o con aritmetica adaptativa
+from array import array
+from bisect import bisect_right
+from collections import Counter
+
+from bits_io import BitWriter
+from Lab3_Codificacion_SergioCardona import (
+    SIMBOLO_FIN, CodificadorAritmetico, DecodificadorAritmetico, K_ADAPTATIVO, ModeloAdaptativo,
+    codigos_canonicos, construir_tabla_huffman, tabla_huffman_canonica, validar_longitudes,
+)
+
+VENTANA_LZ = 1 << 15 # distancia maxima de una coincidencia
+MASCARA_VENTANA = VENTANA_LZ - 1
+LONGITUD_MINIMA_LZ = 3
+LONGITUD_MAXIMA_LZ = 258
+BITS_HASH = 15 # las cadenas empiezan en una tabla de 2^15 entradas (hash de 3 bytes)
+FIN_LZ = SIMBOLO_FIN # 0-255 literales, 256 fin (solo en el modo adaptativo), 257-285 longitudes
+NUM_SIMBOLOS_LZ = 286
+NUM_DISTANCIAS_LZ = 30
+LONGITUD_CODIGO_LZ = 15 # bits maximos de un codigo de Huffman de LZ77
+NIVEL_LZ = 6
+
+# Nivel de esfuerzo -> (candidatos que se revisan por posicion, longitud que ya no se intenta mejorar,
+# busqueda perezosa). Mas candidatos encuentran coincidencias mas largas a cambio de tiempo
+NIVELES_LZ = {
+    1: (4, 8, False), 2: (8, 16, False), 3: (16, 32, False),
+    4: (16, 32, True), 5: (32, 64, True), 6: (128, 128, True),
+    7: (256, 258, True), 8: (1024, 258, True), 9: (4096, 258, True),
+}
+
+# Funcion para armar las bases y los bits extra de los codigos de longitud o de distancia: cada
+# `por_grupo` codigos se agrega un bit extra (los primeros 2 * por_grupo no tienen bits extra)
+def tabla_bases(cantidad, por_grupo, base):
+    bases, extras = [], []
+    for codigo in range(cantidad):
+        extra = max(0, codigo // por_grupo - 1)
+        bases.append(base)
+        extras.append(extra)
+        base += 1 << extra
+    return bases, extras
+
+BASES_LONGITUD, EXTRAS_LONGITUD = tabla_bases(28, 4, LONGITUD_MINIMA_LZ)
+BASES_LONGITUD.append(LONGITUD_MAXIMA_LZ) # 258 tiene su propio codigo, sin bits extra
+EXTRAS_LONGITUD.append(0)
+BASES_DISTANCIA, EXTRAS_DISTANCIA = tabla_bases(NUM_DISTANCIAS_LZ, 2, 1)
+CODIGO_LONGITUD = [0] * LONGITUD_MINIMA_LZ + [bisect_right(BASES_LONGITUD, longitud) - 1 for longitud in range(LONGITUD_MINIMA_LZ, LONGITUD_MAXIMA_LZ + 1)]
+
+def codigo_distancia(distancia):
+    return bisect_right(BASES_DISTANCIA, distancia) - 1
+
+# Los tokens son enteros: un literal es el byte (0-255) y una coincidencia es (longitud << 16) | distancia,
+# asi una lista de tokens entra en un array("I")
+
+
+# Busqueda de coincidencias
+
+# Buscador de coincidencias por bloques: guarda los ultimos VENTANA_LZ bytes y las cadenas de hash
+# entre una llamada y otra, asi las coincidencias cruzan los bordes de los bloques
+class BuscadorLZ:
+    __slots__ = ("max_cadena", "suficiente", "perezosa", "datos", "inicio", "posicion", "insertadas", "cabezas", "previos")
+
+    def __init__(self, nivel=NIVEL_LZ):
+        if nivel not in NIVELES_LZ:
+            raise ValueError(f"Nivel de LZ77 no válido: {nivel} (1 a 9).")
+        self.max_cadena, self.suficiente, self.perezosa = NIVELES_LZ[nivel]
+        self.datos = bytearray() # ventana y bytes aun no codificados
+        self.inicio = 0 # posicion absoluta de datos[0]
+        self.posicion = 0 # siguiente posicion absoluta a codificar
+        self.insertadas = 0 # las posiciones anteriores ya estan en las cadenas
+        self.cabezas = [-1] * (1 << BITS_HASH) # hash -> ultima posicion con esos 3 bytes
+        self.previos = [-1] * VENTANA_LZ # posicion -> posicion anterior con el mismo hash
+
+    # Agrega a las cadenas las posiciones hasta `hasta` (exclusiva) que tengan 3 bytes completos
+    def insertar_hasta(self, hasta):
+        datos, inicio, cabezas, previos = self.datos, self.inicio, self.cabezas, self.previos
+        mascara = (1 << BITS_HASH) - 1
+        hasta = min(hasta, inicio + len(datos) - 2)
+        for posicion in range(self.insertadas, hasta):
+            relativa = posicion - inicio
+            clave = ((datos[relativa] << 10) ^ (datos[relativa + 1] << 5) ^ datos[relativa + 2]) & mascara
+            previos[posicion & MASCARA_VENTANA] = cabezas[clave]
+            cabezas[clave] = posicion
+        self.insertadas = max(self.insertadas, hasta)
+
+    # Retorna (longitud, distancia) de la coincidencia mas larga para la posicion `posicion`
+    # recorriendo a lo sumo max_cadena candidatos; longitud 0 si no hay ninguna de 3 bytes o mas
+    def buscar(self, posicion, fin):
+        datos, inicio, previos = self.datos, self.inicio, self.previos
+        relativa = posicion - inicio
+        maximo = min(LONGITUD_MAXIMA_LZ, fin - posicion)
+        if maximo < LONGITUD_MINIMA_LZ:
+            return 0, 0
+        clave = ((datos[relativa] << 10) ^ (datos[relativa + 1] << 5) ^ datos[relativa + 2]) & ((1 << BITS_HASH) - 1)
+        candidato = self.cabezas[clave]
+        limite = max(posicion - VENTANA_LZ, -1) # los candidatos mas viejos ya salieron de la ventana
+        mejor, distancia = LONGITUD_MINIMA_LZ - 1, 0
+        cadena = self.max_cadena
+        while candidato > limite and cadena:
+            anterior = candidato - inicio
+            if datos[anterior + mejor] == datos[relativa + mejor]: # descarta rapido a los que no pueden mejorar
+                longitud = 0
+                while longitud + 8 <= maximo and datos[anterior + longitud:anterior + longitud + 8] == datos[relativa + longitud:relativa + longitud + 8]:
+                    longitud += 8
+                while longitud < maximo and datos[anterior + longitud] == datos[relativa + longitud]:
+                    longitud += 1
+                if longitud > mejor:
+                    mejor, distancia = longitud, posicion - candidato
+                    if longitud >= self.suficiente or longitud == maximo:
+                        break
+            candidato = previos[candidato & MASCARA_VENTANA]
+            cadena -= 1
+        return (mejor, distancia) if distancia else (0, 0)
+
+    # Agrega un bloque y retorna los tokens que ya se pueden decidir; salvo con `final`, los ultimos
+    # LONGITUD_MAXIMA_LZ bytes quedan para la siguiente llamada (una coincidencia podria seguir en el proximo bloque)
+    def agregar(self, bloque, final=False):
+        datos = self.datos
+        datos += bloque
+        fin = self.inicio + len(datos)
+        limite = fin if final else fin - LONGITUD_MAXIMA_LZ
+        tokens = []
+        posicion = self.posicion
+        while posicion < limite:
+            self.insertar_hasta(posicion)
+            longitud, distancia = self.buscar(posicion, fin)
+            if longitud and self.perezosa and longitud < self.suficiente and posicion + 1 < limite:
+                self.insertar_hasta(posicion + 1)
+                siguiente_longitud, siguiente_distancia = self.buscar(posicion + 1, fin)
+                if siguiente_longitud > longitud: # conviene un literal y la coincidencia siguiente
+                    tokens.append(datos[posicion - self.inicio])
+                    posicion += 1
+                    longitud, distancia = siguiente_longitud, siguiente_distancia
+            if longitud:
+                tokens.append((longitud << 16) | distancia)
+                if not self.perezosa and longitud > self.suficiente:
+                    self.insertadas = posicion + longitud # niveles rapidos: no se indexa dentro de las coincidencias largas
+                posicion += longitud
+            else:
+                tokens.append(datos[posicion - self.inicio])
+                posicion += 1
+        self.posicion = posicion
+
+        # Se descarta lo que quedo fuera de la ventana (de a bloques grandes para no mover bytes en cada llamada)
+        corte = posicion - VENTANA_LZ - self.inicio
+        if corte >= VENTANA_LZ:
+            del datos[:corte]
+            self.inicio += corte
+        return tokens
+
+# Funcion para obtener los tokens de LZ77 de unos datos en memoria
+def tokens_lz77(datos, nivel=NIVEL_LZ):
+    return array("I", BuscadorLZ(nivel).agregar(datos, final=True))
+
+
+# Codificacion con Huffman
+
+# Funcion para contar los simbolos de literal/longitud y los codigos de distancia de los tokens
+def frecuencias_lz77(tokens):
+    literales, distancias = Counter(), Counter()
+    for token, veces in Counter(tokens).items():
+        if token < 256:
+            literales[token] += veces
+        else:
+            literales[257 + CODIGO_LONGITUD[token >> 16]] += veces
+            distancias[codigo_distancia(token & 0xFFFF)] += veces
+    return dict(sorted(literales.items())), dict(sorted(distancias.items()))
+
+# Funcion para armar las dos tablas canonicas; retorna (codigos de literales, codigos de distancias, modelo),
+# donde el modelo junta las longitudes de ambas para la cabecera
+def tablas_lz77(tokens):
+    return tablas_frecuencias_lz77(*frecuencias_lz77(tokens))
+
+# Las mismas tablas a partir de las frecuencias (por ejemplo sumadas bloque a bloque)
+def tablas_frecuencias_lz77(literales, distancias):
+    codigos_literales = tabla_huffman_canonica(literales, LONGITUD_CODIGO_LZ) if literales else {}
+    codigos_distancias = tabla_huffman_canonica(distancias, LONGITUD_CODIGO_LZ) if distancias else {}
+    modelo = {simbolo: len(codigo) for simbolo, codigo in codigos_literales.items()}
+    modelo.update((NUM_SIMBOLOS_LZ + simbolo, len(codigo)) for simbolo, codigo in codigos_distancias.items())
+    return codigos_literales, codigos_distancias, modelo
+
+# Funcion para calcular los bits que ocupan los tokens con estas tablas, bits extra incluidos
+def bits_lz77(literales, distancias, codigos_literales, codigos_distancias):
+    bits = sum(veces * len(codigos_literales[simbolo]) for simbolo, veces in literales.items())
+    bits += sum(veces * EXTRAS_LONGITUD[simbolo - 257] for simbolo, veces in literales.items() if simbolo > 256)
+    return bits + sum(veces * (len(codigos_distancias[codigo]) + EXTRAS_DISTANCIA[codigo]) for codigo, veces in distancias.items())
+
+# Funcion para separar el modelo de la cabecera en las longitudes de cada tabla
+def separar_modelo_lz77(modelo):
+    literales = {simbolo: longitud for simbolo, longitud in modelo.items() if simbolo < NUM_SIMBOLOS_LZ}
+    distancias = {simbolo - NUM_SIMBOLOS_LZ: longitud for simbolo, longitud in modelo.items() if simbolo >= NUM_SIMBOLOS_LZ}
+    return literales, distancias
+
+# Escribe en `bits` los tokens con las dos tablas de Huffman; el codigo de una longitud o distancia
+# y sus bits extra se escriben juntos (valores ya combinados que se calculan una vez por token distinto)
+def codificar_tokens_huffman(tokens, codigos_literales, codigos_distancias, bits=None):
+    bits = BitWriter() if bits is None else bits
+    enteros_literales = {simbolo: (int(codigo, 2), len(codigo)) for simbolo, codigo in codigos_literales.items()}
+    enteros_distancias = {simbolo: (int(codigo, 2), len(codigo)) for simbolo, codigo in codigos_distancias.items()}
+    combinados = {} # token -> (valor, bits) de literal, o de longitud y distancia con sus bits extra
+    for token in tokens:
+        entrada = combinados.get(token)
+        if entrada is None:
+            if token < 256:
+                entrada = enteros_literales[token]
+            else:
+                longitud, distancia = token >> 16, token & 0xFFFF
+                codigo = CODIGO_LONGITUD[longitud]
+                valor, usados = enteros_literales[257 + codigo]
+                extra = EXTRAS_LONGITUD[codigo]
+                valor, usados = (valor << extra) | (longitud - BASES_LONGITUD[codigo]), usados + extra
+                codigo = codigo_distancia(distancia)
+                valor_distancia, usados_distancia = enteros_distancias[codigo]
+                extra = EXTRAS_DISTANCIA[codigo]
+                valor = (((valor << usados_distancia) | valor_distancia) << extra) | (distancia - BASES_DISTANCIA[codigo])
+                entrada = (valor, usados + usados_distancia + extra)
+            combinados[token] = entrada
+        bits.write_bits(*entrada)
+    return bits
+
+# Funcion para leer un simbolo de Huffman con las tablas de construir_tabla_huffman
+def leer_simbolo_huffman(lector, tabla):
+    longitud_max, ancho = tabla["longitud_max"], tabla["ancho"]
+    bloque = lector.peek_bits(longitud_max)
+    entrada = tabla["simple"][bloque >> (longitud_max - ancho)]
+    if entrada is None:
+        raise ValueError(f"Código de Huffman no válido en el bit {lector.posicion}.")
+    simbolo, usados = entrada
+    if usados == 0: # codigo mas largo que la ventana
+        for longitud in range(ancho + 1, longitud_max + 1):
+            simbolo = tabla["largos"].get((longitud, bloque >> (longitud_max - longitud)))
+            if simbolo is not None:
+                usados = longitud
+                break
+        else:
+            raise ValueError(f"Código de Huffman no válido en el bit {lector.posicion}.")
+    lector.skip_bits(usados)
+    return simbolo
+
+# Agrega a `salida` la copia de `longitud` bytes que empieza `distancia` bytes atras (puede solaparse)
+def copiar_coincidencia(salida, longitud, distancia):
+    if distancia > len(salida):
+        raise ValueError("Distancia de LZ77 fuera de la ventana.")
+    inicio = len(salida) - distancia
+    if distancia >= longitud:
+        salida += salida[inicio:inicio + longitud]
+    else: # la copia se repite a si misma cada `distancia` bytes
+        salida += (salida[inicio:] * (longitud // distancia + 1))[:longitud]
+
+# Funcion para sacar de `salida` los bytes no entregados cuando pasan de `tam_bloque`; conserva la
+# ventana para las copias siguientes. Retorna (bytes entregados que quedan en salida, bloque o None)
+def entregar_bloques(salida, entregados, tam_bloque):
+    if len(salida) - entregados < tam_bloque:
+        return entregados, None
+    bloque = bytes(salida[entregados:])
+    del salida[:max(len(salida) - VENTANA_LZ, 0)]
+    return len(salida), bloque
+
+# Generador que decodifica `n` bytes de LZ77 + Huffman y los entrega en bloques de hasta unos `tam_bloque`
+def decodificar_lz77_huffman_bloques(lector, n, modelo, tam_bloque=1 << 16):
+    if n == 0:
+        return
+    longitudes_literales, longitudes_distancias = separar_modelo_lz77(modelo)
+    tabla_literales = construir_tabla_huffman(codigos_canonicos(validar_longitudes(longitudes_literales)))
+    tabla_distancias = construir_tabla_huffman(codigos_canonicos(validar_longitudes(longitudes_distancias))) if longitudes_distancias else None
+    salida = bytearray()
+    entregados = 0 # bytes de `salida` ya entregados
+    producidos = 0
+    while producidos < n:
+        simbolo = leer_simbolo_huffman(lector, tabla_literales)
+        if simbolo < 256:
+            salida.append(simbolo)
+            producidos += 1
+        else:
+            codigo = simbolo - 257
+            if not 0 <= codigo < len(BASES_LONGITUD) or tabla_distancias is None:
+                raise ValueError(f"Símbolo de LZ77 no válido: {simbolo}.")
+            longitud = BASES_LONGITUD[codigo] + lector.read_bits(EXTRAS_LONGITUD[codigo])
+            codigo = leer_simbolo_huffman(lector, tabla_distancias)
+            if not 0 <= codigo < len(BASES_DISTANCIA):
+                raise ValueError(f"Código de distancia de LZ77 no válido: {codigo}.")
+            distancia = BASES_DISTANCIA[codigo] + lector.read_bits(EXTRAS_DISTANCIA[codigo])
+            copiar_coincidencia(salida, longitud, distancia)
+            producidos += longitud
+        entregados, bloque = entregar_bloques(salida, entregados, tam_bloque)
+        if bloque:
+            lector.comprobar_relleno()
+            yield bloque
+    if producidos != n:
+        raise ValueError("La longitud decodificada no coincide con la cabecera.")
+    if len(salida) > entregados:
+        yield bytes(salida[entregados:])
+
+
+# Codificacion aritmetica adaptativa
+
+# Codificador de tokens con dos modelos adaptativos (literal/longitud y distancia); los bits extra
+# se codifican con probabilidad uniforme. Una sola pasada: no hay tablas en la cabecera
+class CodificadorLZAdaptativo:
+    __slots__ = ("codificador", "literales", "distancias")
+
+    def __init__(self, k=K_ADAPTATIVO, bits=None):
+        self.codificador = CodificadorAritmetico(k, bits)
+        self.literales = ModeloAdaptativo(k, NUM_SIMBOLOS_LZ)
+        self.distancias = ModeloAdaptativo(k, NUM_DISTANCIAS_LZ)
+
+    def codificar_simbolo(self, modelo, simbolo):
+        f_i, f_i_plus_1 = modelo.limites(simbolo)
+        self.codificador.codificar(f_i, f_i_plus_1, modelo.total)
+        modelo.actualizar(simbolo)
+
+    def codificar_extra(self, valor, extra):
+        if extra:
+            self.codificador.codificar(valor, valor + 1, 1 << extra)
+
+    def codificar(self, tokens):
+        for token in tokens:
+            if token < 256:
+                self.codificar_simbolo(self.literales, token)
+                continue
+            longitud, distancia = token >> 16, token & 0xFFFF
+            codigo = CODIGO_LONGITUD[longitud]
+            self.codificar_simbolo(self.literales, 257 + codigo)
+            self.codificar_extra(longitud - BASES_LONGITUD[codigo], EXTRAS_LONGITUD[codigo])
+            codigo = codigo_distancia(distancia)
+            self.codificar_simbolo(self.distancias, codigo)
+            self.codificar_extra(distancia - BASES_DISTANCIA[codigo], EXTRAS_DISTANCIA[codigo])
+
+    # Codifica el simbolo de fin y los bits finales
+    def finalizar(self):
+        f_i, f_i_plus_1 = self.literales.limites(FIN_LZ)
+        self.codificador.codificar(f_i, f_i_plus_1, self.literales.total)
+        return self.codificador.finalizar()
+
+# Generador que decodifica LZ77 + aritmetica adaptativa hasta el simbolo de fin
+def decodificar_lz77_adaptativo_bloques(lector, k=K_ADAPTATIVO, tam_bloque=1 << 16):
+    decodificador = DecodificadorAritmetico(k, lector)
+    literales = ModeloAdaptativo(k, NUM_SIMBOLOS_LZ)
+    distancias = ModeloAdaptativo(k, NUM_DISTANCIAS_LZ)
+
+    def leer_simbolo(modelo):
+        simbolo, f_i = modelo.arbol.buscar(decodificador.valor(modelo.total))
+        decodificador.actualizar(f_i, f_i + modelo.frecuencias[simbolo], modelo.total)
+        modelo.actualizar(simbolo)
+        return simbolo
+
+    def leer_extra(extra):
+        if not extra:
+            return 0
+        valor = decodificador.valor(1 << extra)
+        decodificador.actualizar(valor, valor + 1, 1 << extra)
+        return valor
+
+    salida = bytearray()
+    entregados = 0
+    while True:
+        simbolo, f_i = literales.arbol.buscar(decodificador.valor(literales.total))
+        decodificador.actualizar(f_i, f_i + literales.frecuencias[simbolo], literales.total)
+        if simbolo == FIN_LZ:
+            break
+        literales.actualizar(simbolo)
+        if simbolo < 256:
+            salida.append(simbolo)
+        else:
+            codigo = simbolo - 257
+            longitud = BASES_LONGITUD[codigo] + leer_extra(EXTRAS_LONGITUD[codigo])
+            codigo = leer_simbolo(distancias)
+            copiar_coincidencia(salida, longitud, BASES_DISTANCIA[codigo] + leer_extra(EXTRAS_DISTANCIA[codigo]))
+        lector.comprobar_relleno() # un archivo truncado no se decodifica para siempre
+        entregados, bloque = entregar_bloques(salida, entregados, tam_bloque)
+        if bloque:
+            yield bloque
+    lector.comprobar_relleno()
+    if len(salida) > entregados:
+        yield bytes(salida[entregados:])
+
+
+# Funciones para datos en memoria (retornan un BitWriter)
+def codificar_lz77_huffman(datos, nivel=NIVEL_LZ):
+    tokens = tokens_lz77(datos, nivel)
+    codigos_literales, codigos_distancias, modelo = tablas_lz77(tokens)
+    return codificar_tokens_huffman(tokens, codigos_literales, codigos_distancias), modelo
+
+def codificar_lz77_adaptativo(datos, nivel=NIVEL_LZ, k=K_ADAPTATIVO):
+    codificador = CodificadorLZAdaptativo(k)
+    codificador.codificar(tokens_lz77(datos, nivel))
+    return codificador.finalizar()
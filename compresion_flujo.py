@@ -0,0 +1,502 @@
+# Compresion de archivos por flujo: se leen bloques de tamaño fijo y la salida se escribe
+# a medida que se produce, asi la memoria no depende del tamaño del archivo
+import argparse
+import io
+import os
+from contextlib import nullcontext
+from array import array
+from collections import Counter
+
+from bits_io import BitReader, BitWriter
+from codificacion_lz77 import (
+    NIVEL_LZ, BuscadorLZ, CodificadorLZAdaptativo, bits_lz77, codificar_tokens_huffman, decodificar_lz77_adaptativo_bloques,
+    decodificar_lz77_huffman_bloques, frecuencias_lz77, tablas_frecuencias_lz77,
+)
+from contenedor import (
+    METODO_ARITMETICA, METODO_HUFFMAN, METODO_LZ77, METODO_RANGO, MODO_ADAPTATIVO, MODO_AUTOMATICO, MODO_BWT, MODO_CONTEXTO,
+    MODO_INTERCALADO,
+    SIMBOLOS_BYTES,
+    leer_cabecera, serializar_cabecera,
+)
+from huffman_vectorizado import codificar_simbolos, contar_bytes
+from Lab3_Codificacion_SergioCardona import (
+    FLUJOS_HUFFMAN, MAX_CONTEXTOS, ORDEN_CONTEXTO, CodificadorAdaptativo, CodificadorContexto, CodificadorRango,
+    CodificadorVitter, DecodificadorAritmetico, DecodificadorRango, K_ADAPTATIVO, codigos_canonicos, construir_limites,
+    construir_tabla_huffman, costo_longitud_maxima, crear_codificador_aritmetico, decodificar_huffman_adaptativo_bloques,
+    decodificar_simbolos_aritmetica, decodificar_simbolos_huffman, decodificar_simbolos_huffman_intercalado,
+    int_arith_decode_adaptativo_bloques, int_arith_decode_contexto_bloques, k_rango, tabla_huffman_canonica,
+    validar_longitudes,
+)
+from metricas import contar, etapa, medir
+from transformada_bwt import TAM_BLOQUE_BWT, invertir_bloque, transformar_bloque
+
+TAM_BLOQUE = 1 << 20 # bytes que se leen en cada paso
+METODOS_FLUJO = ("huffman", "huffman4", "aritmetica", "rango", "adaptativa", "contexto", "lz77", "lz77a", "bwt", "vitter")
+METODOS_LZ = ("lz77", "lz77a") # diccionario LZ77 antes de Huffman o de aritmetica adaptativa
+METODOS_SIN_TABLA = ("adaptativa", "contexto", "bwt", "vitter") + METODOS_LZ # no usan una tabla de frecuencias de los bytes
+METODOS_CON_CACHE = ("huffman", "huffman4", "aritmetica", "rango") # pueden tomar sus tablas de una CacheModelos
+
+# Generador que lee un archivo abierto en bloques de tamaño fijo
+def leer_bloques(archivo, tam_bloque=TAM_BLOQUE):
+    while True:
+        bloque = archivo.read(tam_bloque)
+        if not bloque:
+            return
+        yield bloque
+
+# Generador que abre un archivo y lo lee en bloques (lo cierra al terminar)
+def leer_archivo(ruta, tam_bloque=TAM_BLOQUE):
+    with open(ruta, "rb") as archivo:
+        yield from leer_bloques(archivo, tam_bloque)
+
+# Los codificadores reciben `abrir_bloques`: una funcion que retorna un iterador nuevo de bloques
+# cada vez que se llama (una vez por pasada), por ejemplo lambda: leer_archivo(ruta)
+
+# Primera pasada: tabla de frecuencias de los bytes
+def contar_frecuencias(abrir_bloques):
+    with etapa("frecuencias"):
+        return contar_bytes(abrir_bloques()) # diccionario ordenado por simbolo (np.bincount si hay NumPy)
+
+# Los codificadores estaticos aceptan `frecuencias_compartidas`: una tabla calculada fuera (por ejemplo
+# sobre todo el archivo) que se usa en lugar de la propia y que no se guarda en la cabecera, y `cache`:
+# una CacheModelos (cache_modelos) de donde se toman los codigos o limites ya armados. Con la cache, la
+# tabla propia se reemplaza por la de su huella normalizada (la que se guarda en la cabecera)
+
+# Codigos de Huffman del bloque: (codigos, codigos como (valor, longitud))
+def codigos_huffman_flujo(frecuencias, frecuencias_compartidas, longitud_maxima, cache):
+    if not frecuencias:
+        return {}, {}
+    if cache is not None:
+        return cache.codigos_huffman(frecuencias_compartidas or frecuencias, longitud_maxima, not frecuencias_compartidas)
+    codigos = tabla_huffman_canonica(frecuencias_compartidas or frecuencias, longitud_maxima)
+    return codigos, {simbolo: (int(codigo, 2), len(codigo)) for simbolo, codigo in codigos.items()}
+
+# Generador de la salida de Huffman: cabecera y luego la carga a medida que se codifica;
+# `longitud_maxima` limita la longitud de los codigos (tablas de decodificacion mas chicas)
+def codificar_flujo_huffman(abrir_bloques, frecuencias_compartidas=None, longitud_maxima=None, cache=None):
+    frecuencias = contar_frecuencias(abrir_bloques)
+    codigos, codigos_enteros = codigos_huffman_flujo(frecuencias, frecuencias_compartidas, longitud_maxima, cache)
+    longitudes = {simbolo: len(codigo) for simbolo, codigo in codigos.items()}
+    n = sum(frecuencias.values())
+    num_bits = sum(frecuencia * longitudes[simbolo] for simbolo, frecuencia in frecuencias.items()) # conocido antes de codificar
+    modelo = {} if frecuencias_compartidas else longitudes
+    yield bytes(serializar_cabecera(METODO_HUFFMAN, MODO_AUTOMATICO, n, 0, modelo, num_bits, SIMBOLOS_BYTES))
+
+    bits = BitWriter()
+    for bloque in abrir_bloques():
+        with etapa("codificacion_huffman"):
+            codificar_simbolos(bloque, codigos_enteros, bits)
+        yield bits.drain() # bytes completos de este bloque
+    contar("bits_huffman", len(bits)) # len cuenta todos los bits escritos, no solo los pendientes
+    yield bits.getvalue() # ultimo byte incompleto
+
+# Generador de la salida de Huffman adaptativo (Vitter): una sola pasada, sin tabla en la cabecera;
+# cada bloque se escribe apenas se codifica
+def codificar_flujo_vitter(abrir_bloques, frecuencias_compartidas=None):
+    yield bytes(serializar_cabecera(METODO_HUFFMAN, MODO_ADAPTATIVO, 0, 0, {}, 0, SIMBOLOS_BYTES))
+    codificador = CodificadorVitter()
+    for bloque in abrir_bloques():
+        codificador.codificar(bloque)
+        yield codificador.bits.drain()
+    yield codificador.finalizar().getvalue()
+
+# Generador de la salida de Huffman con FLUJOS_HUFFMAN flujos intercalados: dentro de cada bloque, el byte
+# i va al flujo i % FLUJOS_HUFFMAN. La tabla va en la cabecera general (sin parametros) y cada bloque se
+# escribe apenas se codifica, como un contenedor propio con los bits de cada uno de sus flujos
+def codificar_flujo_huffman_intercalado(abrir_bloques, frecuencias_compartidas=None, longitud_maxima=None, cache=None):
+    frecuencias = contar_frecuencias(abrir_bloques)
+    codigos, codigos_enteros = codigos_huffman_flujo(frecuencias, frecuencias_compartidas, longitud_maxima, cache)
+    n = sum(frecuencias.values())
+    modelo = {} if frecuencias_compartidas else {simbolo: len(codigo) for simbolo, codigo in codigos.items()}
+    yield bytes(serializar_cabecera(METODO_HUFFMAN, MODO_INTERCALADO, n, 0, modelo, 0, SIMBOLOS_BYTES))
+    for bloque in abrir_bloques():
+        if not bloque:
+            continue
+        flujos = [BitWriter() for _ in range(FLUJOS_HUFFMAN)]
+        for numero, flujo in enumerate(flujos):
+            codificar_simbolos(bloque[numero::FLUJOS_HUFFMAN], codigos_enteros, flujo)
+        num_bytes = sum((len(flujo) + 7) // 8 for flujo in flujos) # cada flujo empieza en un byte nuevo
+        yield bytes(serializar_cabecera(METODO_HUFFMAN, MODO_INTERCALADO, len(bloque), 0, {}, num_bytes * 8, SIMBOLOS_BYTES, [len(flujo) for flujo in flujos]))
+        while flujos: # de a un flujo, sin juntar la carga en una segunda copia
+            yield flujos.pop(0).getvalue()
+
+# Generador de la salida con un modelo estatico de intervalos [f_i, f_i+1) de T: aritmetica (misma
+# logica que int_arith_code) o rango (int_range_code); `metodo` es el del contenedor
+def codificar_flujo_intervalos(abrir_bloques, frecuencias_compartidas, metodo, cache=None):
+    if frecuencias_compartidas:
+        n = sum(len(bloque) for bloque in abrir_bloques())
+        frecuencias = frecuencias_compartidas
+    else:
+        frecuencias = contar_frecuencias(abrir_bloques)
+        n = sum(frecuencias.values())
+    limites = None
+    if cache is not None and frecuencias:
+        frecuencias, limites = cache.limites_aritmeticos(frecuencias, not frecuencias_compartidas)
+    T = sum(frecuencias.values())
+    if metodo == METODO_RANGO:
+        k = k_rango(T)
+        codificador = CodificadorRango(k)
+    else:
+        k = max(8, T.bit_length() + 2) # igual que el modo automatico
+        codificador = crear_codificador_aritmetico(k) # cuenta renormalizaciones y casos E3 si hay metricas
+    modelo = {} if frecuencias_compartidas else frecuencias
+    yield bytes(serializar_cabecera(metodo, MODO_AUTOMATICO, n, k, modelo, 0, SIMBOLOS_BYTES))
+
+    if limites is None:
+        limites = construir_limites(frecuencias)["limites"] if frecuencias else {}
+    codificados = 0
+    nombre_etapa = "codificacion_rango" if metodo == METODO_RANGO else "codificacion_aritmetica"
+    for bloque in abrir_bloques():
+        with etapa(nombre_etapa):
+            for simbolo in bloque:
+                f_i, f_i_plus_1 = limites[simbolo]
+                codificador.codificar(f_i, f_i_plus_1, T)
+        codificados += len(bloque)
+        yield codificador.bits.drain()
+    if codificados:
+        yield codificador.finalizar().getvalue()
+
+# Generador de la salida aritmetica estatica
+def codificar_flujo_aritmetica(abrir_bloques, frecuencias_compartidas=None, cache=None):
+    return codificar_flujo_intervalos(abrir_bloques, frecuencias_compartidas, METODO_ARITMETICA, cache)
+
+# Generador de la salida del codificador de rango (renormaliza de a bytes)
+def codificar_flujo_rango(abrir_bloques, frecuencias_compartidas=None, cache=None):
+    return codificar_flujo_intervalos(abrir_bloques, frecuencias_compartidas, METODO_RANGO, cache)
+
+# Generador de la salida aritmetica adaptativa: una sola pasada sobre el archivo
+def codificar_flujo_adaptativa(abrir_bloques, frecuencias_compartidas=None): # el modelo adaptativo no usa tablas
+    yield bytes(serializar_cabecera(METODO_ARITMETICA, MODO_ADAPTATIVO, 0, K_ADAPTATIVO, {}, 0, SIMBOLOS_BYTES))
+    codificador = CodificadorAdaptativo(K_ADAPTATIVO)
+    for bloque in abrir_bloques(): # una sola pasada
+        codificador.codificar(bloque)
+        yield codificador.codificador.bits.drain()
+    yield codificador.finalizar().getvalue()
+
+# Generador de la salida aritmetica con contexto de orden 2: tambien en una sola pasada
+def codificar_flujo_contexto(abrir_bloques, frecuencias_compartidas=None):
+    parametros = (ORDEN_CONTEXTO, MAX_CONTEXTOS)
+    yield bytes(serializar_cabecera(METODO_ARITMETICA, MODO_CONTEXTO, 0, K_ADAPTATIVO, {}, 0, SIMBOLOS_BYTES, parametros))
+    codificador = CodificadorContexto(K_ADAPTATIVO, *parametros)
+    for bloque in abrir_bloques():
+        codificador.codificar(bloque)
+        yield codificador.codificador.bits.drain()
+    yield codificador.finalizar().getvalue()
+
+# Generador de los tokens de LZ77 de cada bloque (una pasada completa del buscador)
+def tokens_por_bloque(abrir_bloques, nivel):
+    buscador = BuscadorLZ(nivel)
+    for bloque in abrir_bloques():
+        yield bloque, buscador.agregar(bloque)
+    yield b"", buscador.agregar(b"", final=True)
+
+# Generador de la salida de LZ77 + Huffman en dos pasadas, como Huffman: la primera solo suma las
+# frecuencias de los tokens para armar las dos tablas y la segunda vuelve a buscar las coincidencias
+# (el buscador da los mismos tokens) y escribe cada bloque apenas se codifica
+def codificar_flujo_lz77(abrir_bloques, frecuencias_compartidas=None, nivel=NIVEL_LZ):
+    literales, distancias = Counter(), Counter()
+    n = 0
+    for bloque, tokens in tokens_por_bloque(abrir_bloques, nivel):
+        literales_bloque, distancias_bloque = frecuencias_lz77(tokens)
+        literales.update(literales_bloque)
+        distancias.update(distancias_bloque)
+        n += len(bloque)
+    literales, distancias = dict(sorted(literales.items())), dict(sorted(distancias.items()))
+
+    codigos_literales, codigos_distancias, modelo = tablas_frecuencias_lz77(literales, distancias)
+    num_bits = bits_lz77(literales, distancias, codigos_literales, codigos_distancias) # conocido antes de codificar
+    yield bytes(serializar_cabecera(METODO_LZ77, MODO_AUTOMATICO, n, 0, modelo, num_bits, SIMBOLOS_BYTES))
+    bits = BitWriter()
+    for _, tokens in tokens_por_bloque(abrir_bloques, nivel):
+        codificar_tokens_huffman(tokens, codigos_literales, codigos_distancias, bits)
+        yield bits.drain()
+    yield bits.getvalue()
+
+# Generador de la salida de LZ77 + aritmetica adaptativa: una sola pasada, los tokens de cada bloque
+# se codifican apenas se encuentran
+def codificar_flujo_lz77_adaptativa(abrir_bloques, frecuencias_compartidas=None, nivel=NIVEL_LZ):
+    yield bytes(serializar_cabecera(METODO_LZ77, MODO_ADAPTATIVO, 0, K_ADAPTATIVO, {}, 0, SIMBOLOS_BYTES))
+    buscador = BuscadorLZ(nivel)
+    codificador = CodificadorLZAdaptativo(K_ADAPTATIVO)
+    for bloque in abrir_bloques():
+        codificador.codificar(buscador.agregar(bloque))
+        yield codificador.codificador.bits.drain()
+    codificador.codificar(buscador.agregar(b"", final=True))
+    yield codificador.finalizar().getvalue()
+
+# Generador que junta los bloques leidos en bloques de `tam_bloque` bytes (el tamaño de la transformada
+# no depende del de lectura)
+def reagrupar_bloques(bloques, tam_bloque):
+    pendiente = bytearray()
+    for bloque in bloques:
+        pendiente += bloque
+        while len(pendiente) >= tam_bloque:
+            yield bytes(pendiente[:tam_bloque])
+            del pendiente[:tam_bloque]
+    if pendiente:
+        yield bytes(pendiente)
+
+# Generador de la salida de Huffman sobre bloques transformados (BWT, mover al frente, rachas de ceros).
+# Cada bloque se escribe apenas se transforma, como un contenedor propio con su tabla de Huffman y su
+# indice primario y cantidad de simbolos en los parametros; la cabecera general solo lleva el tamaño
+def codificar_flujo_bwt(abrir_bloques, frecuencias_compartidas=None, longitud_maxima=None):
+    n = sum(len(bloque) for bloque in abrir_bloques()) # primera pasada: solo el tamaño
+    yield bytes(serializar_cabecera(METODO_HUFFMAN, MODO_BWT, n, 0, {}, 0, SIMBOLOS_BYTES))
+    for bloque in reagrupar_bloques(abrir_bloques(), TAM_BLOQUE_BWT):
+        simbolos, primario = transformar_bloque(bloque)
+        simbolos = array("H", simbolos)
+        frecuencias = dict(sorted(Counter(simbolos).items()))
+        codigos = tabla_huffman_canonica(frecuencias, longitud_maxima)
+        bits = BitWriter()
+        codificar_simbolos(simbolos, {simbolo: (int(codigo, 2), len(codigo)) for simbolo, codigo in codigos.items()}, bits)
+        modelo = {simbolo: len(codigo) for simbolo, codigo in codigos.items()}
+        yield bytes(serializar_cabecera(METODO_HUFFMAN, MODO_BWT, len(bloque), 0, modelo, len(bits), SIMBOLOS_BYTES, [primario, len(simbolos)]))
+        yield bits.getvalue()
+
+CODIFICADORES_FLUJO = {
+    "huffman": codificar_flujo_huffman,
+    "huffman4": codificar_flujo_huffman_intercalado,
+    "aritmetica": codificar_flujo_aritmetica,
+    "rango": codificar_flujo_rango,
+    "adaptativa": codificar_flujo_adaptativa,
+    "contexto": codificar_flujo_contexto,
+    "lz77": codificar_flujo_lz77,
+    "lz77a": codificar_flujo_lz77_adaptativa,
+    "bwt": codificar_flujo_bwt,
+    "vitter": codificar_flujo_vitter,
+}
+
+# Opciones extra del codificador de `metodo`; solo Huffman acepta una longitud maxima de codigo,
+# solo LZ77 un nivel de esfuerzo y solo los metodos con tabla una cache de modelos
+def opciones_codificador(metodo, longitud_maxima=None, nivel=None, cache=None):
+    opciones = {}
+    if longitud_maxima is not None:
+        if metodo not in ("huffman", "huffman4", "bwt"):
+            raise ValueError("La longitud máxima de código solo se puede usar con Huffman.")
+        opciones["longitud_maxima"] = longitud_maxima
+    if nivel is not None:
+        if metodo not in METODOS_LZ:
+            raise ValueError("El nivel solo se puede usar con LZ77.")
+        BuscadorLZ(nivel) # valida el nivel
+        opciones["nivel"] = nivel
+    if cache is not None:
+        if metodo not in METODOS_CON_CACHE:
+            raise ValueError(f"La cache de modelos solo se puede usar con: {', '.join(METODOS_CON_CACHE)}.")
+        opciones["cache"] = cache
+    return opciones
+
+# Modelo que iria en la cabecera de un bloque codificado con estas frecuencias
+# (longitudes de los codigos en Huffman, las frecuencias en aritmetica y rango, nada en los demas)
+def modelo_de_cabecera(metodo, frecuencias, longitud_maxima=None):
+    if metodo in ("huffman", "huffman4"):
+        return {simbolo: len(codigo) for simbolo, codigo in tabla_huffman_canonica(frecuencias, longitud_maxima).items()} if frecuencias else {}
+    if metodo in ("aritmetica", "rango"):
+        return dict(frecuencias)
+    return None
+
+# Tablas de decodificacion de Huffman para las longitudes de la cabecera (de la cache si hay una)
+def tabla_de_cabecera(longitudes, cache=None):
+    if cache is not None:
+        return cache.tabla_huffman(validar_longitudes(longitudes))
+    return construir_tabla_huffman(codigos_canonicos(validar_longitudes(longitudes)))
+
+# Lanza un error si la carga que empieza en `inicio` tiene menos bytes que los de los `num_bits` de la
+# cabecera; el lector ya leyo hasta la posicion actual y el resto se lee sin guardarlo
+def comprobar_carga(archivo, inicio, num_bits, tam_bloque=TAM_BLOQUE):
+    faltan = inicio + (num_bits + 7) // 8 - archivo.tell()
+    while faltan > 0:
+        bloque = archivo.read(min(faltan, tam_bloque))
+        if not bloque:
+            raise ValueError("El archivo está truncado.")
+        faltan -= len(bloque)
+
+# Generador que decodifica la carga de un archivo abierto (despues de la cabecera) en bloques;
+# datos["modelo"] puede venir de un modelo compartido si la cabecera no lo trae, y las tablas de
+# decodificacion de una CacheModelos (`cache`)
+def decodificar_flujo(archivo, datos, tam_bloque=TAM_BLOQUE, cache=None):
+    inicio = archivo.tell()
+    lector = BitReader.from_chunks(leer_bloques(archivo, tam_bloque), datos["num_bits"])
+    n = datos["n"]
+
+    if datos["metodo"] == METODO_ARITMETICA and datos["modo"] == MODO_ADAPTATIVO:
+        yield from int_arith_decode_adaptativo_bloques(lector, datos["k"], tam_bloque)
+        return
+    if datos["metodo"] == METODO_HUFFMAN and datos["modo"] == MODO_ADAPTATIVO:
+        yield from decodificar_huffman_adaptativo_bloques(lector, tam_bloque)
+        return
+    if datos["metodo"] == METODO_LZ77 and datos["modo"] == MODO_ADAPTATIVO:
+        yield from decodificar_lz77_adaptativo_bloques(lector, datos["k"], tam_bloque)
+        return
+    if datos["metodo"] == METODO_ARITMETICA and datos["modo"] == MODO_CONTEXTO:
+        orden, max_contextos = datos["parametros"]
+        yield from int_arith_decode_contexto_bloques(lector, datos["k"], orden, max_contextos, tam_bloque)
+        return
+    if n == 0:
+        return
+
+    if datos["metodo"] == METODO_LZ77:
+        yield from decodificar_lz77_huffman_bloques(lector, n, datos["modelo"], tam_bloque)
+        comprobar_carga(archivo, inicio, datos["num_bits"] or 0, tam_bloque)
+    elif datos["metodo"] == METODO_HUFFMAN and datos["modo"] == MODO_BWT: # un bloque transformado por vez
+        while n > 0:
+            bloque = leer_cabecera(archivo) # cada bloque es un contenedor con su propia tabla
+            if bloque["modo"] != MODO_BWT or len(bloque["parametros"]) != 2 or not 0 < bloque["n"] <= n:
+                raise ValueError("Bloque BWT no válido.")
+            primario, cantidad = bloque["parametros"]
+            num_bits = bloque["num_bits"] or 0
+            carga = archivo.read((num_bits + 7) // 8)
+            if len(carga) * 8 < num_bits:
+                raise ValueError("El archivo está truncado.")
+            simbolos = decodificar_simbolos_huffman(BitReader(carga, num_bits), tabla_de_cabecera(bloque["modelo"], cache), cantidad)
+            if len(simbolos) < cantidad:
+                raise ValueError("El archivo está truncado.")
+            salida = invertir_bloque(simbolos, primario)
+            if len(salida) != bloque["n"]:
+                raise ValueError("El tamaño de un bloque BWT no coincide con su cabecera.")
+            n -= len(salida)
+            yield salida
+    elif datos["metodo"] == METODO_HUFFMAN and datos["modo"] == MODO_INTERCALADO and datos["parametros"]: # un solo bloque (menu del laboratorio)
+        tabla = tabla_de_cabecera(datos["modelo"], cache)
+        simbolos = decodificar_simbolos_huffman_intercalado(archivo.read(), datos["parametros"], tabla, n)
+        if len(simbolos) < n:
+            raise ValueError("El archivo está truncado.")
+        for inicio in range(0, n, tam_bloque):
+            yield bytes(simbolos[inicio:inicio + tam_bloque])
+    elif datos["metodo"] == METODO_HUFFMAN and datos["modo"] == MODO_INTERCALADO: # un bloque por vez
+        tabla = tabla_de_cabecera(datos["modelo"], cache)
+        while n > 0:
+            bloque = leer_cabecera(archivo) # cada bloque es un contenedor con los bits de sus flujos
+            if bloque["modo"] != MODO_INTERCALADO or len(bloque["parametros"]) != FLUJOS_HUFFMAN or not 0 < bloque["n"] <= n:
+                raise ValueError("Bloque intercalado no válido.")
+            carga = archivo.read(((bloque["num_bits"] or 0) + 7) // 8)
+            simbolos = decodificar_simbolos_huffman_intercalado(carga, bloque["parametros"], tabla, bloque["n"])
+            if len(simbolos) < bloque["n"]:
+                raise ValueError("El archivo está truncado.")
+            n -= bloque["n"]
+            yield bytes(simbolos)
+    elif datos["metodo"] == METODO_HUFFMAN:
+        tabla = tabla_de_cabecera(datos["modelo"], cache)
+        while n > 0:
+            with etapa("decodificacion_huffman"):
+                simbolos = decodificar_simbolos_huffman(lector, tabla, min(n, tam_bloque))
+            if not simbolos:
+                raise ValueError("El archivo está truncado.")
+            lector.comprobar_relleno()
+            n -= len(simbolos)
+            yield bytes(simbolos)
+        comprobar_carga(archivo, inicio, datos["num_bits"] or 0, tam_bloque)
+    elif datos["metodo"] in (METODO_ARITMETICA, METODO_RANGO):
+        modelo = cache.modelo_limites(datos["modelo"]) if cache is not None else construir_limites(datos["modelo"])
+        clase = DecodificadorRango if datos["metodo"] == METODO_RANGO else DecodificadorAritmetico
+        decodificador = clase(datos["k"], lector)
+        nombre_etapa = "decodificacion_rango" if datos["metodo"] == METODO_RANGO else "decodificacion_aritmetica"
+        while n > 0:
+            cantidad = min(n, tam_bloque)
+            with etapa(nombre_etapa):
+                simbolos = decodificar_simbolos_aritmetica(decodificador, modelo, cantidad)
+            lector.comprobar_relleno()
+            yield bytes(simbolos)
+            n -= cantidad
+        comprobar_carga(archivo, inicio, datos["num_bits"] or 0, tam_bloque)
+    else:
+        raise ValueError(f"Método no soportado: {datos['metodo']}.")
+
+# Comprime un archivo y retorna (bytes leidos, bytes escritos)
+def comprimir_archivo(ruta_entrada, ruta_salida, metodo="huffman", tam_bloque=TAM_BLOQUE, longitud_maxima=None, nivel=None):
+    if metodo not in CODIFICADORES_FLUJO:
+        raise ValueError(f"Método desconocido: {metodo}. Opciones: {', '.join(METODOS_FLUJO)}.")
+    opciones = opciones_codificador(metodo, longitud_maxima, nivel)
+    escritos = 0
+    with etapa("compresion"), open(ruta_salida, "wb") as salida:
+        for parte in CODIFICADORES_FLUJO[metodo](lambda: leer_archivo(ruta_entrada, tam_bloque), **opciones):
+            salida.write(parte)
+            escritos += len(parte)
+    leidos = os.path.getsize(ruta_entrada)
+    contar("bytes_leidos", leidos)
+    contar("bytes_escritos", escritos)
+    return leidos, escritos
+
+# Generador de la salida de comprimir datos que ya estan en memoria, leidos en bloques de `tam_bloque`
+# bytes (None: un solo bloque, sin copiar los datos)
+def comprimir_partes(datos, metodo="huffman", frecuencias_compartidas=None, longitud_maxima=None, nivel=None, cache=None, tam_bloque=TAM_BLOQUE):
+    if metodo not in CODIFICADORES_FLUJO:
+        raise ValueError(f"Método desconocido: {metodo}. Opciones: {', '.join(METODOS_FLUJO)}.")
+    opciones = opciones_codificador(metodo, longitud_maxima, nivel, cache)
+    if tam_bloque is None:
+        abrir_bloques = lambda: iter((datos,))
+    else:
+        vista = memoryview(datos).cast("B")
+        abrir_bloques = lambda: (bytes(vista[inicio:inicio + tam_bloque]) for inicio in range(0, len(vista), tam_bloque))
+    return CODIFICADORES_FLUJO[metodo](abrir_bloques, frecuencias_compartidas, **opciones)
+
+# Comprime datos que ya estan en memoria y retorna el contenedor completo
+def comprimir_bytes(datos, metodo="huffman", frecuencias_compartidas=None, longitud_maxima=None, nivel=None, cache=None):
+    return b"".join(comprimir_partes(datos, metodo, frecuencias_compartidas, longitud_maxima, nivel, cache, None))
+
+# Generador de las partes decodificadas de un contenedor que ya esta en memoria; `modelo` es el modelo
+# compartido si lo hay
+def descomprimir_partes(datos, modelo=None, cache=None, tam_bloque=TAM_BLOQUE):
+    archivo = io.BytesIO(datos)
+    cabecera = leer_cabecera(archivo)
+    if modelo is not None and not cabecera["modelo"]:
+        cabecera["modelo"] = modelo
+    return decodificar_flujo(archivo, cabecera, tam_bloque, cache)
+
+# Descomprime un contenedor que ya esta en memoria
+def descomprimir_bytes(datos, modelo=None, cache=None):
+    return b"".join(descomprimir_partes(datos, modelo, cache))
+
+# Texto con lo que cuesta limitar la longitud de los codigos de Huffman para una tabla de frecuencias
+def reporte_longitud_maxima(frecuencias, longitud_maxima):
+    bits_libres, bits_limitados, longitud_libre = costo_longitud_maxima(frecuencias, longitud_maxima)
+    aumento = (bits_limitados - bits_libres) / bits_libres if bits_libres else 0
+    return (f"Códigos de a lo sumo {longitud_maxima} bits (sin límite: {longitud_libre}): "
+            f"{bits_limitados} bits en lugar de {bits_libres} (+{aumento:.4%})")
+
+# Descomprime un archivo y retorna la cantidad de bytes escritos
+def descomprimir_archivo(ruta_entrada, ruta_salida, tam_bloque=TAM_BLOQUE):
+    escritos = 0
+    with etapa("descompresion"), open(ruta_entrada, "rb") as archivo, open(ruta_salida, "wb") as salida:
+        datos = leer_cabecera(archivo) # el archivo queda al inicio de la carga
+        for parte in decodificar_flujo(archivo, datos, tam_bloque):
+            salida.write(parte)
+            escritos += len(parte)
+    contar("bytes_leidos", os.path.getsize(ruta_entrada))
+    contar("bytes_escritos", escritos)
+    return escritos
+
+def main():
+    parser = argparse.ArgumentParser(description="Compresión de archivos por bloques con memoria acotada.")
+    parser.add_argument("accion", choices=["comprimir", "descomprimir"])
+    parser.add_argument("entrada")
+    parser.add_argument("salida")
+    parser.add_argument("--metodo", choices=METODOS_FLUJO, default="huffman", help="método de compresión")
+    parser.add_argument("--bloque", type=int, default=TAM_BLOQUE, help="bytes por bloque de lectura")
+    parser.add_argument("--longitud-maxima", type=int, help="bits máximos por código de Huffman (por ejemplo 11 a 15)")
+    parser.add_argument("--nivel", type=int, help=f"esfuerzo de la búsqueda de LZ77, de 1 (rápido) a 9 (mejor tasa); por defecto {NIVEL_LZ}")
+    parser.add_argument("--metricas", metavar="ARCHIVO", help="agrega una línea JSON con el tiempo por etapa y los contadores a ARCHIVO")
+    parser.add_argument("--perfil", action="store_true", help="muestra las funciones más costosas según cProfile")
+    parser.add_argument("--memoria", action="store_true", help="mide el pico de memoria con tracemalloc")
+    argumentos = parser.parse_args()
+
+    instrumentado = argumentos.metricas or argumentos.perfil or argumentos.memoria
+    etiqueta = f"{argumentos.accion} {argumentos.metodo if argumentos.accion == 'comprimir' else ''}".strip()
+    with (medir(etiqueta, argumentos.perfil, argumentos.memoria, argumentos.metricas) if instrumentado else nullcontext()) as metricas:
+        if argumentos.accion == "comprimir":
+            leidos, escritos = comprimir_archivo(argumentos.entrada, argumentos.salida, argumentos.metodo, argumentos.bloque, argumentos.longitud_maxima, argumentos.nivel)
+        else:
+            escritos = descomprimir_archivo(argumentos.entrada, argumentos.salida, argumentos.bloque)
+
+    if argumentos.accion == "comprimir":
+        print(f"{leidos} bytes -> {escritos} bytes (tasa de compresión: {escritos / leidos if leidos else 0:.4f})")
+        if argumentos.longitud_maxima is not None and leidos:
+            print(reporte_longitud_maxima(contar_frecuencias(lambda: leer_archivo(argumentos.entrada, argumentos.bloque)), argumentos.longitud_maxima))
+    else:
+        print(f"{escritos} bytes descomprimidos")
+    if metricas is not None:
+        print(metricas.texto())
+        if argumentos.perfil:
+            print(metricas.texto_perfil())
+
+if __name__ == "__main__":
+    main()
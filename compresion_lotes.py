@@ -0,0 +1,139 @@
+# Compresion por lotes de directorios completos, sin preguntas por teclado: cada archivo se comprime
+# (o descomprime) con compresion_flujo en un pool de procesos, se saltan los que ya estan al dia y al
+# final se muestra un resumen de velocidad y tasa de compresion
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from compresion_flujo import METODOS_FLUJO, TAM_BLOQUE, comprimir_archivo, descomprimir_archivo, opciones_codificador
+from compresion_paralela import TRABAJADORES, mapear_en_orden
+
+EXTENSION_COMPRIMIDO = ".lb3" # se agrega al comprimir y se quita al descomprimir
+
+# Generador de (ruta de entrada, ruta de salida) para cada archivo de `origen` (un directorio, que se
+# recorre completo, o un archivo suelto); el destino no se recorre aunque este dentro del origen y al
+# comprimir se saltan los archivos que ya tienen la extension de comprimido
+def listar_archivos(origen, destino, accion):
+    if os.path.isfile(origen):
+        base = os.path.dirname(origen) or "."
+        recorrido = [(base, [], [os.path.basename(origen)])]
+    else:
+        base = origen
+        recorrido = os.walk(origen)
+    destino_real = os.path.realpath(destino)
+    for directorio, subdirectorios, archivos in recorrido:
+        subdirectorios[:] = sorted(nombre for nombre in subdirectorios if os.path.realpath(os.path.join(directorio, nombre)) != destino_real)
+        for nombre in sorted(archivos):
+            if accion == "descomprimir":
+                if not nombre.endswith(EXTENSION_COMPRIMIDO):
+                    continue
+                nombre_salida = nombre[:-len(EXTENSION_COMPRIMIDO)]
+            elif nombre.endswith(EXTENSION_COMPRIMIDO): # ya comprimido (p. ej. la salida de una pasada anterior en el mismo directorio)
+                continue
+            else:
+                nombre_salida = nombre + EXTENSION_COMPRIMIDO
+            ruta_entrada = os.path.join(directorio, nombre)
+            yield ruta_entrada, os.path.join(destino, os.path.relpath(os.path.join(directorio, nombre_salida), base))
+
+# Un archivo esta al dia si su salida existe y no es mas vieja que la entrada
+def esta_al_dia(ruta_entrada, ruta_salida):
+    try:
+        return os.path.getmtime(ruta_salida) >= os.path.getmtime(ruta_entrada)
+    except OSError: # la salida no existe
+        return False
+
+# Procesa un archivo en un trabajador y retorna (bytes leidos, bytes escritos, segundos, error o None).
+# La salida se escribe en un temporal que se renombra al terminar: un archivo a medias nunca queda al dia
+def procesar_archivo(accion, ruta_entrada, ruta_salida, metodo, tam_bloque, opciones):
+    inicio = time.perf_counter()
+    temporal = ruta_salida + ".tmp"
+    try:
+        os.makedirs(os.path.dirname(ruta_salida) or ".", exist_ok=True)
+        if accion == "comprimir":
+            leidos, escritos = comprimir_archivo(ruta_entrada, temporal, metodo, tam_bloque, **opciones)
+        else:
+            leidos, escritos = os.path.getsize(ruta_entrada), descomprimir_archivo(ruta_entrada, temporal, tam_bloque)
+        os.replace(temporal, ruta_salida)
+    except Exception as error: # un archivo con problemas no detiene el lote
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        return 0, 0, time.perf_counter() - inicio, f"{type(error).__name__}: {error}"
+    return leidos, escritos, time.perf_counter() - inicio, None
+
+# Comprime o descomprime todos los archivos de `origen` en `destino` (misma estructura de directorios) y
+# retorna el resumen del lote; con `forzar` se procesan tambien los archivos que ya estan al dia
+def procesar_directorio(accion, origen, destino, metodo="huffman", trabajadores=TRABAJADORES, tam_bloque=TAM_BLOQUE, longitud_maxima=None, nivel=None, forzar=False):
+    if accion not in ("comprimir", "descomprimir"):
+        raise ValueError(f"Acción desconocida: {accion}.")
+    if not os.path.exists(origen):
+        raise FileNotFoundError(f"No existe el origen '{origen}'.")
+    opciones = {}
+    if accion == "comprimir":
+        if metodo not in METODOS_FLUJO:
+            raise ValueError(f"Método desconocido: {metodo}. Opciones: {', '.join(METODOS_FLUJO)}.")
+        opciones = opciones_codificador(metodo, longitud_maxima, nivel) # valida antes de abrir el pool
+
+    resumen = {"accion": accion, "archivos": 0, "omitidos": 0, "errores": [], "leidos": 0, "escritos": 0, "segundos": 0.0}
+    inicio = time.perf_counter()
+    tareas = []
+    for ruta_entrada, ruta_salida in listar_archivos(origen, destino, accion):
+        if not forzar and esta_al_dia(ruta_entrada, ruta_salida):
+            resumen["omitidos"] += 1
+        else:
+            tareas.append((ruta_entrada, (accion, ruta_entrada, ruta_salida, metodo, tam_bloque, opciones)))
+
+    if tareas:
+        with ProcessPoolExecutor(max_workers=max(1, min(trabajadores, len(tareas)))) as pool:
+            for ruta_entrada, (leidos, escritos, _, error) in mapear_en_orden(pool, procesar_archivo, tareas, 4 * trabajadores):
+                if error:
+                    resumen["errores"].append((ruta_entrada, error))
+                    continue
+                resumen["archivos"] += 1
+                resumen["leidos"] += leidos
+                resumen["escritos"] += escritos
+    resumen["segundos"] = time.perf_counter() - inicio
+    return resumen
+
+def comprimir_directorio(origen, destino, metodo="huffman", **opciones):
+    return procesar_directorio("comprimir", origen, destino, metodo, **opciones)
+
+def descomprimir_directorio(origen, destino, **opciones):
+    return procesar_directorio("descomprimir", origen, destino, **opciones)
+
+# Texto con el resumen del lote: archivos, tasa (comprimido / original) y velocidad sobre los datos originales
+def texto_resumen(resumen):
+    if resumen["accion"] == "comprimir":
+        original, comprimido = resumen["leidos"], resumen["escritos"]
+    else:
+        original, comprimido = resumen["escritos"], resumen["leidos"]
+    segundos = resumen["segundos"]
+    lineas = [
+        f"Archivos procesados: {resumen['archivos']}, al día (omitidos): {resumen['omitidos']}, con errores: {len(resumen['errores'])}",
+        f"Original: {original} bytes, comprimido: {comprimido} bytes (tasa de compresión: {comprimido / original if original else 0:.4f})",
+        f"Tiempo: {segundos:.2f} s ({original / 1e6 / segundos if segundos else 0:.3f} MB/s, {resumen['archivos'] / segundos if segundos else 0:.1f} archivos/s)",
+    ]
+    lineas += [f"  Error en {ruta}: {error}" for ruta, error in resumen["errores"]]
+    return "\n".join(lineas)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compresión por lotes de directorios completos.")
+    parser.add_argument("accion", choices=["comprimir", "descomprimir"])
+    parser.add_argument("origen", help="directorio (o archivo) de entrada")
+    parser.add_argument("destino", help="directorio de salida")
+    parser.add_argument("--metodo", choices=METODOS_FLUJO, default="huffman", help="método de compresión")
+    parser.add_argument("--trabajadores", type=int, default=TRABAJADORES, help="procesos del pool")
+    parser.add_argument("--bloque", type=int, default=TAM_BLOQUE, help="bytes por bloque de lectura")
+    parser.add_argument("--longitud-maxima", type=int, help="bits máximos por código de Huffman (por ejemplo 11 a 15)")
+    parser.add_argument("--nivel", type=int, help="esfuerzo de la búsqueda de LZ77, de 1 a 9")
+    parser.add_argument("--forzar", action="store_true", help="procesa también los archivos que ya están al día")
+    argumentos = parser.parse_args()
+
+    resumen = procesar_directorio(argumentos.accion, argumentos.origen, argumentos.destino, argumentos.metodo, argumentos.trabajadores,
+                                  argumentos.bloque, argumentos.longitud_maxima, argumentos.nivel, argumentos.forzar)
+    print(texto_resumen(resumen))
+    if resumen["errores"]:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# Compresion por bloques independientes repartidos en un pool de procesos
+# Cada bloque tiene su propia tabla de frecuencias (o modelo) y se guarda como un contenedor
+# completo; el indice al final del archivo permite decodificar los bloques tambien en paralelo
+import argparse
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from compresion_flujo import (
+    METODOS_FLUJO, METODOS_SIN_TABLA, comprimir_bytes, contar_frecuencias, descomprimir_bytes, leer_archivo, modelo_de_cabecera,
+    opciones_codificador,
+)
+from contenedor import escribir_cabecera_bloques, escribir_indice_bloques, leer_indice_bloques
+
+TAM_BLOQUE_PARALELO = 1 << 20 # bytes originales por bloque
+TRABAJADORES = os.cpu_count() or 1
+
+# Generador que aplica `funcion` en el pool y entrega (etiqueta, resultado) en orden, con a lo
+# sumo `max_pendientes` tareas en curso para que la memoria no crezca; `tareas` da (etiqueta, argumentos)
+def mapear_en_orden(pool, funcion, tareas, max_pendientes):
+    pendientes = deque()
+    for etiqueta, argumentos in tareas:
+        pendientes.append((etiqueta, pool.submit(funcion, *argumentos)))
+        if len(pendientes) >= max_pendientes:
+            etiqueta_lista, futuro = pendientes.popleft()
+            yield etiqueta_lista, futuro.result()
+    while pendientes:
+        etiqueta_lista, futuro = pendientes.popleft()
+        yield etiqueta_lista, futuro.result()
+
+# Comprime un archivo en bloques y retorna (bytes leidos, bytes escritos). Con `modelo_compartido`
+# se calcula una sola tabla para todo el archivo (una pasada extra) que se guarda una vez en el indice,
+# asi los bloques pequeños (para acceso aleatorio) no pagan una tabla cada uno
+def comprimir_archivo_paralelo(ruta_entrada, ruta_salida, metodo="huffman", tam_bloque=TAM_BLOQUE_PARALELO, trabajadores=TRABAJADORES, modelo_compartido=False, longitud_maxima=None, nivel=None):
+    if metodo not in METODOS_FLUJO:
+        raise ValueError(f"Método desconocido: {metodo}. Opciones: {', '.join(METODOS_FLUJO)}.")
+    opciones_codificador(metodo, longitud_maxima, nivel) # valida la opcion antes de abrir el pool
+    frecuencias = None
+    modelos = []
+    if modelo_compartido and metodo not in METODOS_SIN_TABLA:
+        frecuencias = contar_frecuencias(lambda: leer_archivo(ruta_entrada, tam_bloque))
+        modelos.append(modelo_de_cabecera(metodo, frecuencias, longitud_maxima))
+    numero_modelo = len(modelos) # 0: cada bloque lleva su modelo
+
+    entradas = [] # indice de bloques
+    offset_original = 0
+    with open(ruta_salida, "wb") as salida, ProcessPoolExecutor(max_workers=trabajadores) as pool:
+        offset_comprimido = escribir_cabecera_bloques(salida)
+        tareas = ((len(bloque), (bloque, metodo, frecuencias, longitud_maxima, nivel)) for bloque in leer_archivo(ruta_entrada, tam_bloque))
+        for tam_original, comprimido in mapear_en_orden(pool, comprimir_bytes, tareas, 2 * trabajadores):
+            salida.write(comprimido)
+            entradas.append((offset_original, tam_original, offset_comprimido, len(comprimido), numero_modelo))
+            offset_original += tam_original
+            offset_comprimido += len(comprimido)
+        escribir_indice_bloques(salida, entradas, modelos)
+        escritos = salida.tell()
+    return offset_original, escritos
+
+# Generador de tareas de decodificacion: (tamaño original, (bloque comprimido, modelo)) por entrada del indice
+def leer_bloques_comprimidos(archivo, entradas, modelos):
+    for _, tam_original, offset_comprimido, tam_comprimido, numero_modelo in entradas:
+        archivo.seek(offset_comprimido)
+        yield tam_original, (archivo.read(tam_comprimido), modelos[numero_modelo - 1] if numero_modelo else None)
+
+# Descomprime un archivo por bloques repartiendo los bloques entre los trabajadores
+def descomprimir_archivo_paralelo(ruta_entrada, ruta_salida, trabajadores=TRABAJADORES):
+    escritos = 0
+    with open(ruta_entrada, "rb") as archivo, open(ruta_salida, "wb") as salida, ProcessPoolExecutor(max_workers=trabajadores) as pool:
+        entradas, modelos = leer_indice_bloques(archivo)
+        tareas = leer_bloques_comprimidos(archivo, entradas, modelos)
+        for tam_original, datos in mapear_en_orden(pool, descomprimir_bytes, tareas, 2 * trabajadores):
+            if len(datos) != tam_original:
+                raise ValueError("El tamaño de un bloque no coincide con el índice.")
+            salida.write(datos)
+            escritos += len(datos)
+    return escritos
+
+def main():
+    parser = argparse.ArgumentParser(description="Compresión por bloques en paralelo.")
+    parser.add_argument("accion", choices=["comprimir", "descomprimir"])
+    parser.add_argument("entrada")
+    parser.add_argument("salida")
+    parser.add_argument("--metodo", choices=METODOS_FLUJO, default="huffman", help="método de compresión")
+    parser.add_argument("--bloque", type=int, default=TAM_BLOQUE_PARALELO, help="bytes originales por bloque")
+    parser.add_argument("--trabajadores", type=int, default=TRABAJADORES, help="procesos del pool")
+    parser.add_argument("--modelo-compartido", action="store_true", help="una sola tabla de frecuencias para todos los bloques")
+    parser.add_argument("--longitud-maxima", type=int, help="bits máximos por código de Huffman (por ejemplo 11 a 15)")
+    parser.add_argument("--nivel", type=int, help="esfuerzo de la búsqueda de LZ77, de 1 a 9")
+    argumentos = parser.parse_args()
+
+    if argumentos.accion == "comprimir":
+        leidos, escritos = comprimir_archivo_paralelo(argumentos.entrada, argumentos.salida, argumentos.metodo, argumentos.bloque, argumentos.trabajadores, argumentos.modelo_compartido, argumentos.longitud_maxima, argumentos.nivel)
+        print(f"{leidos} bytes -> {escritos} bytes (tasa de compresión: {escritos / leidos if leidos else 0:.4f})")
+    else:
+        escritos = descomprimir_archivo_paralelo(argumentos.entrada, argumentos.salida, argumentos.trabajadores)
+        print(f"{escritos} bytes descomprimidos")
+
+if __name__ == "__main__":
+    main()
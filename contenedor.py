@@ -0,0 +1,251 @@
+# Formato binario de los archivos codificacionN.log
+#
+#   MAGIA (4 bytes) | version | metodo | modo | tipo de simbolos   (1 byte cada uno)
+#   n | k | numero de bits de la carga | numero de entradas del modelo   (varint)
+#       (numero de bits 0: la carga llega hasta el final del archivo)
+#   modelo: por cada entrada, simbolo y valor (varint); frecuencia en aritmetica y ANS,
+#           longitud del codigo canonico en Huffman; en LZ77, las longitudes de las dos tablas de
+#           Huffman (las distancias van despues de los simbolos de literal/longitud)
+#   parametros (solo en los modos intercalado, contexto y BWT): cantidad y valores (varint); en modo
+#       intercalado, los bits de cada flujo (ninguno en la cabecera general de la compresion por
+#       flujo, donde cada bloque es un contenedor propio con sus flujos); en modo contexto, el orden
+#       y el maximo de contextos; en modo BWT, el indice primario y la cantidad de simbolos de cada bloque
+#   carga: los bits codificados empaquetados, 8 por byte, rellenando con ceros al final;
+#          en modo intercalado, los flujos uno detras de otro, cada uno desde el inicio de un byte
+
+from metricas import contar # bytes escritos (si hay metricas activas)
+
+MAGIA = b"LAB3" # identifica los archivos del laboratorio
+VERSION = 1
+
+METODO_HUFFMAN = 0
+METODO_ARITMETICA = 1
+METODO_TANS = 2 # ANS por tablas; k guarda la precision de las frecuencias escaladas
+METODO_RANS = 3 # ANS con renormalizacion por bytes; k guarda la precision
+METODO_RANGO = 4 # codificador de rango (aritmetica renormalizada de a bytes); k es el ancho del rango
+METODO_LZ77 = 5 # diccionario LZ77 y luego Huffman (modo automatico) o aritmetica adaptativa (modo adaptativo)
+NOMBRES_METODOS = {
+    METODO_HUFFMAN: "Huffman", METODO_ARITMETICA: "Aritmética", METODO_TANS: "tANS", METODO_RANS: "rANS",
+    METODO_RANGO: "Rango", METODO_LZ77: "LZ77",
+}
+
+MODO_AUTOMATICO = 0
+MODO_NO_AUTOMATICO = 1
+MODO_ADAPTATIVO = 2 # sin modelo en la cabecera: se reconstruye mientras se decodifica
+MODO_INTERCALADO = 3 # Huffman con los simbolos repartidos en varios flujos de bits independientes
+MODO_CONTEXTO = 4 # aritmetica adaptativa con modelos de contexto de orden 1 o 2
+MODO_BWT = 5 # Huffman sobre bloques transformados (Burrows-Wheeler, mover al frente y rachas de ceros); cada bloque es un contenedor propio
+NOMBRES_MODOS = {
+    MODO_AUTOMATICO: "Automático", MODO_NO_AUTOMATICO: "No Automático", MODO_ADAPTATIVO: "Adaptativo",
+    MODO_INTERCALADO: "Intercalado", MODO_CONTEXTO: "Contexto", MODO_BWT: "BWT",
+}
+MODOS_CON_PARAMETROS = (MODO_INTERCALADO, MODO_CONTEXTO, MODO_BWT)
+
+SIMBOLOS_TEXTO = 0 # los simbolos son caracteres (se guarda su punto de codigo)
+SIMBOLOS_BYTES = 1 # los simbolos son enteros de 0 a 255
+
+# Funcion para escribir un entero sin signo con longitud variable (7 bits por byte)
+def escribir_varint(salida, valor):
+    if valor < 0:
+        raise ValueError("Solo se pueden guardar enteros no negativos.")
+    while valor >= 0x80:
+        salida.append((valor & 0x7F) | 0x80) # el bit alto indica que siguen mas bytes
+        valor >>= 7
+    salida.append(valor)
+
+# Funcion para leer un entero de longitud variable, retorna el valor y la siguiente posicion
+def leer_varint(datos, posicion):
+    valor = 0
+    desplazamiento = 0
+    while True:
+        if posicion >= len(datos):
+            raise ValueError("El archivo está truncado.")
+        byte = datos[posicion]
+        posicion += 1
+        valor |= (byte & 0x7F) << desplazamiento
+        if byte < 0x80:
+            return valor, posicion
+        desplazamiento += 7
+
+# Funcion para armar la cabecera y el modelo del formato binario; `parametros` son los valores
+# extra de los modos intercalado y contexto
+def serializar_cabecera(metodo, modo, n, k, modelo, num_bits, tipo=SIMBOLOS_TEXTO, parametros=()):
+    cabecera = bytearray(MAGIA)
+    cabecera += bytes([VERSION, metodo, modo, tipo])
+    escribir_varint(cabecera, n)
+    escribir_varint(cabecera, k)
+    escribir_varint(cabecera, num_bits)
+    escribir_varint(cabecera, len(modelo))
+    for simbolo, valor in modelo.items(): # se conserva el orden de la tabla
+        escribir_varint(cabecera, ord(simbolo) if tipo == SIMBOLOS_TEXTO else simbolo)
+        escribir_varint(cabecera, valor)
+    if modo in MODOS_CON_PARAMETROS:
+        escribir_varint(cabecera, len(parametros))
+        for valor in parametros:
+            escribir_varint(cabecera, valor)
+    return cabecera
+
+# Funcion para guardar un mensaje codificado (un BitWriter, o la lista de BitWriters de cada flujo
+# en modo intercalado) en el formato binario
+def escribir_contenedor(nombre_archivo, metodo, modo, n, k, modelo, bits, tipo=SIMBOLOS_TEXTO, parametros=()):
+    if modo == MODO_INTERCALADO:
+        parametros = [len(flujo) for flujo in bits]
+        carga = b"".join(flujo.getvalue() for flujo in bits) # cada flujo empieza en un byte nuevo
+        num_bits = len(carga) * 8
+    else:
+        carga, num_bits = bits.getvalue(), len(bits) # bits empaquetados, el ultimo byte relleno con ceros
+    cabecera = serializar_cabecera(metodo, modo, n, k, modelo, num_bits, tipo, parametros)
+
+    with open(nombre_archivo, "wb") as archivo:
+        archivo.write(cabecera)
+        archivo.write(carga)
+    contar("bytes_escritos", len(cabecera) + len(carga))
+    return len(cabecera) + len(carga) # bytes escritos
+
+# Funcion para leer un varint directamente de un archivo abierto
+def leer_varint_archivo(archivo):
+    valor = 0
+    desplazamiento = 0
+    while True:
+        byte = archivo.read(1)
+        if not byte:
+            raise ValueError("El archivo está truncado.")
+        valor |= (byte[0] & 0x7F) << desplazamiento
+        if byte[0] < 0x80:
+            return valor
+        desplazamiento += 7
+
+# Funcion para leer la cabecera y el modelo de un archivo abierto; el archivo queda al inicio de la carga
+def leer_cabecera(archivo):
+    inicio = archivo.read(len(MAGIA) + 4)
+    if inicio[:len(MAGIA)] != MAGIA:
+        raise ValueError("El archivo no está en el formato binario del laboratorio.")
+    if len(inicio) < len(MAGIA) + 4:
+        raise ValueError("El archivo está truncado.")
+    version, metodo, modo, tipo = inicio[len(MAGIA):]
+    if version != VERSION:
+        raise ValueError(f"Versión de formato no soportada: {version}.")
+
+    n = leer_varint_archivo(archivo)
+    k = leer_varint_archivo(archivo)
+    num_bits = leer_varint_archivo(archivo)
+    num_entradas = leer_varint_archivo(archivo)
+    modelo = {}
+    for _ in range(num_entradas):
+        simbolo = leer_varint_archivo(archivo)
+        modelo[chr(simbolo) if tipo == SIMBOLOS_TEXTO else simbolo] = leer_varint_archivo(archivo)
+    parametros = None
+    if modo in MODOS_CON_PARAMETROS:
+        parametros = [leer_varint_archivo(archivo) for _ in range(leer_varint_archivo(archivo))]
+
+    return {
+        "metodo": metodo,
+        "modo": modo,
+        "tipo": tipo,
+        "n": n,
+        "k": k,
+        "num_bits": num_bits or None, # None: hasta el final del archivo
+        "modelo": modelo,
+        "parametros": parametros, # bits de cada flujo (intercalado), orden y maximo de contextos (contexto) o indice primario y simbolos de un bloque (BWT)
+    }
+
+# Funcion para leer un archivo en el formato binario
+def leer_contenedor(nombre_archivo):
+    with open(nombre_archivo, "rb") as archivo:
+        datos = leer_cabecera(archivo)
+        carga = memoryview(archivo.read()) # vista sin copia de los bits codificados
+
+    if datos["num_bits"] is None:
+        datos["num_bits"] = len(carga) * 8
+    if len(carga) * 8 < datos["num_bits"]:
+        raise ValueError("El archivo está truncado.")
+    datos["carga"] = carga
+    return datos
+
+# Archivo por bloques independientes (compresion en paralelo)
+#
+#   MAGIA_BLOQUES (4 bytes) | version (1 byte)
+#   bloques: cada uno es un contenedor completo (cabecera + carga); si usa un modelo compartido
+#            su cabecera no trae modelo
+#   indice: modelos compartidos (cantidad y, por modelo, sus entradas simbolo/valor), numero de bloques y,
+#           por bloque, offset y tamaño originales, offset y tamaño comprimidos y numero de modelo
+#           (0 = el modelo va en el propio bloque, i = i-esimo modelo compartido), todo en varint
+#   cola: offset del indice (8 bytes, little endian) | MAGIA_BLOQUES
+
+MAGIA_BLOQUES = b"LB3B"
+TAM_COLA = 8 + len(MAGIA_BLOQUES)
+
+# Funcion para escribir la cabecera de un archivo por bloques
+def escribir_cabecera_bloques(archivo):
+    archivo.write(MAGIA_BLOQUES + bytes([VERSION]))
+    return len(MAGIA_BLOQUES) + 1
+
+# Funcion para escribir el indice de bloques y la cola en la posicion actual del archivo
+def escribir_indice_bloques(archivo, entradas, modelos=()):
+    offset_indice = archivo.tell()
+    indice = bytearray()
+    escribir_varint(indice, len(modelos))
+    for modelo in modelos: # modelos compartidos, con simbolos de 0 a 255
+        escribir_varint(indice, len(modelo))
+        for simbolo, valor in modelo.items():
+            escribir_varint(indice, simbolo)
+            escribir_varint(indice, valor)
+    escribir_varint(indice, len(entradas))
+    for entrada in entradas: # offset y tamaño originales, offset y tamaño comprimidos, numero de modelo
+        for valor in entrada:
+            escribir_varint(indice, valor)
+    archivo.write(indice)
+    archivo.write(offset_indice.to_bytes(8, "little") + MAGIA_BLOQUES)
+
+# Funcion para saber si un archivo abierto es un archivo por bloques
+def es_archivo_bloques(archivo):
+    posicion = archivo.tell()
+    archivo.seek(0)
+    inicio = archivo.read(len(MAGIA_BLOQUES))
+    archivo.seek(posicion)
+    return inicio == MAGIA_BLOQUES
+
+# Funcion para leer el indice de un archivo por bloques; retorna la lista de entradas
+# (offset original, tamaño original, offset comprimido, tamaño comprimido, numero de modelo)
+# y la lista de modelos compartidos
+def leer_indice_bloques(archivo):
+    archivo.seek(0)
+    inicio = archivo.read(len(MAGIA_BLOQUES) + 1)
+    if inicio[:len(MAGIA_BLOQUES)] != MAGIA_BLOQUES:
+        raise ValueError("El archivo no es un archivo por bloques del laboratorio.")
+    if len(inicio) < len(MAGIA_BLOQUES) + 1 or inicio[-1] != VERSION:
+        raise ValueError("Versión de formato no soportada.")
+
+    archivo.seek(0, 2)
+    tamano = archivo.tell()
+    if tamano < len(inicio) + TAM_COLA:
+        raise ValueError("El archivo está truncado.")
+    archivo.seek(tamano - TAM_COLA)
+    cola = archivo.read(TAM_COLA)
+    if cola[8:] != MAGIA_BLOQUES:
+        raise ValueError("El archivo está truncado.")
+    offset_indice = int.from_bytes(cola[:8], "little")
+
+    archivo.seek(offset_indice)
+    datos = archivo.read(tamano - TAM_COLA - offset_indice)
+    num_modelos, posicion = leer_varint(datos, 0)
+    modelos = []
+    for _ in range(num_modelos):
+        num_entradas, posicion = leer_varint(datos, posicion)
+        modelo = {}
+        for _ in range(num_entradas):
+            simbolo, posicion = leer_varint(datos, posicion)
+            modelo[simbolo], posicion = leer_varint(datos, posicion)
+        modelos.append(modelo)
+
+    num_bloques, posicion = leer_varint(datos, posicion)
+    entradas = []
+    for _ in range(num_bloques):
+        entrada = []
+        for _ in range(5):
+            valor, posicion = leer_varint(datos, posicion)
+            entrada.append(valor)
+        if entrada[4] > len(modelos):
+            raise ValueError("Un bloque hace referencia a un modelo que no existe.")
+        entradas.append(tuple(entrada))
+    return entradas, modelos
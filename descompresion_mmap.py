@@ -0,0 +1,124 @@
+# Descompresion sin copias de archivos grandes: el contenedor (o el archivo por bloques) se abre con mmap
+# y la carga se lee con rebanadas de memoryview, sin cargar el archivo en memoria. La salida se escribe
+# a medida que se decodifica en un archivo de destino o en un buffer del llamador, asi la memoria
+# depende del tamaño de bloque y no del tamaño del archivo
+import argparse
+import mmap
+import os
+from contextlib import contextmanager
+
+from compresion_flujo import TAM_BLOQUE, decodificar_flujo
+from contenedor import MODO_ADAPTATIVO, MODO_CONTEXTO, es_archivo_bloques, leer_cabecera, leer_indice_bloques
+
+# Vista de solo lectura con la interfaz de archivo que usan leer_cabecera, leer_indice_bloques y
+# decodificar_flujo (read, seek y tell); read() retorna rebanadas de la vista, no copias
+class VistaArchivo:
+    def __init__(self, vista):
+        self.vista = vista
+        self.posicion = 0
+
+    def read(self, cantidad=-1):
+        fin = len(self.vista) if cantidad is None or cantidad < 0 else min(self.posicion + cantidad, len(self.vista))
+        parte = self.vista[self.posicion:fin]
+        self.posicion = max(fin, self.posicion)
+        return parte
+
+    def seek(self, offset, desde=0):
+        if desde == 1:
+            offset += self.posicion
+        elif desde == 2:
+            offset += len(self.vista)
+        if offset < 0:
+            raise ValueError("Posición negativa.")
+        self.posicion = offset
+        return offset
+
+    def tell(self):
+        return self.posicion
+
+# Abre un archivo con mmap y entrega una memoryview de todo su contenido. Al salir se cierra el mapa;
+# si todavia quedan rebanadas vivas (por ejemplo en el traceback de un error) se deja al recolector
+@contextmanager
+def abrir_mmap(ruta):
+    with open(ruta, "rb") as archivo:
+        if os.fstat(archivo.fileno()).st_size == 0: # un archivo vacio no se puede mapear
+            yield memoryview(b"")
+            return
+        mapa = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        vista = memoryview(mapa)
+        try:
+            yield vista
+        finally:
+            vista.release()
+            try:
+                mapa.close()
+            except BufferError:
+                pass
+
+# Generador de las partes decodificadas de un contenedor o de un archivo por bloques ya mapeado
+def partes_mmap(vista, tam_bloque=TAM_BLOQUE, cache=None):
+    archivo = VistaArchivo(vista)
+    if not es_archivo_bloques(archivo):
+        datos = leer_cabecera(archivo) # la vista queda al inicio de la carga
+        yield from decodificar_flujo(archivo, datos, tam_bloque, cache)
+        return
+
+    entradas, modelos = leer_indice_bloques(archivo)
+    for _, tam_original, offset_comprimido, tam_comprimido, numero_modelo in entradas:
+        bloque = VistaArchivo(vista[offset_comprimido:offset_comprimido + tam_comprimido])
+        datos = leer_cabecera(bloque)
+        if numero_modelo and not datos["modelo"]:
+            datos["modelo"] = modelos[numero_modelo - 1]
+        escritos = 0
+        for parte in decodificar_flujo(bloque, datos, tam_bloque, cache):
+            escritos += len(parte)
+            yield parte
+        if escritos != tam_original:
+            raise ValueError("El tamaño de un bloque no coincide con el índice.")
+
+# Tamaño original de un archivo comprimido sin descomprimirlo (para reservar el buffer de destino);
+# None si la cabecera no lo guarda (modos adaptativo y de contexto, que terminan con un simbolo de fin)
+def tamano_descomprimido(ruta):
+    with abrir_mmap(ruta) as vista:
+        archivo = VistaArchivo(vista)
+        if es_archivo_bloques(archivo):
+            return sum(entrada[1] for entrada in leer_indice_bloques(archivo)[0])
+        datos = leer_cabecera(archivo)
+        if datos["modo"] in (MODO_ADAPTATIVO, MODO_CONTEXTO):
+            return None
+        return datos["n"]
+
+# Descomprime `ruta_entrada` en `destino` y retorna la cantidad de bytes escritos. `destino` es la
+# ruta del archivo de salida o un buffer escribible (bytearray, memoryview, mmap...) de tamaño suficiente
+def descomprimir_mmap(ruta_entrada, destino, tam_bloque=TAM_BLOQUE, cache=None):
+    escritos = 0
+    with abrir_mmap(ruta_entrada) as vista:
+        if isinstance(destino, (str, os.PathLike)):
+            with open(destino, "wb") as salida:
+                for parte in partes_mmap(vista, tam_bloque, cache):
+                    salida.write(parte)
+                    escritos += len(parte)
+            return escritos
+
+        buffer = memoryview(destino).cast("B")
+        if buffer.readonly:
+            raise ValueError("El buffer de destino es de solo lectura.")
+        for parte in partes_mmap(vista, tam_bloque, cache):
+            if escritos + len(parte) > len(buffer):
+                raise ValueError(f"El buffer de destino es muy chico ({len(buffer)} bytes).")
+            buffer[escritos:escritos + len(parte)] = parte
+            escritos += len(parte)
+    return escritos
+
+def main():
+    parser = argparse.ArgumentParser(description="Descompresión con mmap de contenedores y archivos por bloques.")
+    parser.add_argument("entrada")
+    parser.add_argument("salida")
+    parser.add_argument("--bloque", type=int, default=TAM_BLOQUE, help="bytes por bloque decodificado")
+    argumentos = parser.parse_args()
+
+    escritos = descomprimir_mmap(argumentos.entrada, argumentos.salida, argumentos.bloque)
+    print(f"{escritos} bytes descomprimidos")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# Codificacion de Huffman vectorizada con NumPy (opcional): los simbolos se traducen a arreglos de
+# codigos y longitudes con una tabla de consulta, las posiciones de los bits salen de un cumsum y la
+# carga se arma con desplazamientos vectorizados en palabras de 64 bits. Sin NumPy se usa Python puro
+from collections import Counter
+
+try:
+    import numpy as np
+except ImportError: # NumPy es opcional
+    np = None
+
+HAY_NUMPY = np is not None
+USAR_NUMPY = HAY_NUMPY # se puede poner en False para forzar la version en Python puro
+TAM_TROZO = 1 << 18 # simbolos que se empaquetan por paso (acota la memoria de los arreglos de bits)
+LONGITUD_MAXIMA_NUMPY = 64 # los codigos se guardan en enteros de 64 bits
+
+# Funcion para convertir un mensaje (bytes, texto o secuencia de enteros) en un arreglo de indices
+# de la tabla de consulta
+def arreglo_de_simbolos(mensaje):
+    if isinstance(mensaje, str):
+        return np.frombuffer(mensaje.encode("utf-32-le"), dtype="<u4") # un entero por caracter
+    if isinstance(mensaje, (bytes, bytearray, memoryview)):
+        return np.frombuffer(mensaje, dtype=np.uint8)
+    return np.asarray(mensaje) # lista o array de simbolos de mas de un byte
+
+# Funcion para contar los simbolos de una secuencia de bloques de bytes; retorna un diccionario ordenado
+def contar_bytes(bloques):
+    if not USAR_NUMPY:
+        frecuencias = Counter()
+        for bloque in bloques:
+            frecuencias.update(bloque)
+        return dict(sorted(frecuencias.items()))
+    conteo = np.zeros(256, dtype=np.int64)
+    for bloque in bloques:
+        conteo += np.bincount(arreglo_de_simbolos(bloque), minlength=256)
+    return {simbolo: int(frecuencia) for simbolo, frecuencia in enumerate(conteo) if frecuencia}
+
+# Funcion para armar las tablas de consulta indice -> valor del codigo y indice -> longitud
+def tablas_de_consulta(codigos_enteros):
+    claves = [ord(simbolo) if isinstance(simbolo, str) else simbolo for simbolo in codigos_enteros]
+    tamano = max(claves, default=0) + 1
+    valores = np.zeros(tamano, dtype=np.uint64)
+    longitudes = np.zeros(tamano, dtype=np.int64) # 0 = simbolo sin codigo
+    for clave, (valor, longitud) in zip(claves, codigos_enteros.values()):
+        valores[clave] = valor
+        longitudes[clave] = longitud
+    return valores, longitudes
+
+# Escribe en `bits` los codigos de `simbolos` (arreglo de indices) por trozos. Cada codigo se
+# desplaza a su lugar dentro de una palabra de 64 bits (o de dos, si queda partido) y como los codigos
+# no se solapan, sumar las partes de una misma palabra equivale a un OR
+def empaquetar_codigos(simbolos, valores, longitudes, bits):
+    for inicio in range(0, len(simbolos), TAM_TROZO):
+        trozo = simbolos[inicio:inicio + TAM_TROZO]
+        if int(trozo.max()) >= len(longitudes) or int(longitudes[trozo].min()) == 0:
+            raise KeyError("El mensaje tiene un símbolo sin código de Huffman.")
+        longitudes_trozo = longitudes[trozo]
+        valores_trozo = valores[trozo]
+        fines = np.cumsum(longitudes_trozo) # posicion (exclusiva) donde termina cada codigo
+        total = int(fines[-1])
+        posiciones = fines - longitudes_trozo
+        palabra = posiciones >> 6
+        fin_en_palabra = (posiciones & 63) + longitudes_trozo # donde termina el codigo contando desde la palabra
+        partido = fin_en_palabra > 64 # el codigo sigue en la palabra siguiente
+        primera = np.where(partido, valores_trozo >> (fin_en_palabra - 64).clip(0).astype(np.uint64),
+                           valores_trozo << (64 - fin_en_palabra).clip(0).astype(np.uint64))
+
+        palabras = np.zeros((total + 63) >> 6, dtype=np.uint64)
+        cambios = np.flatnonzero(np.diff(palabra, prepend=-1)) # primer codigo de cada palabra
+        palabras[palabra[cambios]] = np.add.reduceat(primera, cambios)
+        if partido.any():
+            palabras[palabra[partido] + 1] += valores_trozo[partido] << (128 - fin_en_palabra[partido]).astype(np.uint64)
+        empaquetados = palabras.astype(">u8").tobytes()[:(total + 7) >> 3] # bytes en orden de escritura
+        bits.write_bits(int.from_bytes(empaquetados, "big") >> (-total % 8), total)
+    return bits
+
+# Funcion para escribir en `bits` los codigos de Huffman de un mensaje (bytes o texto);
+# `codigos_enteros` tiene cada codigo como (valor, longitud)
+def codificar_simbolos(mensaje, codigos_enteros, bits):
+    if not mensaje:
+        return bits
+    if not USAR_NUMPY or max((longitud for _, longitud in codigos_enteros.values()), default=0) > LONGITUD_MAXIMA_NUMPY:
+        for simbolo in mensaje:
+            bits.write_bits(*codigos_enteros[simbolo]) # escribe el codigo completo de una vez
+        return bits
+    valores, longitudes = tablas_de_consulta(codigos_enteros)
+    return empaquetar_codigos(arreglo_de_simbolos(mensaje), valores, longitudes, bits)
@@ -0,0 +1,114 @@
+# Instrumentacion opcional de los codificadores: tiempo y llamadas por etapa (frecuencias, arbol,
+# codigos, codificacion, decodificacion...) y contadores (bytes escritos, renormalizaciones, casos E3).
+# Mientras no se active, etapa() y contar() no hacen nada y los codificadores no pagan la medicion
+import cProfile
+import io
+import json
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+METRICAS = None # Metricas activas; None = sin instrumentacion
+
+# Registro de una medicion: etapas (segundos y llamadas) y contadores; con `perfil` se corre
+# cProfile y con `memoria` tracemalloc mientras esten activas
+class Metricas:
+    def __init__(self, etiqueta="", perfil=False, memoria=False):
+        self.etiqueta = etiqueta
+        self.etapas = {} # nombre -> [segundos, llamadas]
+        self.contadores = {}
+        self.perfil = cProfile.Profile() if perfil else None
+        self.memoria = memoria
+        self.pico_memoria = None # bytes, solo con `memoria`
+        self.inicio = None
+        self.segundos = 0.0
+
+    def iniciar(self):
+        self.inicio = time.perf_counter()
+        if self.memoria:
+            tracemalloc.start()
+        if self.perfil is not None:
+            self.perfil.enable()
+
+    def detener(self):
+        if self.perfil is not None:
+            self.perfil.disable()
+        if self.memoria:
+            self.pico_memoria = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        self.segundos += time.perf_counter() - self.inicio
+
+    # Mide el tiempo de un bloque `with` y lo suma a la etapa `nombre`
+    @contextmanager
+    def etapa(self, nombre):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            registro = self.etapas.setdefault(nombre, [0.0, 0])
+            registro[0] += time.perf_counter() - inicio
+            registro[1] += 1
+
+    def contar(self, nombre, cantidad=1):
+        self.contadores[nombre] = self.contadores.get(nombre, 0) + cantidad
+
+    def como_dict(self):
+        datos = {
+            "etiqueta": self.etiqueta,
+            "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "segundos": round(self.segundos, 6),
+            "etapas": {nombre: {"segundos": round(segundos, 6), "llamadas": llamadas} for nombre, (segundos, llamadas) in self.etapas.items()},
+            "contadores": dict(self.contadores),
+        }
+        if self.pico_memoria is not None:
+            datos["pico_memoria"] = self.pico_memoria
+        return datos
+
+    # Una linea JSON con toda la medicion (para agregar a un archivo .jsonl)
+    def linea_json(self):
+        return json.dumps(self.como_dict(), ensure_ascii=False)
+
+    # Texto con las `cantidad` funciones de mas tiempo acumulado segun cProfile
+    def texto_perfil(self, cantidad=20):
+        if self.perfil is None:
+            return ""
+        salida = io.StringIO()
+        pstats.Stats(self.perfil, stream=salida).sort_stats("cumulative").print_stats(cantidad)
+        return salida.getvalue()
+
+    # Texto con una linea por etapa y por contador
+    def texto(self):
+        lineas = [f"{nombre:>24}: {segundos:10.4f} s en {llamadas} llamadas" for nombre, (segundos, llamadas) in self.etapas.items()]
+        lineas += [f"{nombre:>24}: {valor}" for nombre, valor in self.contadores.items()]
+        if self.pico_memoria is not None:
+            lineas.append(f"{'pico de memoria':>24}: {self.pico_memoria} bytes")
+        return "\n".join(lineas)
+
+# Activa la medicion dentro de un bloque `with` y retorna las Metricas; con `archivo_json` agrega
+# la linea JSON al terminar
+@contextmanager
+def medir(etiqueta="", perfil=False, memoria=False, archivo_json=None):
+    global METRICAS
+    anteriores = METRICAS
+    metricas = METRICAS = Metricas(etiqueta, perfil, memoria)
+    metricas.iniciar()
+    try:
+        yield metricas
+    finally:
+        metricas.detener()
+        METRICAS = anteriores
+        if archivo_json:
+            with open(archivo_json, "a", encoding="utf-8") as archivo:
+                archivo.write(metricas.linea_json() + "\n")
+
+# Bloque `with` que mide la etapa `nombre` si hay metricas activas
+def etapa(nombre):
+    return METRICAS.etapa(nombre) if METRICAS is not None else nullcontext()
+
+def contar(nombre, cantidad=1):
+    if METRICAS is not None:
+        METRICAS.contar(nombre, cantidad)
+
+def activas():
+    return METRICAS is not None
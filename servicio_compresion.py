@@ -0,0 +1,411 @@
+# Servicio de compresion con asyncio sobre TCP o un socket Unix, para usar el laboratorio como proceso
+# auxiliar en lugar del menu interactivo. Cada solicitud es una cabecera con la operacion, el metodo y la
+# longitud de los datos, seguida de los datos; la respuesta son tramas de datos que se envian a medida
+# que el codificador las produce. La codificacion corre en un pool de procesos (las partes vuelven por
+# un pipe) y se limita la cantidad de solicitudes y de bytes en curso: mientras no hay lugar no se leen
+# mas datos del socket, asi el cliente queda esperando (contrapresion)
+#
+#   solicitud: MAGIA_SERVICIO | version | operacion | metodo (indice en METODOS_FLUJO) | longitud (8 bytes) | datos
+#   respuesta: MAGIA_SERVICIO | tramas TRAMA_DATOS ... | TRAMA_FIN o TRAMA_ERROR (mensaje UTF-8)
+#   trama:     tipo (1 byte) | longitud (4 bytes) | datos
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from compresion_flujo import METODOS_FLUJO, comprimir_partes, descomprimir_partes
+from compresion_paralela import TRABAJADORES
+
+MAGIA_SERVICIO = b"LB3S"
+VERSION_SERVICIO = 1
+OPERACION_COMPRIMIR = 0
+OPERACION_DESCOMPRIMIR = 1
+OPERACION_ESTADISTICAS = 2 # los datos de la respuesta son un JSON con las estadisticas del servidor
+NOMBRES_OPERACIONES = {OPERACION_COMPRIMIR: "comprimir", OPERACION_DESCOMPRIMIR: "descomprimir", OPERACION_ESTADISTICAS: "estadisticas"}
+TRAMA_DATOS = 0
+TRAMA_FIN = 1
+TRAMA_ERROR = 2 # termina la respuesta; los datos enviados antes pueden estar incompletos
+TAM_CABECERA_SOLICITUD = len(MAGIA_SERVICIO) + 3 + 8
+TAM_CABECERA_TRAMA = 1 + 4
+
+PUERTO = 8765
+MAX_SOLICITUDES = 2 * TRABAJADORES # solicitudes en curso (las demas esperan sin leer sus datos)
+MAX_BYTES = 256 << 20 # bytes en curso: la entrada de cada solicitud y un trozo de su salida
+TAM_TROZO = 1 << 16 # bytes que se leen o escriben en el socket (y en el pipe del trabajador) de una vez
+MAX_LATENCIAS = 10000 # latencias guardadas por operacion para los percentiles
+
+# Funcion que corre en el pool: comprime o descomprime los datos de una solicitud y envia la salida por
+# `conexion` (el extremo de escritura de un pipe) en trozos de a lo sumo `tam_trozo` bytes, terminada
+# con un trozo vacio. Si el pipe se llena espera a que el servidor lea; retorna el error o None
+def procesar_solicitud(operacion, metodo, datos, conexion, tam_trozo):
+    try:
+        if operacion == OPERACION_COMPRIMIR:
+            partes = comprimir_partes(datos, metodo)
+        else:
+            partes = descomprimir_partes(datos, tam_bloque=tam_trozo)
+        del datos
+        for parte in partes:
+            vista = memoryview(parte)
+            for inicio in range(0, len(vista), tam_trozo):
+                conexion.send_bytes(vista[inicio:inicio + tam_trozo])
+        error = None
+    except Exception as excepcion: # datos no validos o el servidor dejo de leer (cliente desconectado)
+        error = f"{type(excepcion).__name__}: {excepcion}"
+    try:
+        conexion.send_bytes(b"")
+    except OSError:
+        pass
+    conexion.close()
+    return error
+
+# Percentil por rango mas cercano de una lista ordenada
+def percentil(ordenados, porcentaje):
+    if not ordenados:
+        return 0.0
+    return ordenados[max(0, min(len(ordenados) - 1, round(porcentaje / 100 * len(ordenados)) - 1))]
+
+# Presupuesto de bytes en curso compartido por todas las conexiones
+class PresupuestoBytes:
+    def __init__(self, limite):
+        self.limite = limite
+        self.en_uso = 0
+        self.condicion = asyncio.Condition()
+
+    async def adquirir(self, cantidad):
+        async with self.condicion:
+            await self.condicion.wait_for(lambda: self.en_uso + cantidad <= self.limite)
+            self.en_uso += cantidad
+
+    async def liberar(self, cantidad):
+        async with self.condicion:
+            self.en_uso -= cantidad
+            self.condicion.notify_all()
+
+class ServidorCompresion:
+    def __init__(self, trabajadores=TRABAJADORES, max_solicitudes=MAX_SOLICITUDES, max_bytes=MAX_BYTES, tam_trozo=TAM_TROZO):
+        self.trabajadores = trabajadores
+        self.max_solicitudes = max_solicitudes
+        self.max_bytes = max_bytes
+        self.tam_trozo = tam_trozo
+        self.pool = None
+        self.hilos = None
+        self.servidor = None
+        self.ruta_unix = None
+        self.conexiones = set() # tareas que atienden conexiones abiertas
+        self.semaforo = None
+        self.presupuesto = None
+        self.en_curso = 0
+        self.contadores = {"conexiones": 0, "solicitudes": 0, "errores": 0, "rechazadas": 0, "bytes_entrada": 0, "bytes_salida": 0}
+        self.latencias = {nombre: deque(maxlen=MAX_LATENCIAS) for nombre in ("comprimir", "descomprimir")}
+
+    # Empieza a escuchar en TCP (host y puerto; puerto 0 = uno libre) o en el socket Unix `ruta_unix`
+    async def iniciar(self, host="127.0.0.1", puerto=PUERTO, ruta_unix=None):
+        self.pool = ProcessPoolExecutor(max_workers=self.trabajadores)
+        # Un hilo por solicitud en curso para leer su pipe: con el executor por defecto las solicitudes en cola
+        # del pool ocupaban los hilos y nadie leia el pipe de los trabajadores que si corrian
+        self.hilos = ThreadPoolExecutor(max_workers=self.max_solicitudes)
+        self.semaforo = asyncio.Semaphore(self.max_solicitudes)
+        self.presupuesto = PresupuestoBytes(self.max_bytes)
+        if ruta_unix:
+            self.servidor = await asyncio.start_unix_server(self.atender, ruta_unix)
+            self.ruta_unix = ruta_unix
+        else:
+            self.servidor = await asyncio.start_server(self.atender, host, puerto)
+        return self.servidor
+
+    # Direccion donde escucha: (host, puerto) o la ruta del socket Unix
+    def direccion(self):
+        return self.servidor.sockets[0].getsockname()
+
+    async def cerrar(self):
+        if self.servidor is not None:
+            self.servidor.close()
+            await self.servidor.wait_closed()
+        for tarea in list(self.conexiones): # las conexiones abiertas no se esperan
+            tarea.cancel()
+        await asyncio.gather(*self.conexiones, return_exceptions=True)
+        if self.ruta_unix and os.path.exists(self.ruta_unix):
+            os.remove(self.ruta_unix)
+        if self.pool is not None:
+            self.pool.shutdown()
+        if self.hilos is not None:
+            self.hilos.shutdown()
+
+    # Atiende las solicitudes de una conexion, una detras de otra, hasta que el cliente la cierra
+    async def atender(self, lector, escritor):
+        self.contadores["conexiones"] += 1
+        tarea = asyncio.current_task()
+        self.conexiones.add(tarea)
+        try:
+            while True:
+                try:
+                    cabecera = await lector.readexactly(TAM_CABECERA_SOLICITUD)
+                except asyncio.IncompleteReadError as error:
+                    if error.partial:
+                        raise ValueError("Solicitud truncada.")
+                    return # el cliente cerro la conexion entre solicitudes
+                await self.atender_solicitud(cabecera, lector, escritor)
+        except (ValueError, ConnectionError, asyncio.IncompleteReadError):
+            pass # trama no valida o conexion perdida: se cierra la conexion
+        except asyncio.CancelledError:
+            pass # el servidor se esta cerrando
+        finally:
+            self.conexiones.discard(tarea)
+            escritor.close()
+            try:
+                await escritor.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def atender_solicitud(self, cabecera, lector, escritor):
+        if cabecera[:len(MAGIA_SERVICIO)] != MAGIA_SERVICIO or cabecera[len(MAGIA_SERVICIO)] != VERSION_SERVICIO:
+            raise ValueError("La solicitud no es del servicio de compresión.")
+        operacion, indice_metodo = cabecera[len(MAGIA_SERVICIO) + 1:len(MAGIA_SERVICIO) + 3]
+        longitud = int.from_bytes(cabecera[-8:], "big")
+        inicio = time.perf_counter()
+
+        error = None
+        if operacion not in NOMBRES_OPERACIONES:
+            error = f"Operación desconocida: {operacion}."
+        elif operacion == OPERACION_COMPRIMIR and indice_metodo >= len(METODOS_FLUJO):
+            error = f"Método desconocido: {indice_metodo}."
+        elif longitud + self.tam_trozo > self.max_bytes:
+            self.contadores["rechazadas"] += 1
+            error = f"La solicitud tiene {longitud} bytes y el máximo es {self.max_bytes - self.tam_trozo}."
+        if error:
+            await self.descartar(lector, longitud) # la conexion sigue sincronizada para la siguiente solicitud
+            await self.responder_error(escritor, error)
+            return
+        if operacion == OPERACION_ESTADISTICAS:
+            await self.descartar(lector, longitud)
+            escritor.write(MAGIA_SERVICIO)
+            await self.escribir_trama(escritor, TRAMA_DATOS, json.dumps(self.estadisticas()).encode("utf-8"))
+            await self.escribir_trama(escritor, TRAMA_FIN)
+            return
+
+        # La entrada se guarda completa (los codificadores estaticos hacen dos pasadas) pero la salida pasa
+        # de a un trozo por el servidor, asi cada solicitud reserva su entrada y un trozo de salida
+        reserva = longitud + self.tam_trozo
+        async with self.semaforo: # a lo sumo max_solicitudes en curso
+            await self.presupuesto.adquirir(reserva) # y a lo sumo max_bytes en curso
+            self.en_curso += 1
+            try:
+                datos = await self.recibir(lector, longitud)
+                self.contadores["bytes_entrada"] += longitud
+                error = await self.ejecutar(escritor, operacion, METODOS_FLUJO[indice_metodo] if operacion == OPERACION_COMPRIMIR else None, datos)
+            finally:
+                self.en_curso -= 1
+                await self.presupuesto.liberar(reserva)
+        if error:
+            self.contadores["errores"] += 1
+            await self.escribir_trama(escritor, TRAMA_ERROR, error.encode("utf-8"))
+        else:
+            await self.escribir_trama(escritor, TRAMA_FIN)
+        self.contadores["solicitudes"] += 1
+        self.latencias[NOMBRES_OPERACIONES[operacion]].append(time.perf_counter() - inicio)
+
+    # Corre la solicitud en el pool y reenvia cada trozo de la salida apenas llega por el pipe; el trozo
+    # siguiente se lee cuando el socket se vacio, asi un cliente lento frena al trabajador. Retorna el error
+    # del trabajador o None
+    async def ejecutar(self, escritor, operacion, metodo, datos):
+        loop = asyncio.get_running_loop()
+        lectura, escritura = multiprocessing.Pipe(duplex=False)
+        futuro = loop.run_in_executor(self.pool, procesar_solicitud, operacion, metodo, datos, escritura, self.tam_trozo)
+        futuro.add_done_callback(lambda _: escritura.close()) # si el trabajador cae, el pipe llega al final
+        del datos
+        escritor.write(MAGIA_SERVICIO)
+        try:
+            while True:
+                try:
+                    trozo = await loop.run_in_executor(self.hilos, lectura.recv_bytes) # espera en un hilo, no en el loop
+                except EOFError:
+                    break
+                if not trozo:
+                    break
+                await self.escribir_trama(escritor, TRAMA_DATOS, trozo)
+            try:
+                return await futuro
+            except Exception as excepcion: # el proceso del trabajador termino de forma anormal
+                return f"{type(excepcion).__name__}: {excepcion}"
+        finally:
+            lectura.close() # si el cliente se fue, el trabajador recibe un error al escribir y termina
+
+    # Lee `longitud` bytes del socket de a trozos en un solo buffer (sin copiarlo al terminar)
+    async def recibir(self, lector, longitud):
+        datos = bytearray(longitud)
+        vista = memoryview(datos)
+        recibidos = 0
+        while recibidos < longitud:
+            trozo = await lector.readexactly(min(self.tam_trozo, longitud - recibidos))
+            vista[recibidos:recibidos + len(trozo)] = trozo
+            recibidos += len(trozo)
+        return datos
+
+    async def descartar(self, lector, longitud):
+        while longitud > 0:
+            longitud -= len(await lector.readexactly(min(self.tam_trozo, longitud)))
+
+    # Escribe una trama y espera a que se vacie el buffer del socket
+    async def escribir_trama(self, escritor, tipo, datos=b""):
+        escritor.write(bytes([tipo]) + len(datos).to_bytes(4, "big"))
+        if datos:
+            escritor.write(datos)
+        await escritor.drain()
+        if tipo == TRAMA_DATOS:
+            self.contadores["bytes_salida"] += len(datos)
+
+    async def responder_error(self, escritor, mensaje):
+        escritor.write(MAGIA_SERVICIO)
+        await self.escribir_trama(escritor, TRAMA_ERROR, mensaje.encode("utf-8"))
+        self.contadores["errores"] += 1
+
+    # Contadores, solicitudes y bytes en curso y latencias (ms) por operacion
+    def estadisticas(self):
+        latencias = {}
+        for nombre, valores in self.latencias.items():
+            ordenados = sorted(valores)
+            latencias[nombre] = {
+                "cantidad": len(ordenados),
+                "p50": percentil(ordenados, 50) * 1000,
+                "p90": percentil(ordenados, 90) * 1000,
+                "p99": percentil(ordenados, 99) * 1000,
+                "max": (ordenados[-1] if ordenados else 0.0) * 1000,
+            }
+        return {
+            **self.contadores,
+            "en_curso": self.en_curso,
+            "bytes_en_curso": self.presupuesto.en_uso if self.presupuesto else 0,
+            "latencias_ms": latencias,
+        }
+
+# Error que el servidor informa en una respuesta
+class ErrorServicio(Exception):
+    pass
+
+# Cliente del servicio: una conexion por la que las solicitudes van de a una
+class ClienteCompresion:
+    def __init__(self, tam_trozo=TAM_TROZO):
+        self.tam_trozo = tam_trozo
+        self.lector = None
+        self.escritor = None
+        self.candado = asyncio.Lock()
+
+    async def conectar(self, host="127.0.0.1", puerto=PUERTO, ruta_unix=None):
+        if ruta_unix:
+            self.lector, self.escritor = await asyncio.open_unix_connection(ruta_unix)
+        else:
+            self.lector, self.escritor = await asyncio.open_connection(host, puerto)
+        return self
+
+    async def cerrar(self):
+        if self.escritor is not None:
+            self.escritor.close()
+            await self.escritor.wait_closed()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *excepcion):
+        await self.cerrar()
+
+    # Envia una solicitud. `fuente` son los datos (bytes) o un iterable de trozos que suman `longitud`
+    # bytes; con `destino` (un archivo abierto) la respuesta se escribe ahi a medida que llega y se
+    # retorna su longitud, si no se retorna la respuesta completa. Un error del servidor a mitad de la
+    # respuesta lanza ErrorServicio (lo ya escrito en `destino` queda incompleto)
+    async def solicitud(self, operacion, fuente=b"", metodo="huffman", longitud=None, destino=None):
+        if isinstance(fuente, (bytes, bytearray, memoryview)):
+            vista = memoryview(fuente).cast("B")
+            longitud = len(vista)
+            fuente = (vista[inicio:inicio + self.tam_trozo] for inicio in range(0, longitud, self.tam_trozo))
+        elif longitud is None:
+            raise ValueError("Con una fuente por trozos hay que indicar la longitud.")
+        async with self.candado:
+            self.escritor.write(MAGIA_SERVICIO + bytes([VERSION_SERVICIO, operacion, METODOS_FLUJO.index(metodo)]) + longitud.to_bytes(8, "big"))
+            enviados = 0
+            for trozo in fuente:
+                self.escritor.write(trozo)
+                enviados += len(trozo)
+                await self.escritor.drain() # espera si el servidor no esta leyendo (contrapresion)
+            if enviados != longitud:
+                raise ValueError(f"La fuente tenía {enviados} bytes y se anunciaron {longitud}.")
+
+            if await self.lector.readexactly(len(MAGIA_SERVICIO)) != MAGIA_SERVICIO:
+                raise ValueError("La respuesta no es del servicio de compresión.")
+            partes = []
+            recibidos = 0
+            while True:
+                cabecera = await self.lector.readexactly(TAM_CABECERA_TRAMA)
+                trozo = await self.lector.readexactly(int.from_bytes(cabecera[1:], "big"))
+                if cabecera[0] == TRAMA_FIN:
+                    break
+                if cabecera[0] == TRAMA_ERROR:
+                    raise ErrorServicio(trozo.decode("utf-8", "replace"))
+                recibidos += len(trozo)
+                if destino is not None:
+                    destino.write(trozo)
+                else:
+                    partes.append(trozo)
+        return recibidos if destino is not None else b"".join(partes)
+
+    async def comprimir(self, datos, metodo="huffman"):
+        return await self.solicitud(OPERACION_COMPRIMIR, datos, metodo)
+
+    async def descomprimir(self, datos):
+        return await self.solicitud(OPERACION_DESCOMPRIMIR, datos)
+
+    async def estadisticas(self):
+        return json.loads(await self.solicitud(OPERACION_ESTADISTICAS))
+
+    # Envia un archivo de a trozos y escribe la respuesta en `ruta_salida` a medida que llega
+    async def procesar_archivo(self, operacion, ruta_entrada, ruta_salida, metodo="huffman"):
+        with open(ruta_entrada, "rb") as entrada, open(ruta_salida, "wb") as salida:
+            trozos = iter(lambda: entrada.read(self.tam_trozo), b"")
+            return await self.solicitud(operacion, trozos, metodo, os.path.getsize(ruta_entrada), salida)
+
+async def servir(argumentos):
+    servidor = ServidorCompresion(argumentos.trabajadores, argumentos.max_solicitudes, argumentos.max_bytes)
+    await servidor.iniciar(argumentos.host, argumentos.puerto, argumentos.unix)
+    print(f"Escuchando en {servidor.direccion()}")
+    try:
+        await servidor.servidor.serve_forever()
+    finally:
+        await servidor.cerrar()
+
+async def cliente(argumentos):
+    cliente = await ClienteCompresion().conectar(argumentos.host, argumentos.puerto, argumentos.unix)
+    async with cliente:
+        if argumentos.accion == "estadisticas":
+            print(json.dumps(await cliente.estadisticas(), indent=2, ensure_ascii=False))
+            return
+        if not argumentos.entrada or not argumentos.salida:
+            raise SystemExit("Faltan los archivos de entrada y salida.")
+        operacion = OPERACION_COMPRIMIR if argumentos.accion == "comprimir" else OPERACION_DESCOMPRIMIR
+        inicio = time.perf_counter()
+        escritos = await cliente.procesar_archivo(operacion, argumentos.entrada, argumentos.salida, argumentos.metodo)
+        print(f"{os.path.getsize(argumentos.entrada)} bytes -> {escritos} bytes en {time.perf_counter() - inicio:.3f} s")
+
+def main():
+    parser = argparse.ArgumentParser(description="Servicio de compresión sobre TCP o un socket Unix.")
+    parser.add_argument("accion", choices=["servir", "comprimir", "descomprimir", "estadisticas"])
+    parser.add_argument("entrada", nargs="?")
+    parser.add_argument("salida", nargs="?")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=PUERTO)
+    parser.add_argument("--unix", help="ruta de un socket Unix (en lugar de TCP)")
+    parser.add_argument("--metodo", choices=METODOS_FLUJO, default="huffman", help="método de compresión")
+    parser.add_argument("--trabajadores", type=int, default=TRABAJADORES, help="procesos del pool del servidor")
+    parser.add_argument("--max-solicitudes", type=int, default=MAX_SOLICITUDES, help="solicitudes en curso en el servidor")
+    parser.add_argument("--max-bytes", type=int, default=MAX_BYTES, help="bytes de entrada en curso en el servidor")
+    argumentos = parser.parse_args()
+
+    try:
+        asyncio.run(servir(argumentos) if argumentos.accion == "servir" else cliente(argumentos))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import random
+from collections import Counter
+
+import pytest
+
+from codificacion_ans import (
+    codificar_rans, codificar_tans, decodificar_simbolos_rans, decodificar_simbolos_tans, normalizar_frecuencias,
+    precision_ans,
+)
+
+MENSAJES = [
+    "a", "abracadabra", "aaaaaaaaaaaaaaaaaaab" * 50, "".join(map(chr, range(256))) * 2,
+    "".join(random.Random(3).choice("abcdefghij") for _ in range(5000)),
+]
+
+
+@pytest.mark.parametrize("mensaje", MENSAJES)
+def test_tans(mensaje):
+    frecuencias = Counter(mensaje)
+    precision = precision_ans(frecuencias)
+    carga = codificar_tans(mensaje, frecuencias, precision).getvalue()
+    assert "".join(decodificar_simbolos_tans(carga, len(mensaje), frecuencias, precision)) == mensaje
+
+
+@pytest.mark.parametrize("mensaje", MENSAJES)
+def test_rans(mensaje):
+    frecuencias = Counter(mensaje)
+    precision = precision_ans(frecuencias)
+    carga = codificar_rans(mensaje, frecuencias, precision)
+    assert "".join(decodificar_simbolos_rans(carga, len(mensaje), frecuencias, precision)) == mensaje
+
+
+def test_mensaje_vacio():
+    assert codificar_rans("", {}, 12) == b""
+    assert decodificar_simbolos_rans(b"", 0, {}, 12) == []
+    assert decodificar_simbolos_tans(b"", 0, {}, 12) == []
+    with pytest.raises(ValueError):
+        decodificar_simbolos_rans(b"\x01", 3, Counter("abc"), 12) # menos de los 4 bytes del estado
+
+
+@pytest.mark.parametrize("precision", (8, 12, 16))
+def test_normalizar_frecuencias(precision):
+    frecuencias = {simbolo: 1 + simbolo * simbolo for simbolo in range(200)}
+    normalizadas = normalizar_frecuencias(frecuencias, precision)
+    assert sum(normalizadas.values()) == 1 << precision
+    assert min(normalizadas.values()) >= 1
+    with pytest.raises(ValueError):
+        normalizar_frecuencias(dict.fromkeys(range(300), 1), 8)
@@ -0,0 +1,43 @@
+import random
+
+import pytest
+
+from bits_io import BitReader
+from codificacion_lz77 import (
+    VENTANA_LZ, BuscadorLZ, codificar_lz77_adaptativo, codificar_lz77_huffman, decodificar_lz77_adaptativo_bloques,
+    decodificar_lz77_huffman_bloques, tokens_lz77,
+)
+
+generador = random.Random(17)
+TEXTOS = [
+    b"", b"a", b"a" * 5000, b"abcabcabcabcabd" * 200, bytes(range(256)) * 3, generador.randbytes(4000),
+    generador.randbytes(3000) * 2 + generador.randbytes(VENTANA_LZ) + b"fin", # coincidencias cerca del limite de la ventana
+]
+
+
+def lector(bits):
+    return BitReader(bits.getvalue(), len(bits))
+
+
+@pytest.mark.parametrize("datos", TEXTOS)
+def test_huffman(datos):
+    bits, modelo = codificar_lz77_huffman(datos)
+    assert b"".join(decodificar_lz77_huffman_bloques(lector(bits), len(datos), modelo, 1000)) == datos
+
+
+@pytest.mark.parametrize("datos", TEXTOS)
+def test_adaptativo(datos):
+    assert b"".join(decodificar_lz77_adaptativo_bloques(lector(codificar_lz77_adaptativo(datos)), tam_bloque=1000)) == datos
+
+
+@pytest.mark.parametrize("nivel", (1, 5, 9))
+def test_niveles(nivel):
+    datos = b"el que busca encuentra, el que busca mas encuentra mas " * 100
+    bits, modelo = codificar_lz77_huffman(datos, nivel)
+    assert b"".join(decodificar_lz77_huffman_bloques(lector(bits), len(datos), modelo)) == datos
+    assert len(tokens_lz77(datos, nivel)) < len(datos) // 10
+
+
+def test_nivel_no_valido():
+    with pytest.raises(ValueError):
+        BuscadorLZ(0)
@@ -0,0 +1,135 @@
+import io
+import random
+from collections import Counter
+
+import pytest
+
+from cache_modelos import CacheModelos
+from compresion_flujo import (
+    METODOS_CON_CACHE, METODOS_FLUJO, comprimir_archivo, comprimir_bytes, comprimir_partes, descomprimir_archivo,
+    descomprimir_bytes, descomprimir_partes, modelo_de_cabecera,
+)
+from contenedor import MAGIA, leer_cabecera
+
+generador = random.Random(20)
+CASOS = {
+    "vacio": b"",
+    "un_byte": b"x",
+    "un_simbolo": b"a" * 5000,
+    "todos_los_bytes": bytes(range(256)) * 4,
+    "texto": b"la compresion por flujo lee el archivo en bloques y escribe a medida que codifica\n" * 300,
+    "aleatorio": generador.randbytes(20000),
+}
+
+
+@pytest.mark.parametrize("caso", CASOS)
+@pytest.mark.parametrize("metodo", METODOS_FLUJO)
+def test_ida_y_vuelta(metodo, caso):
+    datos = CASOS[caso]
+    assert descomprimir_bytes(comprimir_bytes(datos, metodo)) == datos
+
+
+# Varios bloques de lectura y de salida (los codificadores de una pasada y los de bloques propios)
+@pytest.mark.parametrize("metodo", METODOS_FLUJO)
+def test_ida_y_vuelta_en_bloques(metodo):
+    datos = CASOS["texto"] + CASOS["todos_los_bytes"]
+    comprimido = b"".join(comprimir_partes(datos, metodo, tam_bloque=1000))
+    partes = list(descomprimir_partes(comprimido, tam_bloque=777))
+    assert b"".join(partes) == datos
+
+
+@pytest.mark.parametrize("metodo", ("huffman", "huffman4", "bwt", "lz77"))
+def test_archivos(tmp_path, metodo):
+    datos = CASOS["texto"] * 3 + CASOS["aleatorio"]
+    (tmp_path / "entrada").write_bytes(datos)
+    leidos, escritos = comprimir_archivo(tmp_path / "entrada", tmp_path / "comprimido", metodo, tam_bloque=4096)
+    assert leidos == len(datos) and escritos == (tmp_path / "comprimido").stat().st_size
+    descomprimir_archivo(tmp_path / "comprimido", tmp_path / "salida", tam_bloque=4096)
+    assert (tmp_path / "salida").read_bytes() == datos
+
+
+# huffman4 escribe un contenedor por bloque, cada uno con los bits de sus flujos
+def test_huffman4_un_contenedor_por_bloque():
+    datos = CASOS["texto"]
+    comprimido = b"".join(comprimir_partes(datos, "huffman4", tam_bloque=4096))
+    assert comprimido.count(MAGIA) == 1 + -(-len(datos) // 4096)
+    assert leer_cabecera(io.BytesIO(comprimido))["parametros"] == []
+
+
+@pytest.mark.parametrize("metodo", ("huffman", "huffman4", "aritmetica", "rango"))
+def test_modelo_compartido(metodo):
+    muestra = CASOS["texto"] + CASOS["todos_los_bytes"]
+    frecuencias = dict(sorted(Counter(muestra).items()))
+    modelo = modelo_de_cabecera(metodo, frecuencias)
+    datos = CASOS["texto"][:3000]
+    comprimido = comprimir_bytes(datos, metodo, frecuencias_compartidas=frecuencias)
+    assert not leer_cabecera(io.BytesIO(comprimido))["modelo"] # el modelo no viaja en la cabecera
+    assert descomprimir_bytes(comprimido, modelo) == datos
+
+
+@pytest.mark.parametrize("metodo", METODOS_CON_CACHE)
+def test_cache_de_modelos(metodo):
+    cache = CacheModelos()
+    for inicio in range(0, 6000, 1500):
+        datos = CASOS["texto"][inicio:inicio + 4000]
+        assert descomprimir_bytes(comprimir_bytes(datos, metodo, cache=cache), cache=cache) == datos
+    assert cache.estadisticas()["aciertos"] > 0
+
+
+def test_opciones_no_validas():
+    with pytest.raises(ValueError):
+        comprimir_bytes(b"abc", "desconocido")
+    with pytest.raises(ValueError):
+        comprimir_bytes(b"abc", "aritmetica", longitud_maxima=8)
+    with pytest.raises(ValueError):
+        comprimir_bytes(b"abc", "huffman", nivel=1)
+
+
+# Un contenedor truncado (en la cabecera o en la carga) da un error y no un resultado a medias
+@pytest.mark.parametrize("metodo", METODOS_FLUJO)
+def test_contenedor_truncado(metodo):
+    comprimido = comprimir_bytes(CASOS["texto"] + CASOS["aleatorio"][:2000], metodo)
+    for corte in (2, len(MAGIA) + 2, 10, len(comprimido) // 2):
+        with pytest.raises(ValueError):
+            descomprimir_bytes(comprimido[:corte])
+
+
+def test_cabecera_no_valida():
+    comprimido = bytearray(comprimir_bytes(CASOS["texto"], "huffman"))
+    with pytest.raises(ValueError, match="formato"):
+        descomprimir_bytes(b"XXXX" + bytes(comprimido[len(MAGIA):]))
+    version = bytearray(comprimido)
+    version[len(MAGIA)] = 99
+    with pytest.raises(ValueError, match="Versión"):
+        descomprimir_bytes(bytes(version))
+    metodo = bytearray(comprimido)
+    metodo[len(MAGIA) + 1] = 77
+    with pytest.raises(ValueError):
+        descomprimir_bytes(bytes(metodo))
+
+
+# Longitudes de codigo imposibles para el modelo (no forman un codigo prefijo o son de miles de bits)
+@pytest.mark.parametrize("metodo", ("huffman", "huffman4"))
+def test_longitudes_de_codigo_no_validas(metodo):
+    frecuencias = dict(sorted(Counter(CASOS["texto"]).items()))
+    comprimido = comprimir_bytes(CASOS["texto"], metodo, frecuencias_compartidas=frecuencias)
+    for modelo in ({simbolo: 1 for simbolo in frecuencias}, {simbolo: 5000 for simbolo in frecuencias}):
+        with pytest.raises(ValueError, match="código de Huffman"):
+            descomprimir_bytes(comprimido, modelo)
+
+
+# Una carga corrupta da un error o bytes distintos, nunca otra excepcion ni un bucle sin fin
+@pytest.mark.parametrize("metodo", METODOS_FLUJO)
+def test_carga_corrupta(metodo):
+    datos = CASOS["texto"][:3000] + CASOS["todos_los_bytes"]
+    comprimido = comprimir_bytes(datos, metodo)
+    generador = random.Random(metodo)
+    for _ in range(10):
+        corrupto = bytearray(comprimido)
+        for _ in range(3):
+            corrupto[generador.randrange(len(corrupto))] = generador.randrange(256)
+        try:
+            resultado = descomprimir_bytes(bytes(corrupto))
+        except ValueError:
+            continue
+        assert isinstance(resultado, bytes)
@@ -0,0 +1,43 @@
+import os
+
+from compresion_lotes import EXTENSION_COMPRIMIDO, comprimir_directorio, descomprimir_directorio, listar_archivos
+
+
+def crear_arbol(raiz):
+    (raiz / "sub").mkdir(parents=True)
+    (raiz / "a.txt").write_bytes(b"archivo a " * 300)
+    (raiz / "sub" / "b.bin").write_bytes(bytes(range(256)) * 10)
+    (raiz / "vacio").write_bytes(b"")
+
+
+def test_ida_y_vuelta(tmp_path):
+    crear_arbol(tmp_path / "origen")
+    resumen = comprimir_directorio(tmp_path / "origen", tmp_path / "comprimido", "huffman", trabajadores=1)
+    assert resumen["archivos"] == 3 and not resumen["errores"]
+    assert (tmp_path / "comprimido" / "sub" / ("b.bin" + EXTENSION_COMPRIMIDO)).exists()
+    resumen = descomprimir_directorio(tmp_path / "comprimido", tmp_path / "salida", trabajadores=1)
+    assert resumen["archivos"] == 3
+    for nombre in ("a.txt", os.path.join("sub", "b.bin"), "vacio"):
+        assert (tmp_path / "salida" / nombre).read_bytes() == (tmp_path / "origen" / nombre).read_bytes()
+
+
+def test_archivos_al_dia_se_omiten(tmp_path):
+    crear_arbol(tmp_path / "origen")
+    comprimir_directorio(tmp_path / "origen", tmp_path / "comprimido", trabajadores=1)
+    resumen = comprimir_directorio(tmp_path / "origen", tmp_path / "comprimido", trabajadores=1)
+    assert resumen["archivos"] == 0 and resumen["omitidos"] == 3
+    resumen = comprimir_directorio(tmp_path / "origen", tmp_path / "comprimido", trabajadores=1, forzar=True)
+    assert resumen["archivos"] == 3
+
+
+# Con el destino igual al origen, una segunda pasada no vuelve a comprimir las salidas .lb3
+def test_mismo_directorio(tmp_path):
+    crear_arbol(tmp_path)
+    for _ in range(2):
+        resumen = comprimir_directorio(tmp_path, tmp_path, trabajadores=1)
+        assert not resumen["errores"]
+    nombres = sorted(os.path.relpath(os.path.join(directorio, nombre), tmp_path) for directorio, _, archivos in os.walk(tmp_path) for nombre in archivos)
+    assert not any(nombre.endswith(EXTENSION_COMPRIMIDO * 2) for nombre in nombres)
+    assert [salida for _, salida in listar_archivos(str(tmp_path), str(tmp_path), "comprimir")] == [
+        os.path.join(str(tmp_path), nombre + EXTENSION_COMPRIMIDO) for nombre in ("a.txt", "vacio", os.path.join("sub", "b.bin"))
+    ]
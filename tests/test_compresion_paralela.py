@@ -0,0 +1,53 @@
+import random
+
+import pytest
+
+from acceso_aleatorio import ArchivoBloques, leer_rango
+from compresion_paralela import comprimir_archivo_paralelo, descomprimir_archivo_paralelo
+from descompresion_mmap import descomprimir_mmap, tamano_descomprimido
+
+generador = random.Random(9)
+DATOS = b"".join(generador.choice([b"bloque ", b"indice ", b"mmap ", bytes([generador.randrange(256)])]) for _ in range(60000))
+
+
+@pytest.fixture
+def entrada(tmp_path):
+    ruta = tmp_path / "entrada"
+    ruta.write_bytes(DATOS)
+    return ruta
+
+
+@pytest.mark.parametrize("metodo", ("huffman", "huffman4", "rango", "lz77", "bwt"))
+@pytest.mark.parametrize("modelo_compartido", (False, True))
+def test_ida_y_vuelta(tmp_path, entrada, metodo, modelo_compartido):
+    if modelo_compartido and metodo in ("lz77", "bwt"):
+        pytest.skip("sin tabla de frecuencias de los bytes")
+    comprimido = tmp_path / "comprimido.lb3b"
+    comprimir_archivo_paralelo(entrada, comprimido, metodo, tam_bloque=50000, trabajadores=2, modelo_compartido=modelo_compartido)
+    descomprimir_archivo_paralelo(comprimido, tmp_path / "salida", trabajadores=2)
+    assert (tmp_path / "salida").read_bytes() == DATOS
+
+    buffer = bytearray(tamano_descomprimido(comprimido))
+    assert descomprimir_mmap(comprimido, buffer) == len(DATOS)
+    assert buffer == DATOS
+    with pytest.raises(ValueError):
+        descomprimir_mmap(comprimido, bytearray(len(DATOS) - 1))
+
+
+def test_acceso_aleatorio(tmp_path, entrada):
+    comprimido = tmp_path / "comprimido.lb3b"
+    comprimir_archivo_paralelo(entrada, comprimido, "huffman", tam_bloque=30000, trabajadores=1)
+    with ArchivoBloques(comprimido) as archivo:
+        assert archivo.tamano == len(DATOS)
+        for inicio, longitud in ((0, 10), (29995, 10), (59990, 70000), (len(DATOS) - 1, 5), (len(DATOS), 3)):
+            assert archivo.leer_rango(inicio, longitud) == DATOS[inicio:inicio + longitud]
+    assert leer_rango(comprimido, 12345, 100) == DATOS[12345:12445]
+
+
+def test_archivo_de_bloques_truncado(tmp_path, entrada):
+    comprimido = tmp_path / "comprimido.lb3b"
+    comprimir_archivo_paralelo(entrada, comprimido, "huffman", tam_bloque=50000, trabajadores=1)
+    truncado = tmp_path / "truncado.lb3b"
+    truncado.write_bytes(comprimido.read_bytes()[:comprimido.stat().st_size // 2])
+    with pytest.raises(ValueError):
+        descomprimir_archivo_paralelo(truncado, tmp_path / "salida", trabajadores=1)
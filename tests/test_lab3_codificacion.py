@@ -0,0 +1,80 @@
+import random
+from collections import Counter
+
+import pytest
+
+from bits_io import BitReader
+from Lab3_Codificacion_SergioCardona import (
+    codificar_huffman, codificar_huffman_adaptativo, codigos_canonicos, costo_longitud_maxima, decodificar_huffman,
+    decodificar_huffman_adaptativo, int_arith_code, int_arith_code_adaptativo, int_arith_code_contexto, int_arith_decode,
+    int_arith_decode_adaptativo, int_arith_decode_contexto, int_range_code, int_range_decode, k_rango, longitudes_huffman,
+    longitudes_huffman_limitadas, tabla_huffman_canonica, validar_longitudes,
+)
+
+MENSAJES = ["a", "abracadabra", "el veloz murcielago hindu comia feliz cardillo y kiwi " * 40, "".join(map(chr, range(256)))]
+
+
+def lector(bits):
+    return BitReader(bits.getvalue(), len(bits))
+
+
+def kraft(longitudes):
+    maximo = max(longitudes.values())
+    return sum(1 << (maximo - longitud) for longitud in longitudes.values()) / (1 << maximo)
+
+
+@pytest.mark.parametrize("mensaje", MENSAJES)
+def test_huffman_canonico(mensaje):
+    codigos = tabla_huffman_canonica(Counter(mensaje))
+    valores = sorted(codigos.values())
+    assert not any(siguiente.startswith(codigo) for codigo, siguiente in zip(valores, valores[1:])) # codigo prefijo
+    assert codigos_canonicos({caracter: len(codigo) for caracter, codigo in codigos.items()}) == codigos
+    assert decodificar_huffman(lector(codificar_huffman(mensaje, codigos)), codigos, len(mensaje)) == mensaje
+
+
+# Frecuencias de Fibonacci: el arbol sin limite queda tan profundo como el alfabeto
+def test_longitudes_limitadas():
+    frecuencias = {chr(65 + indice): valor for indice, valor in enumerate([1, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144])}
+    libres = longitudes_huffman(frecuencias)
+    assert max(libres.values()) == len(frecuencias) - 1
+    for longitud_maxima in (4, 6, 8):
+        limitadas = longitudes_huffman_limitadas(frecuencias, longitud_maxima)
+        assert max(limitadas.values()) <= longitud_maxima
+        assert kraft(limitadas) <= 1
+        bits_libres, bits_limitados, _ = costo_longitud_maxima(frecuencias, longitud_maxima)
+        assert bits_limitados >= bits_libres
+    with pytest.raises(ValueError):
+        longitudes_huffman_limitadas(frecuencias, 3) # 12 simbolos no caben en codigos de 3 bits
+
+
+def test_validar_longitudes():
+    assert validar_longitudes({"a": 1, "b": 2, "c": 2}) == {"a": 1, "b": 2, "c": 2}
+    assert validar_longitudes({"a": 0}) == {"a": 0} # un alfabeto de un solo caracter
+    with pytest.raises(ValueError):
+        validar_longitudes({"a": 1, "b": 1, "c": 1})
+    with pytest.raises(ValueError):
+        validar_longitudes({"a": 1, "b": 1000})
+
+
+@pytest.mark.parametrize("mensaje", MENSAJES)
+def test_aritmetica(mensaje):
+    frecuencias = Counter(mensaje)
+    k = max(8, sum(frecuencias.values()).bit_length() + 2) # 2^k >= 4T
+    bits = int_arith_code(mensaje, k, frecuencias)
+    assert int_arith_decode(lector(bits), k, len(mensaje), frecuencias) == mensaje
+
+
+@pytest.mark.parametrize("mensaje", MENSAJES)
+def test_rango(mensaje):
+    frecuencias = Counter(mensaje)
+    k = k_rango(sum(frecuencias.values()))
+    assert int_range_decode(lector(int_range_code(mensaje, k, frecuencias)), k, len(mensaje), frecuencias) == mensaje
+    with pytest.raises(ValueError):
+        int_range_code(mensaje, 8, frecuencias)
+
+
+@pytest.mark.parametrize("datos", [b"", b"\0", bytes(range(256)) * 3, random.Random(4).randbytes(5000), b"abcabcabd" * 500])
+def test_modelos_adaptativos(datos):
+    assert int_arith_decode_adaptativo(lector(int_arith_code_adaptativo(datos))) == datos
+    assert int_arith_decode_contexto(lector(int_arith_code_contexto(datos))) == datos
+    assert decodificar_huffman_adaptativo(lector(codificar_huffman_adaptativo(datos))) == datos
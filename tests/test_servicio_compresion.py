@@ -0,0 +1,95 @@
+import asyncio
+import os
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from compresion_flujo import comprimir_bytes
+from servicio_compresion import OPERACION_DESCOMPRIMIR, ClienteCompresion, ErrorServicio, ServidorCompresion
+
+
+def correr(corrutina, timeout=120):
+    return asyncio.run(asyncio.wait_for(corrutina, timeout))
+
+
+async def con_servidor(prueba, ruta_unix=None, **opciones):
+    servidor = ServidorCompresion(**opciones)
+    if ruta_unix:
+        await servidor.iniciar(ruta_unix=ruta_unix)
+        direccion = {"ruta_unix": ruta_unix}
+    else:
+        await servidor.iniciar("127.0.0.1", 0)
+        direccion = {"puerto": servidor.direccion()[1]}
+    try:
+        return await prueba(servidor, direccion)
+    finally:
+        await servidor.cerrar()
+
+
+def test_ida_y_vuelta_por_tcp_y_unix(tmp_path):
+    datos = b"el servicio comprime y descomprime " * 500
+
+    async def prueba(servidor, direccion):
+        async with await ClienteCompresion().conectar(**direccion) as cliente:
+            for metodo in ("huffman", "aritmetica", "rango", "lz77"):
+                assert await cliente.descomprimir(await cliente.comprimir(datos, metodo)) == datos
+            assert await cliente.descomprimir(await cliente.comprimir(b"")) == b""
+            estadisticas = await cliente.estadisticas()
+        assert estadisticas["solicitudes"] == 10
+        assert estadisticas["latencias_ms"]["comprimir"]["cantidad"] == 5
+
+    correr(con_servidor(prueba, trabajadores=1))
+    correr(con_servidor(prueba, str(tmp_path / "servicio.sock"), trabajadores=1))
+
+
+def test_errores_no_cortan_la_conexion():
+    async def prueba(servidor, direccion):
+        async with await ClienteCompresion().conectar(**direccion) as cliente:
+            with pytest.raises(ErrorServicio):
+                await cliente.descomprimir(b"no es un contenedor")
+            with pytest.raises(ErrorServicio, match="máximo"):
+                await cliente.comprimir(bytes(1 << 20))
+            assert await cliente.descomprimir(await cliente.comprimir(b"sigue andando")) == b"sigue andando"
+        assert servidor.estadisticas()["rechazadas"] == 1
+
+    correr(con_servidor(prueba, trabajadores=1, max_bytes=1 << 19))
+
+
+# Mas solicitudes en curso que trabajadores y que hilos del executor por defecto: cada salida es mas
+# grande que el buffer del pipe, asi que si una solicitud en cola ocupa el hilo que deberia leer el pipe
+# de la que esta corriendo, el servicio se traba
+def test_mas_solicitudes_que_trabajadores_no_se_traba():
+    generador = random.Random(1)
+    mensajes = [generador.randbytes(200000) for _ in range(6)]
+
+    async def prueba(servidor, direccion):
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=2))
+
+        async def una(datos):
+            async with await ClienteCompresion().conectar(**direccion) as cliente:
+                return await cliente.comprimir(datos, "huffman")
+
+        comprimidos = await asyncio.gather(*(una(datos) for datos in mensajes))
+        assert servidor.estadisticas()["solicitudes"] == len(mensajes)
+        return comprimidos
+
+    comprimidos = correr(con_servidor(prueba, trabajadores=1, max_solicitudes=len(mensajes)), timeout=90)
+    assert comprimidos == [comprimir_bytes(datos, "huffman") for datos in mensajes]
+
+
+# La salida se envia por tramas: descomprimir mas bytes que el presupuesto del servidor funciona
+def test_salida_mas_grande_que_el_presupuesto(tmp_path):
+    datos = bytes(3 << 20)
+    comprimido = comprimir_bytes(datos, "huffman")
+
+    async def prueba(servidor, direccion):
+        ruta = tmp_path / "salida"
+        async with await ClienteCompresion().conectar(**direccion) as cliente:
+            with open(ruta, "wb") as salida:
+                escritos = await cliente.solicitud(OPERACION_DESCOMPRIMIR, comprimido, destino=salida)
+        assert escritos == len(datos)
+        assert ruta.read_bytes() == datos
+        assert servidor.estadisticas()["bytes_en_curso"] == 0
+
+    correr(con_servidor(prueba, trabajadores=1, max_bytes=1 << 20))
@@ -0,0 +1,46 @@
+import random
+
+import pytest
+
+from transformada_bwt import (
+    arreglo_de_sufijos, bwt, bwt_inversa, invertir_bloque, mover_al_frente, mover_al_frente_inversa, rle_ceros,
+    rle_ceros_inversa, sa_is, transformar_bloque,
+)
+
+generador = random.Random(18)
+TEXTOS = [
+    b"", b"a", b"ab", b"banana", b"mississippi", b"a" * 1000, b"ab" * 700 + b"c", bytes(range(256)) * 2,
+    generador.randbytes(3000), bytes(generador.choice(b"ab") for _ in range(3000)),
+]
+
+
+def sufijos_ingenuo(datos):
+    return sorted(range(len(datos)), key=lambda inicio: datos[inicio:])
+
+
+@pytest.mark.parametrize("datos", TEXTOS)
+def test_arreglo_de_sufijos(datos):
+    esperado = sufijos_ingenuo(datos)
+    assert list(arreglo_de_sufijos(datos)) == esperado
+    if datos:
+        assert sa_is(list(datos), 255) == esperado # sin NumPy
+
+
+# Alfabetos chicos y textos muy repetidos llevan a SA-IS a varias recursiones
+def test_sa_is_alfabeto_chico():
+    for _ in range(50):
+        texto = [generador.randrange(3) for _ in range(generador.randrange(1, 200))]
+        assert sa_is(texto, 2) == sufijos_ingenuo(bytes(texto))
+
+
+@pytest.mark.parametrize("datos", TEXTOS)
+def test_ida_y_vuelta(datos):
+    assert bwt_inversa(*bwt(datos)) == datos
+    assert mover_al_frente_inversa(mover_al_frente(datos)) == datos
+    assert invertir_bloque(*transformar_bloque(datos)) == datos
+
+
+def test_rle_ceros():
+    valores = [0] * 10 + [3, 0, 5] + [0] * 7
+    assert list(rle_ceros_inversa(rle_ceros(valores))) == valores
+    assert len(rle_ceros([0] * 1000)) < 12 # una racha de n ceros ocupa O(log n) simbolos
@@ -0,0 +1,238 @@
+# Transformacion por ordenamiento de bloques (estilo bzip2) antes de Huffman: Burrows-Wheeler con un
+# arreglo de sufijos, mover al frente y codificacion de las rachas de ceros. El texto con repeticiones
+# lejanas queda como una secuencia con muchisimos ceros y valores chicos, muy facil para Huffman
+from huffman_vectorizado import np
+
+TAM_BLOQUE_BWT = 1 << 20 # bytes por bloque transformado
+RUNA, RUNB = 0, 1 # simbolos de las rachas de ceros (base 2 biyectiva); un valor v > 0 se escribe como v + 1
+NUM_SIMBOLOS_BWT = 257
+
+
+# Arreglo de sufijos
+
+# Funcion para calcular el arreglo de sufijos; sin NumPy se usa SA-IS (tiempo lineal). Un sufijo que
+# es prefijo de otro va primero
+def arreglo_de_sufijos(datos):
+    n = len(datos)
+    if n <= 1:
+        return list(range(n))
+    if np is not None:
+        return arreglo_de_sufijos_numpy(datos)
+    return sa_is(list(datos), 255)
+
+# Funcion para el arreglo de sufijos por ordenamiento inducido (SA-IS) de una lista de enteros de 0 a
+# `maximo`: se ordenan las subcadenas LMS (un sufijo S precedido por uno L) con dos barridos sobre los
+# cubos de cada simbolo; si hay subcadenas repetidas se ordenan sus sufijos recursivamente (sobre una
+# lista a lo sumo de la mitad de largo) y con ese orden un ultimo barrido ordena todos los sufijos
+def sa_is(texto, maximo):
+    n = len(texto)
+    if n <= 2:
+        return sorted(range(n), key=lambda i: texto[i:])
+    # tipo_s[i]: el sufijo i es menor que el sufijo i + 1 (tipo S); si no, es tipo L
+    tipo_s = [False] * n
+    for i in range(n - 2, -1, -1):
+        tipo_s[i] = tipo_s[i + 1] if texto[i] == texto[i + 1] else texto[i] < texto[i + 1]
+    # Cubos: los sufijos que empiezan con c ocupan [inicio_l[c], inicio_l[c + 1]); primero los L y
+    # desde inicio_s[c] los S
+    inicio_l = [0] * (maximo + 2)
+    inicio_s = [0] * (maximo + 1)
+    for i in range(n):
+        if tipo_s[i]:
+            inicio_l[texto[i] + 1] += 1
+        else:
+            inicio_s[texto[i]] += 1
+    for c in range(maximo + 1):
+        inicio_s[c] += inicio_l[c]
+        inicio_l[c + 1] += inicio_s[c]
+
+    # Ordenamiento inducido: las posiciones LMS en el orden dado van al comienzo de la parte S de su
+    # cubo, un barrido de izquierda a derecha ubica los L y uno de derecha a izquierda los S
+    def inducir(posiciones_lms):
+        sufijos = [-1] * n
+        siguiente = inicio_s[:]
+        for posicion in posiciones_lms:
+            c = texto[posicion]
+            sufijos[siguiente[c]] = posicion
+            siguiente[c] += 1
+        siguiente = inicio_l[:]
+        sufijos[siguiente[texto[n - 1]]] = n - 1 # el ultimo sufijo es L y el menor de su cubo
+        siguiente[texto[n - 1]] += 1
+        for sufijo in sufijos: # el iterador ve las posiciones que se escriben mas adelante
+            if sufijo >= 1 and not tipo_s[sufijo - 1]:
+                c = texto[sufijo - 1]
+                sufijos[siguiente[c]] = sufijo - 1
+                siguiente[c] += 1
+        siguiente = inicio_l[1:]
+        for sufijo in reversed(sufijos):
+            if sufijo >= 1 and tipo_s[sufijo - 1]:
+                c = texto[sufijo - 1]
+                siguiente[c] -= 1
+                sufijos[siguiente[c]] = sufijo - 1
+        return sufijos
+
+    lms = [i for i in range(1, n) if tipo_s[i] and not tipo_s[i - 1]]
+    numero_lms = [-1] * n
+    for numero, posicion in enumerate(lms):
+        numero_lms[posicion] = numero
+    sufijos = inducir(lms)
+    if not lms:
+        return sufijos
+
+    # Nombre de cada subcadena LMS (hasta la LMS siguiente) en orden; iguales si tienen el mismo contenido
+    ordenadas = [sufijo for sufijo in sufijos if numero_lms[sufijo] != -1]
+    m = len(lms)
+    reducido = [0] * m
+    nombre = 0
+    for anterior, actual in zip(ordenadas, ordenadas[1:]):
+        fin_anterior = lms[numero_lms[anterior] + 1] if numero_lms[anterior] + 1 < m else n
+        fin_actual = lms[numero_lms[actual] + 1] if numero_lms[actual] + 1 < m else n
+        if fin_anterior - anterior != fin_actual - actual or fin_anterior == n or texto[anterior:fin_anterior + 1] != texto[actual:fin_actual + 1]:
+            nombre += 1
+        reducido[numero_lms[actual]] = nombre
+    if nombre + 1 < m: # hay subcadenas repetidas: se ordenan los sufijos del texto reducido
+        ordenadas = [lms[i] for i in sa_is(reducido, nombre)]
+    return inducir(ordenadas)
+
+# La misma duplicacion con arreglos de NumPy (argsort estable en cada vuelta)
+def arreglo_de_sufijos_numpy(datos):
+    n = len(datos)
+    rango = np.frombuffer(bytes(datos), dtype=np.uint8).astype(np.int64)
+    base = max(n, 256) + 2
+    k = 1
+    while True:
+        siguiente = np.zeros(n, dtype=np.int64)
+        siguiente[:n - k] = rango[k:] + 1 # 0: el sufijo termina antes
+        clave = rango * base + siguiente
+        sufijos = np.argsort(clave, kind="stable")
+        ordenadas = clave[sufijos]
+        rango = np.empty(n, dtype=np.int64)
+        rango[sufijos[0]] = 0
+        rango[sufijos[1:]] = np.cumsum(ordenadas[1:] != ordenadas[:-1])
+        k *= 2
+        if int(rango.max()) == n - 1 or k >= n:
+            return sufijos.tolist()
+
+
+# Burrows-Wheeler
+
+# Funcion para calcular la transformada de un bloque; retorna (ultima columna, indice primario). Se usa
+# un centinela menor que todos los bytes al final del bloque: la fila del sufijo vacio va primero y el
+# centinela no se guarda, solo la fila donde quedaria (el indice primario)
+def bwt(datos):
+    datos = bytes(datos)
+    sufijos = arreglo_de_sufijos(datos)
+    ultima = bytearray([datos[-1]]) if datos else bytearray() # fila del sufijo vacio
+    primario = 0
+    for fila, sufijo in enumerate(sufijos, 1):
+        if sufijo:
+            ultima.append(datos[sufijo - 1])
+        else:
+            primario = fila # aqui iria el centinela
+    return bytes(ultima), primario
+
+# Funcion para invertir la transformada con el mapeo de la ultima a la primera columna (LF)
+def bwt_inversa(ultima, primario):
+    n = len(ultima)
+    if n == 0:
+        return b""
+    if not 0 < primario <= n:
+        raise ValueError(f"Índice primario no válido: {primario}.")
+    conteos = [0] * 256
+    for byte in ultima:
+        conteos[byte] += 1
+    inicios = [0] * 256 # fila de la primera columna donde empieza cada byte (la fila 0 es el centinela)
+    acumulado = 1
+    for byte in range(256):
+        inicios[byte] = acumulado
+        acumulado += conteos[byte]
+
+    # siguiente_fila[fila] = fila del sufijo que empieza un byte antes; la fila `primario` es la del centinela
+    siguiente_fila = [0] * (n + 1)
+    for fila in range(n + 1):
+        if fila == primario:
+            continue
+        byte = ultima[fila if fila < primario else fila - 1]
+        siguiente_fila[fila] = inicios[byte]
+        inicios[byte] += 1
+
+    salida = bytearray(n)
+    fila = 0
+    for posicion in range(n - 1, -1, -1): # se reconstruye de atras hacia adelante
+        salida[posicion] = ultima[fila if fila < primario else fila - 1]
+        fila = siguiente_fila[fila]
+    return bytes(salida)
+
+
+# Mover al frente y rachas de ceros
+
+# Funcion para reemplazar cada byte por su posicion en una lista que se reordena al usarlo
+def mover_al_frente(datos):
+    lista = list(range(256))
+    salida = bytearray(len(datos))
+    for indice, byte in enumerate(datos):
+        posicion = lista.index(byte)
+        salida[indice] = posicion
+        if posicion:
+            del lista[posicion]
+            lista.insert(0, byte)
+    return bytes(salida)
+
+def mover_al_frente_inversa(posiciones):
+    lista = list(range(256))
+    salida = bytearray(len(posiciones))
+    for indice, posicion in enumerate(posiciones):
+        byte = lista[posicion]
+        salida[indice] = byte
+        if posicion:
+            del lista[posicion]
+            lista.insert(0, byte)
+    return bytes(salida)
+
+# Funcion para codificar las rachas de ceros: una racha de r ceros se escribe como r en base 2
+# biyectiva con los digitos RUNA (1) y RUNB (2), del menos al mas significativo; los demas valores
+# suben en uno. Retorna una lista de simbolos de 0 a 256
+def rle_ceros(valores):
+    simbolos = []
+    racha = 0
+    for valor in valores:
+        if valor == 0:
+            racha += 1
+            continue
+        if racha:
+            agregar_racha(simbolos, racha)
+            racha = 0
+        simbolos.append(valor + 1)
+    if racha:
+        agregar_racha(simbolos, racha)
+    return simbolos
+
+def agregar_racha(simbolos, racha):
+    while racha:
+        racha -= 1
+        simbolos.append(RUNB if racha & 1 else RUNA)
+        racha >>= 1
+
+def rle_ceros_inversa(simbolos):
+    salida = bytearray()
+    racha, peso = 0, 1
+    for simbolo in simbolos:
+        if simbolo <= RUNB:
+            racha += peso << simbolo # RUNA vale peso, RUNB vale 2 * peso
+            peso <<= 1
+            continue
+        if racha:
+            salida += bytes(racha)
+            racha, peso = 0, 1
+        salida.append(simbolo - 1)
+    if racha:
+        salida += bytes(racha)
+    return bytes(salida)
+
+
+# Funciones para un bloque completo: datos -> (simbolos, indice primario) y su inversa
+def transformar_bloque(datos):
+    ultima, primario = bwt(datos)
+    return rle_ceros(mover_al_frente(ultima)), primario
+
+def invertir_bloque(simbolos, primario):
+    return bwt_inversa(mover_al_frente_inversa(rle_ceros_inversa(simbolos)), primario)